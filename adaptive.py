@@ -0,0 +1,115 @@
+from math import comb
+
+from question_schema import DIMENSIONS
+
+
+# 적응형 진행 기본 설정 (secrets.toml의 [adaptive] 섹션으로 덮어쓸 수 있음)
+# confidence: 남은 답변이 반반으로 갈린다고 볼 때 지금 글자가 유지될 확률이 이 값 이상이면 그 차원을 끝냄
+#             1.0이면 남은 질문에 어떻게 답해도 글자가 바뀌지 않을 때만 건너뜀
+DEFAULT_ADAPTIVE_SETTINGS = {
+    "enabled": False,
+    "confidence": 1.0
+}
+
+
+def bit_count(bits):
+    return bin(bits).count("1")
+
+
+def dimension_masks(questions):
+    """차원별로 그 차원 질문 번호의 비트를 모은 마스크 - {"E/I": 0b00010001, ...}"""
+    masks = {dimension: 0 for dimension in DIMENSIONS}
+    for index, q in enumerate(questions):
+        masks[q["type"]] |= 1 << index
+    return masks
+
+
+def pack_answer(answers, asked, index, dimension, letter):
+    """index번(dimension 차원) 질문에 letter로 답한 것을 기록한 (answers, asked)
+
+    답변은 질문마다 한 비트로 담는다. asked는 답한 질문의 비트, answers는 그중 차원의 앞 글자(E/S/T/J)로
+    답한 질문의 비트다. 어느 질문이 어느 차원인지는 세트마다 한 번 만드는 dimension_masks가 알려준다.
+    """
+    bit = 1 << index
+    answers = answers | bit if letter == dimension[0] else answers & ~bit
+    return answers, asked | bit
+
+
+def pack_answers(questions, asked_indexes, letters):
+    """답한 질문 번호 목록과 답변 글자 목록을 (answers, asked) 비트로 - 벤치마크가 정해 둔 답변을 한 번에 채울 때"""
+    answers = asked = 0
+    for index, letter in zip(asked_indexes, letters):
+        answers, asked = pack_answer(answers, asked, index, questions[index]["type"], letter)
+    return answers, asked
+
+
+def letter_counts(masks, asked, answers):
+    """답변 글자별 개수 - 차원 마스크와 답변 비트만으로 셈"""
+    counts = {}
+    for dimension, mask in masks.items():
+        first, second = dimension.split("/")
+        counts[first] = bit_count(answers & asked & mask)
+        counts[second] = bit_count(asked & mask) - counts[first]
+    return counts
+
+
+def mbti_from_answers(masks, asked, answers):
+    """답변으로 MBTI 유형을 계산 - 동점이면 각 차원의 앞 글자(E/S/T/J)"""
+    counts = letter_counts(masks, asked, answers)
+    return "".join(
+        first if counts[first] >= counts[second] else second
+        for first, second in (dimension.split("/") for dimension in DIMENSIONS)
+    )
+
+
+def letter_confidence(lead, remaining):
+    """앞 글자 개수 - 뒷 글자 개수가 lead이고 remaining개 질문이 남았을 때 지금 글자가 유지될 확률
+
+    남은 답변은 각각 1/2 확률로 어느 쪽이든 나온다고 본다. 동점은 앞 글자가 이긴다.
+    """
+    # 남은 질문 중 x개가 앞 글자로 답해지면 최종 차이는 lead + 2x - remaining
+    first_wins = sum(comb(remaining, x) for x in range(remaining + 1) if lead + 2 * x - remaining >= 0)
+    total = 2 ** remaining
+    return first_wins / total if lead >= 0 else (total - first_wins) / total
+
+
+def dimension_confidence(masks, asked, answers, question_count):
+    """차원별로 지금 글자가 끝까지 유지될 확률 - {"E/I": 1.0, ...}
+
+    차원별 전체 질문 수는 목표 개수(question_count // 4)와 실제 목록의 개수 중 큰 값으로 보므로
+    아직 생성되지 않은 질문도 남은 질문으로 센다.
+    """
+    questions_per_dimension = question_count // 4
+    counts = letter_counts(masks, asked, answers)
+
+    confidence = {}
+    for dimension in DIMENSIONS:
+        first, second = dimension.split("/")
+        total = max(questions_per_dimension, bit_count(masks[dimension]))
+        remaining = max(0, total - bit_count(asked & masks[dimension]))
+        confidence[dimension] = letter_confidence(counts[first] - counts[second], remaining)
+    return confidence
+
+
+def unsettled_dimensions(masks, asked, answers, question_count, confidence=1.0):
+    """아직 결정되지 않은 차원을 덜 결정된 순서로"""
+    by_dimension = dimension_confidence(masks, asked, answers, question_count)
+    unsettled = [dimension for dimension in DIMENSIONS if by_dimension[dimension] < confidence]
+    return sorted(unsettled, key=lambda dimension: by_dimension[dimension])
+
+
+def next_question_index(masks, asked, answers, question_count, confidence=1.0):
+    """다음에 보여줄 질문 번호 - 가장 덜 결정된 차원의 아직 묻지 않은 질문 중 앞의 것
+
+    결정되지 않은 차원의 질문이 (아직 생성되지 않아) 없으면 None.
+    """
+    for dimension in unsettled_dimensions(masks, asked, answers, question_count, confidence):
+        unasked = masks[dimension] & ~asked
+        if unasked:
+            return (unasked & -unasked).bit_length() - 1
+    return None
+
+
+def is_decided(masks, asked, answers, question_count, confidence=1.0):
+    """네 차원이 모두 결정되어 더 물어볼 필요가 없는지"""
+    return not unsettled_dimensions(masks, asked, answers, question_count, confidence)
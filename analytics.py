@@ -0,0 +1,279 @@
+"""결과 분석 - 테스트 이벤트 로그(추가만 함)와 증분 집계를 담는 SQLite 저장소
+
+앱은 AnalyticsLog.record()로 이벤트를 메모리에 모으기만 하고, 백그라운드 스레드가 flush_interval마다
+한 트랜잭션으로 이벤트를 추가하면서 같은 트랜잭션에서 집계 테이블(유형 분포, 질문별 A/B 선택,
+질문 개수별 시작/완료와 이탈 위치)을 갱신한다. 관리자 대시보드(pages/admin.py)는 집계만 읽는다.
+
+    python analytics.py summary
+    python analytics.py rebuild    # 이벤트 로그로 집계 테이블을 처음부터 다시 만듦
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import METRICS
+
+
+# 결과 분석 기본 설정 (secrets.toml의 [analytics] 섹션으로 덮어쓸 수 있음)
+DEFAULT_ANALYTICS_SETTINGS = {
+    "enabled": True,
+    "path": "analytics.db",    # SQLite 파일 경로
+    "flush_interval": 2.0,     # 모아 둔 이벤트를 기록하는 간격 (초)
+    "max_pending": 10000,      # 기록하지 못하고 쌓인 이벤트가 이만큼이면 새 이벤트는 버림
+    "admin_password": ""       # 관리자 대시보드 비밀번호 - 비어 있으면 대시보드를 열 수 없음
+}
+
+STARTED = "started"
+ANSWERED = "answered"
+COMPLETED = "completed"
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS events ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, at REAL NOT NULL, data TEXT NOT NULL)",
+    # 완료 이벤트는 세트 ID만 담고, 질문은 세트마다 한 번만 저장
+    "CREATE TABLE IF NOT EXISTS question_sets (id TEXT PRIMARY KEY, questions TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS funnel ("
+    "question_count INTEGER PRIMARY KEY, started INTEGER NOT NULL DEFAULT 0, "
+    "completed INTEGER NOT NULL DEFAULT 0, completed_seconds REAL NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS progress ("
+    "question_count INTEGER NOT NULL, answered INTEGER NOT NULL, sessions INTEGER NOT NULL DEFAULT 0, "
+    "PRIMARY KEY (question_count, answered))",
+    "CREATE TABLE IF NOT EXISTS type_counts (mbti TEXT PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS question_choices ("
+    "question TEXT PRIMARY KEY, type TEXT NOT NULL, option_a TEXT NOT NULL, option_b TEXT NOT NULL, "
+    "a INTEGER NOT NULL DEFAULT 0, b INTEGER NOT NULL DEFAULT 0)"
+]
+_ROLLUP_TABLES = ["funnel", "progress", "type_counts", "question_choices"]
+
+
+def choice_string(questions, asked, answers):
+    """질문마다 고른 선택지 - "AB-A..." (답하지 않은 질문은 "-")
+
+    answers/asked는 adaptive.pack_answer의 비트다. 비트는 차원의 앞 글자인지만 담으므로 어느 선택지가
+    그 글자인지는 질문을 보고 정한다.
+    """
+    choices = []
+    for index, q in enumerate(questions):
+        if not asked >> index & 1:
+            choices.append("-")
+            continue
+        first, second = q["type"].split("/")
+        letter = first if answers >> index & 1 else second
+        choices.append("A" if q["options"][0]["type"] == letter else "B")
+    return "".join(choices)
+
+
+class AnalyticsStore:
+    """이벤트 로그와 집계 테이블 (SQLite, WAL 모드라 대시보드가 기록 중에도 읽을 수 있음)"""
+
+    def __init__(self, path=DEFAULT_ANALYTICS_SETTINGS["path"]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def append(self, events):
+        """(kind, at, data, questions) 이벤트를 로그에 추가하고 같은 트랜잭션에서 집계를 갱신"""
+        with self._lock, self._conn:
+            for kind, at, data, questions in events:
+                self._conn.execute(
+                    "INSERT INTO events (kind, at, data) VALUES (?, ?, ?)",
+                    (kind, at, json.dumps(data, ensure_ascii=False))
+                )
+                if questions is not None and data.get("question_set"):
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO question_sets (id, questions) VALUES (?, ?)",
+                        (data["question_set"], json.dumps(list(questions), ensure_ascii=False))
+                    )
+                self._roll_up(kind, data, questions)
+
+    def _roll_up(self, kind, data, questions):
+        question_count = data["question_count"]
+        if kind == STARTED:
+            self._conn.execute(
+                "INSERT INTO funnel (question_count, started) VALUES (?, 1) "
+                "ON CONFLICT(question_count) DO UPDATE SET started = started + 1",
+                (question_count,)
+            )
+        elif kind == ANSWERED:
+            self._conn.execute(
+                "INSERT INTO progress (question_count, answered, sessions) VALUES (?, ?, 1) "
+                "ON CONFLICT(question_count, answered) DO UPDATE SET sessions = sessions + 1",
+                (question_count, data["answered"])
+            )
+        elif kind == COMPLETED:
+            self._conn.execute(
+                "INSERT INTO funnel (question_count, completed, completed_seconds) VALUES (?, 1, ?) "
+                "ON CONFLICT(question_count) DO UPDATE SET "
+                "completed = completed + 1, completed_seconds = completed_seconds + excluded.completed_seconds",
+                (question_count, data.get("seconds") or 0.0)
+            )
+            self._conn.execute(
+                "INSERT INTO type_counts (mbti, count) VALUES (?, 1) "
+                "ON CONFLICT(mbti) DO UPDATE SET count = count + 1",
+                (data["mbti"],)
+            )
+            for q, choice in zip(questions or (), data.get("choices", "")):
+                if choice == "-":
+                    continue
+                self._conn.execute(
+                    "INSERT INTO question_choices (question, type, option_a, option_b, a, b) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(question) DO UPDATE SET a = a + excluded.a, b = b + excluded.b",
+                    (q["question"], q["type"], q["options"][0]["text"], q["options"][1]["text"],
+                     int(choice == "A"), int(choice == "B"))
+                )
+
+    def rebuild(self):
+        """집계 테이블을 비우고 이벤트 로그 전체로 다시 만듦 - 다시 만든 이벤트 수를 반환"""
+        with self._lock, self._conn:
+            for table in _ROLLUP_TABLES:
+                self._conn.execute(f"DELETE FROM {table}")
+            question_sets = {
+                set_id: json.loads(questions)
+                for set_id, questions in self._conn.execute("SELECT id, questions FROM question_sets")
+            }
+            count = 0
+            for kind, data in self._conn.execute("SELECT kind, data FROM events ORDER BY id").fetchall():
+                data = json.loads(data)
+                self._roll_up(kind, data, question_sets.get(data.get("question_set")))
+                count += 1
+        return count
+
+    def rollups(self, top_questions=20):
+        """대시보드용 집계 - 이벤트 로그는 읽지 않음"""
+        with self._lock:
+            funnel = self._conn.execute(
+                "SELECT question_count, started, completed, completed_seconds FROM funnel ORDER BY question_count"
+            ).fetchall()
+            progress = self._conn.execute(
+                "SELECT question_count, answered, sessions FROM progress ORDER BY question_count, answered"
+            ).fetchall()
+            types = self._conn.execute("SELECT mbti, count FROM type_counts ORDER BY count DESC, mbti").fetchall()
+            questions = self._conn.execute(
+                "SELECT question, type, option_a, option_b, a, b FROM question_choices "
+                "ORDER BY a + b DESC, question LIMIT ?",
+                (top_questions,)
+            ).fetchall()
+
+        return {
+            "funnel": [
+                {"question_count": question_count, "started": started, "completed": completed,
+                 "completion_rate": completed / started if started else None,
+                 "mean_seconds": seconds / completed if completed else None}
+                for question_count, started, completed, seconds in funnel
+            ],
+            "progress": [
+                {"question_count": question_count, "answered": answered, "sessions": sessions}
+                for question_count, answered, sessions in progress
+            ],
+            "types": dict(types),
+            "questions": [
+                {"question": question, "type": dimension, "option_a": option_a, "option_b": option_b, "a": a, "b": b}
+                for question, dimension, option_a, option_b, a, b in questions
+            ]
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AnalyticsLog:
+    """이벤트를 메모리에 모았다가 flush_interval마다 백그라운드 스레드에서 한 번에 기록하는 로그
+
+    record()는 잠금 한 번으로 목록에 붙이고 바로 반환하므로 결과 화면 재실행을 늦추지 않는다.
+    configure()로 저장소를 붙이기 전이나 enabled = false면 이벤트를 버린다.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = []
+        self.store = None
+        self.settings = dict(DEFAULT_ANALYTICS_SETTINGS)
+        self._closed = threading.Event()
+        self._thread = None
+
+    def configure(self, settings=None, store=None):
+        """[analytics] 설정대로 저장소를 열고 기록 스레드를 시작 - 이미 열려 있으면 그대로 (앱과 대시보드가 함께 부름)"""
+        if self.store is not None:
+            return self
+        self.settings = {**DEFAULT_ANALYTICS_SETTINGS, **dict(settings or {})}
+        if not self.settings["enabled"]:
+            return self
+        self.store = store or AnalyticsStore(self.settings["path"])
+        self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def record(self, kind, questions=None, **data):
+        """이벤트 하나를 기록 대기열에 넣음 - questions는 완료 이벤트의 질문 세트 (세트마다 한 번만 저장됨)"""
+        if self.store is None:
+            return
+        with self._lock:
+            if len(self._pending) >= self.settings["max_pending"]:
+                METRICS.increment("analytics_dropped_total", kind=kind)
+                return
+            self._pending.append((kind, self._clock(), data, questions))
+
+    def flush(self):
+        """모아 둔 이벤트를 지금 기록 - 실패하면 다음 번에 다시 시도"""
+        with self._lock:
+            events, self._pending = self._pending, []
+        if not events:
+            return
+
+        started = time.perf_counter()
+        try:
+            self.store.append(events)
+        except Exception:
+            METRICS.increment("analytics_errors_total")
+            with self._lock:
+                self._pending[:0] = events
+            return
+        METRICS.increment("analytics_events_total", len(events))
+        METRICS.observe("analytics_flush_seconds", time.perf_counter() - started)
+
+    def _run(self):
+        while not self._closed.wait(self.settings["flush_interval"]):
+            self.flush()
+
+    def close(self):
+        if self.store is not None and not self._closed.is_set():
+            self._closed.set()
+            self.flush()
+            self.store.close()
+
+
+# 프로세스 전체에서 공유하는 결과 분석 로그 (앱에서 configure()로 저장소를 붙임)
+ANALYTICS = AnalyticsLog()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["summary", "rebuild"])
+    parser.add_argument("--path", default=DEFAULT_ANALYTICS_SETTINGS["path"], help="결과 분석 SQLite 파일")
+    args = parser.parse_args()
+
+    store = AnalyticsStore(args.path)
+    if args.command == "rebuild":
+        started = time.perf_counter()
+        count = store.rebuild()
+        print(f"이벤트 {count}개로 집계를 다시 만듦 ({time.perf_counter() - started:.1f}s)")
+    print(json.dumps(store.rollups(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""적응형 진행 시뮬레이션 - 질문 개수/confidence별로 실제로 보여주는 질문 수와 고정 길이 결과와의 일치율
+
+가상의 응답자는 차원마다 한쪽 글자를 lean 확률로 고른다 (lean은 0.5~0.95 사이에서 무작위).
+같은 응답자가 모든 질문에 답했을 때(고정 길이)의 결과와 적응형 결과를 비교한다.
+
+    python -m benchmarks.adaptive_length --sessions 2000
+"""
+
+import argparse
+import random
+
+from adaptive import dimension_masks, mbti_from_answers, next_question_index, pack_answer, pack_answers
+from question_generator import get_default_questions
+from question_schema import DIMENSIONS
+
+
+def balanced_questions(question_count):
+    """차원별로 question_count // 4개씩, 차원 순서대로 번갈아 놓인 질문 목록"""
+    by_dimension = {dimension: [q for q in get_default_questions(8) if q["type"] == dimension] for dimension in DIMENSIONS}
+    return [
+        by_dimension[dimension][i % len(by_dimension[dimension])]
+        for i in range(question_count // 4)
+        for dimension in DIMENSIONS
+    ]
+
+
+def simulate(question_count, confidence, sessions, seed):
+    rng = random.Random(seed)
+    questions = balanced_questions(question_count)
+    masks = dimension_masks(questions)
+    shown = 0
+    agree = 0
+
+    for _ in range(sessions):
+        leans = {q["type"]: rng.uniform(0.5, 0.95) for q in questions}
+        # 질문마다 미리 답을 정해 두어 고정 길이와 적응형이 같은 답변을 쓰도록 함
+        planned = [
+            q["options"][0]["type"] if rng.random() < leans[q["type"]] else q["options"][1]["type"]
+            for q in questions
+        ]
+
+        answers = asked = 0
+        while True:
+            index = next_question_index(masks, asked, answers, question_count, confidence)
+            if index is None:
+                break
+            answers, asked = pack_answer(answers, asked, index, questions[index]["type"], planned[index])
+            shown += 1
+
+        fixed_answers, fixed_asked = pack_answers(questions, range(len(questions)), planned)
+        agree += mbti_from_answers(masks, asked, answers) == mbti_from_answers(masks, fixed_asked, fixed_answers)
+
+    return shown / sessions, agree / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[8, 12, 16, 20], help="질문 개수")
+    parser.add_argument("--confidences", type=float, nargs="+", default=[1.0, 0.9, 0.8], help="confidence 설정값")
+    parser.add_argument("--sessions", type=int, default=1000, help="조합마다 시뮬레이션할 세션 수")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'count':>5} {'confidence':>10} {'shown':>7} {'saved':>7} {'same result':>12}")
+    for question_count in args.counts:
+        for confidence in args.confidences:
+            shown, agree = simulate(question_count, confidence, args.sessions, args.seed)
+            print(f"{question_count:>5} {confidence:>10.2f} {shown:>7.2f} {1 - shown / question_count:>7.0%} {agree:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
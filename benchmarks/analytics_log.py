@@ -0,0 +1,70 @@
+"""결과 분석 로그 벤치마크 - 재실행에서 치르는 record() 비용, 배치 기록 처리량, 대시보드 집계 조회 시간
+
+세션마다 시작, 답변마다 한 번, 완료 이벤트를 남기는 흐름을 --sessions개 만들어 기록한다.
+
+    python -m benchmarks.analytics_log --sessions 20000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from adaptive import dimension_masks, mbti_from_answers, pack_answers
+from analytics import ANSWERED, COMPLETED, STARTED, AnalyticsLog, choice_string
+from question_generator import get_default_questions
+from question_sets import question_set_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20000, help="기록할 세션 수")
+    parser.add_argument("--count", type=int, default=8, help="세트당 질문 개수")
+    parser.add_argument("--sets", type=int, default=50, help="서로 다른 질문 세트 수")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    question_sets = []
+    for number in range(args.sets):
+        questions = tuple({**q, "question": f"{q['question']} ({number})"} for q in get_default_questions(args.count))
+        question_sets.append((question_set_id(questions), questions, dimension_masks(questions)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = AnalyticsLog().configure({"path": os.path.join(directory, "analytics.db"), "flush_interval": 3600,
+                                        "max_pending": args.sessions * (args.count + 2)})
+        record_us = []
+        for _ in range(args.sessions):
+            set_id, questions, masks = rng.choice(question_sets)
+            letters = [rng.choice(q["options"])["type"] for q in questions]
+            answers, asked = pack_answers(questions, range(len(questions)), letters)
+
+            started = time.perf_counter()
+            log.record(STARTED, question_count=args.count)
+            for answered in range(1, args.count + 1):
+                log.record(ANSWERED, question_count=args.count, answered=answered)
+            log.record(COMPLETED, questions=questions, question_count=args.count, question_set=set_id,
+                       choices=choice_string(questions, asked, answers), mbti=mbti_from_answers(masks, asked, answers),
+                       answered=args.count, seconds=rng.uniform(30, 120))
+            record_us.append((time.perf_counter() - started) * 1e6 / (args.count + 2))
+
+        events = args.sessions * (args.count + 2)
+        started = time.perf_counter()
+        log.flush()
+        flush_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        rollups = log.store.rollups()
+        rollup_ms = (time.perf_counter() - started) * 1000
+        log.close()
+
+    record_us.sort()
+    print(f"record(): mean {statistics.mean(record_us):.1f} us, p99 {record_us[int(0.99 * len(record_us))]:.1f} us per event")
+    print(f"flush: {events} events in {flush_seconds:.2f}s ({events / flush_seconds:,.0f} events/s)")
+    print(f"dashboard rollups: {rollup_ms:.2f} ms ({len(rollups['types'])} types, {len(rollups['questions'])} questions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""답변 한 번당 스크립트 실행 시간 - 전체 스크립트 재실행 vs 질문 패널(fragment)만 재실행
+
+AppTest는 답변마다 스크립트 전체를 실행하므로, 그 시간을 전체 재실행 비용으로 본다.
+같은 실행 안에서 question_panel의 METRICS span(question_render) 시간을 함께 재어
+fragment만 다시 실행될 때의 비용으로 본다 (실제 서버에서는 답변 시 이 부분만 실행됨).
+
+    python -m benchmarks.answer_rerun --count 20 --rounds 3
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.load_test import APP_PATH, START_LABEL, has_button, percentile
+from metrics import METRICS
+
+
+SPAN_KEY = 'span_seconds{span="question_render"}'
+
+
+def fragment_seconds():
+    """지금까지 question_render span에 쌓인 시간"""
+    return METRICS.snapshot()["summaries"].get(SPAN_KEY, {}).get("sum", 0.0)
+
+
+def run_session(base_url, args, seed):
+    """한 세션의 모든 답변에 대해 (전체 재실행 ms, fragment ms) 목록을 반환"""
+    rng = random.Random(seed)
+    samples = []
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    at.secrets["openai"] = {"API_KEY": "fake-key", "BASE_URL": base_url}
+    at.secrets["generation"] = {"mode": "single"}
+    at.session_state["question_count"] = args.count
+    at.run()
+
+    next(button for button in at.sidebar.button if button.label == START_LABEL).click()
+    at.run()
+
+    while not at.session_state["test_completed"]:
+        if not has_button(at, "option_a"):
+            at.run()
+            continue
+        at.button(key=rng.choice(["option_a", "option_b"])).click()
+
+        fragment_before = fragment_seconds()
+        started = time.perf_counter()
+        at.run()
+        full = time.perf_counter() - started
+
+        # 마지막 답변은 결과 화면으로 넘어가며 전체 재실행이 필요하므로 제외
+        if not at.session_state["test_completed"]:
+            samples.append((full * 1000, (fragment_seconds() - fragment_before) * 1000))
+
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20, choices=[4, 8, 12, 16, 20], help="질문 개수")
+    parser.add_argument("--rounds", type=int, default=3, help="반복할 세션 수")
+    parser.add_argument("--timeout", type=float, default=30.0, help="스크립트 한 번 실행의 제한 시간 (초)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    samples = []
+    with FakeOpenAIServer(latency=0.0, jitter=0.0, seed=args.seed) as server:
+        for i in range(args.rounds):
+            samples.extend(run_session(server.base_url, args, args.seed + i))
+
+    full = [sample[0] for sample in samples]
+    fragment = [sample[1] for sample in samples]
+    print(f"answers measured: {len(samples)}")
+    print(f"{'ms/answer':<22}{'mean':>8}{'p50':>8}{'p99':>8}")
+    for name, values in [("full script rerun", full), ("fragment rerun", fragment)]:
+        print(f"{name:<22}{statistics.mean(values):>8.2f}{percentile(values, 50):>8.2f}{percentile(values, 99):>8.2f}")
+    print(f"reduction: {1 - statistics.mean(fragment) / statistics.mean(full):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""batch 방식 질문 생성 벤치마크 - 한 번에 만드는 세트 수(K)별 세트당 토큰/지연 시간 비교
+
+    python -m benchmarks.batch_generation --sizes 1 2 4 8 --rounds 5
+    python -m benchmarks.batch_generation --live          # 실제 API 사용 (OPENAI_API_KEY 필요)
+    python -m benchmarks.batch_generation --live --cassette runs/batch.jsonl.gz --record
+    python -m benchmarks.batch_generation --cassette runs/batch.jsonl.gz   # 네트워크 없이 녹화본 재생
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from cassette import Cassette
+from question_generator import generate_question_sets
+from rate_limiter import RATE_LIMITER
+
+
+def run(client, question_count, set_count, rounds, time_scale):
+    """K개 세트 요청을 rounds번 반복하여 세트당 평균 토큰/지연 시간을 계산"""
+    delivered = 0
+    prompt_tokens = 0
+    completion_tokens = 0
+    elapsed = 0.0
+
+    for _ in range(rounds):
+        started = time.perf_counter()
+        sets, usage = generate_question_sets(client, question_count, set_count)
+        elapsed += (time.perf_counter() - started) / time_scale
+        delivered += len(sets)
+        prompt_tokens += usage["prompt_tokens"]
+        completion_tokens += usage["completion_tokens"]
+
+    per_set = max(delivered, 1)
+    return {
+        "sets": delivered,
+        "requests_per_set": rounds / per_set,
+        "prompt_tokens_per_set": prompt_tokens / per_set,
+        "completion_tokens_per_set": completion_tokens / per_set,
+        "tokens_per_set": (prompt_tokens + completion_tokens) / per_set,
+        "latency_per_request": elapsed / rounds,
+        "latency_per_set": elapsed / per_set
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=8, help="세트당 질문 개수")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8], help="비교할 K 값들")
+    parser.add_argument("--rounds", type=int, default=3, help="K마다 반복할 요청 수")
+    parser.add_argument("--live", action="store_true", help="가짜 클라이언트 대신 실제 OpenAI API 사용")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="가짜 클라이언트/카세트 재생의 지연 시간 배율")
+    parser.add_argument("--cassette", help="녹화/재생할 카세트 파일 경로")
+    parser.add_argument("--record", action="store_true", help="--live 요청을 --cassette에 녹화")
+    parser.add_argument("--fuzzy", action="store_true", help="재생할 때 녹화되지 않은 요청을 비슷한 녹화 응답으로 대신")
+    args = parser.parse_args()
+
+    if args.cassette:
+        from openai_client import OpenAIConnection
+        if args.record:
+            cassette = Cassette(args.cassette, "record")
+            api_key, time_scale = os.environ["OPENAI_API_KEY"], 1.0
+        else:
+            cassette = Cassette(args.cassette, "replay", latency_scale=args.time_scale, fuzzy=args.fuzzy)
+            api_key, time_scale = "replay", args.time_scale
+        client = OpenAIConnection(api_key, cassette=cassette).client
+    elif args.live:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+        time_scale = 1.0
+    else:
+        client = FakeOpenAI(time_scale=args.time_scale)
+        time_scale = args.time_scale
+
+    if time_scale != 1.0:
+        # 지연 시간을 줄여 재생하므로 실제 시간으로 재는 요청 속도 제한은 끔
+        RATE_LIMITER.configure({"enabled": False})
+    print(f"{'K':>3} {'sets':>5} {'req/set':>8} {'prompt/set':>11} {'compl/set':>10} {'tokens/set':>11} {'s/request':>10} {'s/set':>7}")
+    for set_count in args.sizes:
+        result = run(client, args.count, set_count, args.rounds, time_scale)
+        print(
+            f"{set_count:>3} {result['sets']:>5} {result['requests_per_set']:>8.2f} "
+            f"{result['prompt_tokens_per_set']:>11.0f} {result['completion_tokens_per_set']:>10.0f} "
+            f"{result['tokens_per_set']:>11.0f} {result['latency_per_request']:>10.2f} {result['latency_per_set']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
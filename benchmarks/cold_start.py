@@ -0,0 +1,144 @@
+"""콜드 스타트 벤치마크 - 첫 화면까지의 import 시간(-X importtime)과 새 프로세스의 첫 실행 시간
+
+서버가 잠들었다 깨어나면 streamlit은 이미 불러온 상태에서 첫 방문자의 스크립트 실행이 앱 모듈을 불러온다.
+그래서 import 시간은 새 인터프리터에서 streamlit을 먼저 불러온 뒤 streamlit_app.py 맨 위의 import만 잰다.
+첫 실행 시간은 새 프로세스마다 AppTest로 시작 화면을 한 번(콜드), 다시 한 번(웜) 실행해 잰다.
+--compare로 다른 커밋의 streamlit_app.py와 비교할 수 있다 (모듈은 현재 트리의 것을 씀).
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --compare HEAD~1 --rounds 5
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.load_test import APP_PATH
+from benchmarks.rerun_payload import app_at
+
+ROOT = os.path.dirname(APP_PATH)
+
+# 첫 생성 작업(또는 부팅 워밍업)에서 불러오는 모듈
+DEFERRED_MODULES = ["question_generator", "openai_client", "cassette", "circuit_breaker", "dedup", "question_bank"]
+
+
+def app_imports(app_path):
+    """스크립트 모듈 수준 import 문이 불러오는 모듈 목록 (streamlit은 서버가 이미 불러 두므로 제외)"""
+    with open(app_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return [name for name in dict.fromkeys(names) if name.split(".")[0] != "streamlit"]
+
+
+def import_times(modules):
+    """새 인터프리터에서 streamlit을 불러온 뒤 modules를 불러오며 잰 최상위 패키지별 누적 시간 (ms)"""
+    code = "import streamlit\n" + "".join(f"import {name}\n" for name in modules)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stderr
+
+    totals = {}
+    after_streamlit = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # 최상위 import만 (들여쓰기된 줄은 그 안에서 불러온 모듈)
+        if name.startswith("  "):
+            continue
+        name = name.strip()
+        if not after_streamlit:
+            after_streamlit = name == "streamlit"
+            continue
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(cumulative) / 1000
+    return totals
+
+
+def child(args):
+    """새 프로세스에서 시작 화면 첫 실행(콜드)과 두 번째 실행(웜) 시간을 JSON으로 출력"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(args.child, default_timeout=args.timeout)
+    at.secrets["openai"] = {"API_KEY": "fake-key", "BASE_URL": args.base_url}
+    at.secrets["generation"] = {"mode": "single"}
+    at.secrets["warmup"] = {"enabled": args.warmup}
+
+    started = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - started
+
+    started = time.perf_counter()
+    at.run()
+    warm = time.perf_counter() - started
+    print(json.dumps({"cold": cold * 1000, "warm": warm * 1000}))
+
+
+def first_render(app_path, base_url, args):
+    """새 프로세스 rounds개에서 잰 (콜드 ms 목록, 웜 ms 목록)"""
+    cold, warm = [], []
+    for _ in range(args.rounds):
+        command = [sys.executable, "-m", "benchmarks.cold_start", "--child", app_path, "--base-url", base_url,
+                   "--timeout", str(args.timeout)]
+        if args.warmup:
+            command.append("--warmup")
+        output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        cold.append(result["cold"])
+        warm.append(result["warm"])
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare", help="비교할 이전 커밋 (예: HEAD~1)")
+    parser.add_argument("--rounds", type=int, default=3, help="첫 실행 시간을 잴 새 프로세스 수")
+    parser.add_argument("--top", type=int, default=8, help="import 시간을 보여줄 패키지 수")
+    parser.add_argument("--warmup", action="store_true", help="[warmup] enabled = true로 실행")
+    parser.add_argument("--timeout", type=float, default=30.0, help="스크립트 한 번 실행의 제한 시간 (초)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    apps = {"current": APP_PATH}
+    if args.compare:
+        apps[args.compare] = app_at(args.compare)
+    try:
+        with FakeOpenAIServer(latency=0.0, jitter=0.0) as server:
+            for name, path in apps.items():
+                imports = import_times(app_imports(path))
+                cold, warm = first_render(path, server.base_url, args)
+                print(f"== {name}")
+                print(f"first-render imports: {sum(imports.values()):.1f} ms")
+                for package, ms in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+                    print(f"  {package:<24}{ms:>8.1f} ms")
+                print(f"first run (cold): {statistics.mean(cold):.1f} ms   rerun (warm): {statistics.mean(warm):.1f} ms")
+
+        # 첫 생성 작업이 백그라운드에서 치르는 import 시간
+        deferred = import_times(app_imports(APP_PATH) + DEFERRED_MODULES)
+        first = import_times(app_imports(APP_PATH))
+        print(f"deferred to the first generation job: {sum(deferred.values()) - sum(first.values()):.1f} ms")
+    finally:
+        for name, path in apps.items():
+            if name != "current":
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
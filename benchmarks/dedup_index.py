@@ -0,0 +1,77 @@
+"""거의 같은 질문 검사 속도 - 이전에 내보낸 질문 N개가 쌓인 인덱스에서 후보 질문 하나를 검사하는 시간
+
+질문은 무작위 단어를 이어 붙여 만든다. 후보의 절반은 저장된 질문의 어미와 단어 하나를 바꾼
+변형(거의 같은 질문), 절반은 새 질문이라 검출률과 오검출률도 함께 본다.
+
+    python -m benchmarks.dedup_index --size 100000 --queries 1000
+"""
+
+import argparse
+import random
+import time
+
+from dedup import DEFAULT_DEDUP_SETTINGS, DuplicateFilter, NearDuplicateIndex
+
+# 무작위 음절로 만든 단어 사전 - 새 질문끼리는 단어가 거의 겹치지 않음
+SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 97)]
+ENDINGS = ["편인가요?", "쪽이 더 편한가요?", "것이 자연스러운가요?", "게 좋나요?", "모습에 가까운가요?"]
+
+
+def make_words(rng, count=5000):
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+def random_question(rng, words):
+    return " ".join(rng.choice(words) for _ in range(rng.randint(6, 10))) + " " + rng.choice(ENDINGS)
+
+
+def near_copy(rng, text):
+    """어미만 바꾸고 단어 하나를 빼거나 바꾼 변형"""
+    words = text.split(" ")
+    body, ending = words[:-1], words[-1]
+    while ending == words[-1]:
+        ending = rng.choice(ENDINGS).split(" ")[-1]
+    body[rng.randrange(len(body))] = body[rng.randrange(len(body))]
+    return " ".join(body + [ending])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="인덱스에 쌓을 질문 수")
+    parser.add_argument("--queries", type=int, default=1000, help="검사할 후보 질문 수")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_DEDUP_SETTINGS["threshold"])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = make_words(rng)
+    stored = [random_question(rng, words) for _ in range(args.size)]
+
+    index = NearDuplicateIndex(args.threshold, capacity=args.size)
+    started = time.perf_counter()
+    index.add_many(stored)
+    build_seconds = time.perf_counter() - started
+
+    timings = []
+    caught = flagged = 0
+    for i in range(args.queries):
+        duplicate = i % 2 == 0
+        candidate = near_copy(rng, rng.choice(stored)) if duplicate else random_question(rng, words)
+        started = time.perf_counter()
+        rejected = not DuplicateFilter(index).check(candidate)
+        timings.append(time.perf_counter() - started)
+        if duplicate:
+            caught += rejected
+        else:
+            flagged += rejected
+
+    print(f"index: {len(index):,} questions, {index.nbytes / 1e6:.1f} MB signatures, built in {build_seconds:.1f}s")
+    timings.sort()
+    print(f"check: mean {sum(timings) / len(timings) * 1000:.2f} ms, "
+          f"p50 {timings[len(timings) // 2] * 1000:.2f} ms, p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms")
+    half = args.queries / 2
+    print(f"near copies rejected: {caught / half:.1%}, new questions rejected: {flagged / half:.1%}")
+
+
+if __name__ == "__main__":
+    main()
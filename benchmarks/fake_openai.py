@@ -0,0 +1,171 @@
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from prompts import MODEL_MAX_OUTPUT_TOKENS
+
+
+DIMENSION_LINE = re.compile(r"- (E/I|S/N|T/F|J/P) \([^)]*\): (\d+)개 질문")
+DIMENSION_PROMPT = re.compile(r"(E/I|S/N|T/F|J/P) \([^)]*\) 차원을 판별하기 위한 질문 (\d+)개")
+SET_COUNT = re.compile(r"질문 세트 (\d+)개")
+SYSTEM_TOTAL = re.compile(r"총 (\d+)개")
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 - 한국어는 대략 UTF-8 3바이트당 1토큰"""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def requested_counts(prompt):
+    """프롬프트에서 차원별로 요청한 질문 개수를 읽어냄 - {"E/I": 2, ...}"""
+    match = DIMENSION_PROMPT.search(prompt)
+    if match:
+        return {match.group(1): int(match.group(2))}
+    return {dimension: int(count) for dimension, count in DIMENSION_LINE.findall(prompt)}
+
+
+# 가짜 질문 문장에 쓰는 음절 - serial마다 다른 단어 조합을 만들어 거의 같은 질문 검사(dedup)에 걸리지 않게 함
+SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 97)]
+# 클라이언트를 새로 만들어도 질문이 이전 실행과 겹치지 않도록 프로세스 전체에서 이어지는 번호
+_SERIAL = itertools.count(1)
+
+
+def situation(serial):
+    rng = random.Random(serial)
+    return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) for _ in range(8))
+
+
+def make_question(dimension, serial):
+    """가짜 질문 하나 - serial로 질문 내용이 서로 겹치지 않게 함"""
+    first, second = dimension.split("/")
+    return {
+        "question": f"[{dimension}] #{serial} {situation(serial)} 상황이라면?",
+        "type": dimension,
+        "options": [
+            {"text": f"{first} 성향에 가까운 선택 #{serial}", "type": first},
+            {"text": f"{second} 성향에 가까운 선택 #{serial}", "type": second}
+        ]
+    }
+
+
+def truncate_to_tokens(text, max_tokens):
+    """estimate_tokens 기준으로 max_tokens를 넘는 뒷부분을 잘라냄 - (본문, finish_reason)"""
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text, "stop"
+    return text.encode("utf-8")[:max_tokens * 3].decode("utf-8", errors="ignore"), "length"
+
+
+def max_tokens_error(max_tokens):
+    """실제 API처럼 모델 한도를 넘는 max_tokens를 거절하는 오류 메시지 (문제없으면 None)"""
+    if max_tokens is not None and max_tokens > MODEL_MAX_OUTPUT_TOKENS:
+        return (f"max_tokens is too large: {max_tokens}. This model supports at most "
+                f"{MODEL_MAX_OUTPUT_TOKENS} completion tokens, whereas you provided {max_tokens}.")
+    return None
+
+
+class FakeResponder:
+    """요청 메시지를 보고 그럴듯한 질문 JSON 응답 본문을 만드는 공용 로직
+
+    system_bias: system 프롬프트의 총 개수("총 N개")가 사용자 프롬프트와 다를 때 system 쪽 개수를 따르는
+    확률 - 실제 모델이 서로 어긋난 지시 중 하나를 고르는 상황을 흉내냄
+    """
+
+    def __init__(self, system_bias=0.0, seed=None):
+        self.system_bias = system_bias
+        self._random = random.Random(seed)
+        self._serial = _SERIAL
+        self._lock = threading.Lock()
+
+    def _questions(self, counts):
+        with self._lock:
+            return [
+                make_question(dimension, next(self._serial))
+                for dimension, count in counts.items()
+                for _ in range(count)
+            ]
+
+    def content(self, messages):
+        """응답 본문(JSON 문자열)"""
+        prompt = messages[-1]["content"]
+        counts = requested_counts(prompt)
+
+        match = SYSTEM_TOTAL.search(messages[0]["content"]) if len(messages) > 1 else None
+        if match and int(match.group(1)) != sum(counts.values()) and self._random.random() < self.system_bias:
+            counts = {dimension: int(match.group(1)) // 4 for dimension in counts}
+
+        match = SET_COUNT.search(prompt)
+        if match:
+            sets = [{"questions": self._questions(counts)} for _ in range(int(match.group(1)))]
+            return json.dumps({"sets": sets}, ensure_ascii=False)
+        return json.dumps({"questions": self._questions(counts)}, ensure_ascii=False)
+
+
+class _FakeStream:
+    """stream=True 응답 흉내 - 본문을 조각내어 chunk로 돌려주고, usage가 있으면 마지막에 사용량 chunk를 붙임"""
+
+    def __init__(self, content, chunk_size, delay, usage=None):
+        self._content = content
+        self._chunk_size = chunk_size
+        self._delay = delay
+        self._usage = usage
+
+    def __iter__(self):
+        for i in range(0, len(self._content), self._chunk_size):
+            time.sleep(self._delay)
+            delta = SimpleNamespace(content=self._content[i:i + self._chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        if self._usage is not None:
+            yield SimpleNamespace(choices=[], usage=self._usage)
+
+    def close(self):
+        pass
+
+
+class FakeCompletions:
+    """client.chat.completions 흉내 - 고정 지연 + 출력 토큰당 지연"""
+
+    def __init__(self, latency=0.4, per_token_latency=0.0125, time_scale=1.0, system_bias=0.0, seed=None):
+        self.latency = latency
+        self.per_token_latency = per_token_latency
+        self.time_scale = time_scale
+        self.responder = FakeResponder(system_bias, seed)
+
+    def create(self, model, messages, stream=False, max_tokens=None, stream_options=None, **kwargs):
+        error = max_tokens_error(max_tokens)
+        if error:
+            import httpx
+            import openai
+            request = httpx.Request("POST", "http://fake-openai.invalid/v1/chat/completions")
+            raise openai.BadRequestError(error, response=httpx.Response(400, request=request), body=None)
+        content, finish_reason = truncate_to_tokens(self.responder.content(messages), max_tokens)
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        completion_tokens = estimate_tokens(content)
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                total_tokens=prompt_tokens + completion_tokens)
+
+        if stream:
+            chunk_size = 20
+            chunks = max(1, len(content) // chunk_size)
+            time.sleep(self.latency * self.time_scale)
+            per_chunk = completion_tokens * self.per_token_latency * self.time_scale / chunks
+            include_usage = (stream_options or {}).get("include_usage")
+            return _FakeStream(content, chunk_size, per_chunk, usage if include_usage else None)
+
+        time.sleep((self.latency + completion_tokens * self.per_token_latency) * self.time_scale)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+            usage=usage
+        )
+
+
+class FakeOpenAI:
+    """네트워크 없이 돌아가는 OpenAI 클라이언트 대역"""
+
+    def __init__(self, **kwargs):
+        self.api_key = "fake"
+        self.base_url = "http://fake-openai.invalid/v1"
+        self.chat = SimpleNamespace(completions=FakeCompletions(**kwargs))
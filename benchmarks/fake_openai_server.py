@@ -0,0 +1,266 @@
+"""OpenAI 호환 가짜 서버 - /v1/chat/completions (일반 응답/스트리밍)만 흉내냄
+
+    python -m benchmarks.fake_openai_server --port 8900 --latency 0.8 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fake_openai import FakeResponder, estimate_tokens, max_tokens_error, truncate_to_tokens
+
+
+class FakeOpenAIServer:
+    """지연 시간과 오류율을 조절할 수 있는 로컬 OpenAI 호환 서버
+
+    latency ± jitter 만큼 기다린 뒤 응답하고, 출력 토큰당 per_token_latency가 더해진다.
+    error_rate 확률로 500, rate_limit_rate 확률로 429(Retry-After 포함)를 돌려준다.
+    rpm/tpm을 주면 OpenAI처럼 분당 요청/토큰(프롬프트 + max_tokens) 한도를 burst_seconds 몫의 버킷으로
+    지키며, 모든 응답에 x-ratelimit-* 헤더를 붙이고 넘치면 429와 retry-after-ms를 돌려준다.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.8, jitter=0.2, per_token_latency=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, seed=None, rpm=None, tpm=None, burst_seconds=5.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_token_latency = per_token_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.responder = FakeResponder()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "streamed": 0}
+        # 한도 종류별 [분당 한도, 버킷 크기, 남은 양, 마지막 갱신 시각]
+        self._limits = {
+            kind: [limit, limit * burst_seconds / 60, limit * burst_seconds / 60, time.monotonic()]
+            for kind, limit in (("requests", rpm), ("tokens", tpm)) if limit
+        }
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """현재 스레드에서 서버 실행 (Ctrl+C로 종료)"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _draw(self):
+        """이번 요청의 (결과 종류, 기본 지연 시간)"""
+        with self._lock:
+            roll = self._random.random()
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        if roll < self.error_rate:
+            return "error", delay
+        if roll < self.error_rate + self.rate_limit_rate:
+            return "rate_limit", delay
+        return "ok", delay
+
+    def _admit(self, tokens):
+        """분당 한도 안이면 한도에서 빼고 (True, 헤더), 넘치면 (False, 헤더) - 한도가 없으면 (True, {})"""
+        amounts = {"requests": 1, "tokens": tokens}
+        with self._lock:
+            now = time.monotonic()
+            waits = {}
+            for kind, bucket in self._limits.items():
+                limit, capacity, level, updated = bucket
+                bucket[2] = level = min(capacity, level + (now - updated) * limit / 60)
+                bucket[3] = now
+                waits[kind] = max(0.0, (min(amounts[kind], capacity) - level) * 60 / limit)
+            admitted = all(wait == 0 for wait in waits.values())
+            headers = {}
+            for kind, bucket in self._limits.items():
+                if admitted:
+                    bucket[2] -= amounts[kind]
+                limit, capacity, level, _ = bucket
+                headers[f"x-ratelimit-limit-{kind}"] = str(int(limit))
+                headers[f"x-ratelimit-remaining-{kind}"] = str(max(0, int(level)))
+                headers[f"x-ratelimit-reset-{kind}"] = f"{max(0.0, capacity - level) * 60 / limit:.3f}s"
+            if not admitted:
+                headers["retry-after-ms"] = str(int(max(waits.values()) * 1000) + 1)
+        return admitted, headers
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                    return
+
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                server._count("requests")
+                error = max_tokens_error(request.get("max_tokens"))
+                if error:
+                    server._count("errors")
+                    self._send_json(400, {"error": {"message": error, "type": "invalid_request_error",
+                                                    "param": "max_tokens", "code": "invalid_value"}})
+                    return
+                prompt_tokens = sum(estimate_tokens(message["content"]) for message in request["messages"])
+                admitted, limit_headers = server._admit(prompt_tokens + (request.get("max_tokens") or 0))
+                if not admitted:
+                    server._count("rate_limited")
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                        limit_headers
+                    )
+                    return
+                outcome, delay = server._draw()
+
+                if outcome == "error":
+                    time.sleep(delay)
+                    server._count("errors")
+                    self._send_json(500, {"error": {"message": "fake server error", "type": "server_error"}})
+                    return
+                if outcome == "rate_limit":
+                    server._count("rate_limited")
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                        {"Retry-After": "1"}
+                    )
+                    return
+
+                content, finish_reason = truncate_to_tokens(
+                    server.responder.content(request["messages"]), request.get("max_tokens")
+                )
+                completion_tokens = estimate_tokens(content)
+                created = int(time.time())
+
+                if request.get("stream"):
+                    server._count("streamed")
+                    self._stream(request, content, delay, prompt_tokens, completion_tokens, created)
+                    return
+
+                time.sleep(delay + completion_tokens * server.per_token_latency)
+                self._send_json(200, {
+                    "id": f"chatcmpl-fake-{created}",
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": request.get("model", "gpt-4o-mini"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": finish_reason
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }
+                }, limit_headers)
+
+            def _stream(self, request, content, delay, prompt_tokens, completion_tokens, created):
+                """Server-Sent Events로 본문을 조각내어 전송 - stream_options.include_usage면 마지막에 사용량 chunk"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                time.sleep(delay)
+
+                chunk_size = 20
+                chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+                per_chunk = completion_tokens * server.per_token_latency / max(len(chunks), 1)
+                for piece in chunks:
+                    time.sleep(per_chunk)
+                    event = {
+                        "id": f"chatcmpl-fake-{created}",
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": request.get("model", "gpt-4o-mini"),
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    event = {
+                        "id": f"chatcmpl-fake-{created}",
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": request.get("model", "gpt-4o-mini"),
+                        "choices": [],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens
+                        }
+                    }
+                    self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.8, help="기본 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="지연 시간 흔들림 폭 (초)")
+    parser.add_argument("--per-token-latency", type=float, default=0.0, help="출력 토큰당 추가 지연 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류를 돌려줄 확률")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 오류를 돌려줄 확률")
+    parser.add_argument("--rpm", type=int, help="분당 요청 한도 (없으면 무제한)")
+    parser.add_argument("--tpm", type=int, help="분당 토큰 한도 (없으면 무제한)")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        args.host, args.port, args.latency, args.jitter, args.per_token_latency,
+        args.error_rate, args.rate_limit_rate, rpm=args.rpm, tpm=args.tpm
+    )
+    print(f"가짜 OpenAI 서버 실행 중: {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""헤지 요청 벤치마크 - 지연 시간 꼬리가 긴 가짜 API에서 헤지 전후의 세트 생성 시간 백분위수와 추가 요청 비율
+
+가짜 API의 지연 시간은 대부분 로그정규분포(중앙값 --median초)를 따르고, --tail-rate 확률로
+파레토 분포만큼 몇 배 더 느려진다. 시간은 --time-scale 배로 줄여서 실행하고 원래 단위로 보고한다.
+
+    python -m benchmarks.hedging --sessions 300
+    python -m benchmarks.hedging --percentile 0.95 --max-hedge-rate 0.05
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from hedging import DEFAULT_HEDGING_SETTINGS, HEDGER
+from question_generator import generate_all_questions
+from rate_limiter import RATE_LIMITER
+
+
+class HeavyTailCompletions:
+    """FakeCompletions 앞에 꼬리가 긴 지연 시간을 붙인 래퍼 - 보낸 요청 수도 셈"""
+
+    def __init__(self, completions, median, sigma, tail_rate, tail_alpha, time_scale, seed):
+        self._completions = completions
+        self.median = median
+        self.sigma = sigma
+        self.tail_rate = tail_rate
+        self.tail_alpha = tail_alpha
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def latency(self):
+        with self._lock:
+            self.calls += 1
+            seconds = self.median * self._random.lognormvariate(0, self.sigma)
+            if self._random.random() < self.tail_rate:
+                seconds *= 1 + self._random.paretovariate(self.tail_alpha)
+            return seconds
+
+    def create(self, **kwargs):
+        time.sleep(self.latency() * self.time_scale)
+        return self._completions.create(**kwargs)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(args, settings):
+    HEDGER.configure(settings)
+    client = FakeOpenAI(latency=0.0, per_token_latency=0.0)
+    completions = HeavyTailCompletions(
+        client.chat.completions, args.median, args.sigma, args.tail_rate, args.tail_alpha, args.time_scale, args.seed
+    )
+    client.chat.completions = completions
+
+    timings = []
+    for _ in range(args.sessions):
+        started = time.perf_counter()
+        generate_all_questions(client, args.count, fallback=False)
+        timings.append((time.perf_counter() - started) / args.time_scale)
+
+    timings.sort()
+    return {
+        "p50": percentile(timings, 0.5),
+        "p95": percentile(timings, 0.95),
+        "p99": percentile(timings, 0.99),
+        "mean": sum(timings) / len(timings),
+        "requests": completions.calls / args.sessions,
+        "hedge_rate": HEDGER.hedge_rate()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=300, help="생성할 세트 수")
+    parser.add_argument("--count", type=int, default=20, help="세트당 질문 개수")
+    parser.add_argument("--median", type=float, default=6.0, help="지연 시간 중앙값 (초)")
+    parser.add_argument("--sigma", type=float, default=0.3, help="로그정규분포의 sigma")
+    parser.add_argument("--tail-rate", type=float, default=0.08, help="꼬리로 느려지는 요청의 비율")
+    parser.add_argument("--tail-alpha", type=float, default=1.2, help="꼬리 파레토 분포의 alpha (작을수록 꼬리가 김)")
+    parser.add_argument("--percentile", type=float, default=DEFAULT_HEDGING_SETTINGS["percentile"])
+    parser.add_argument("--max-hedge-rate", type=float, default=DEFAULT_HEDGING_SETTINGS["max_hedge_rate"])
+    parser.add_argument("--time-scale", type=float, default=0.02, help="실제로 기다리는 시간 배율")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # 지연 시간을 --time-scale로 줄여 돌리므로 실제 시간으로 재는 요청 속도 제한은 끔
+    RATE_LIMITER.configure({"enabled": False})
+    print(f"{'hedging':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'mean':>7} {'requests':>9} {'hedged':>7}")
+    try:
+        for enabled in (False, True):
+            result = run(args, {
+                "enabled": enabled,
+                "percentile": args.percentile,
+                "max_hedge_rate": args.max_hedge_rate
+            })
+            print(f"{'on' if enabled else 'off':>8} {result['p50']:>6.2f}s {result['p95']:>6.2f}s {result['p99']:>6.2f}s "
+                  f"{result['mean']:>6.2f}s {result['requests']:>9.3f} {result['hedge_rate']:>7.1%}")
+    finally:
+        HEDGER.configure()
+        RATE_LIMITER.configure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""생성 작업 큐 크기 벤치마크 - 작업자 수별 대기 시간 백분위수, 작업자 사용률, 중복 제거 비율
+
+세션은 평균 --rate개/초로 (포아송 도착) 질문 개수를 골라 시작 버튼을 누르고, 생성 시간은
+로그정규분포(중앙값 --median초)를 따른다. 시간은 --time-scale 배로 줄여서 실행하고 원래 단위로 보고한다.
+
+    python -m benchmarks.job_queue --workers 2 4 8 16
+    python -m benchmarks.job_queue --rate 2 --median 8
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from jobs import JobQueue
+
+QUESTION_COUNTS = [4, 8, 12, 16, 20]
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(args, workers):
+    queue = JobQueue({"max_workers": workers}, name=f"bench-{workers}")
+    rng = random.Random(args.seed)
+    lock = threading.Lock()
+    busy = []
+
+    def generate(seconds):
+        time.sleep(seconds * args.time_scale)
+        with lock:
+            busy.append(seconds)
+
+    arrivals = []
+    finished = {}
+
+    def on_done(job_id):
+        finished[job_id] = time.perf_counter()
+
+    started = time.perf_counter()
+    for _ in range(args.sessions):
+        time.sleep(rng.expovariate(args.rate) * args.time_scale)
+        count = rng.choice(QUESTION_COUNTS)
+        seconds = args.median * rng.lognormvariate(0, args.sigma)
+        job_id = queue.submit(generate, seconds, key=(count, "v2"))
+        if job_id not in finished:
+            finished[job_id] = None
+            queue.future(job_id).add_done_callback(lambda _, job_id=job_id: on_done(job_id))
+        arrivals.append((job_id, time.perf_counter()))
+
+    for job_id in finished:
+        queue.result(job_id)
+    elapsed = (time.perf_counter() - started) / args.time_scale
+
+    # 세션마다 시작 버튼을 누른 뒤 질문을 받을 때까지 걸린 시간 (공유한 작업은 끝난 시각이 같음)
+    waits = [(finished[job_id] - at) / args.time_scale for job_id, at in arrivals]
+    waits.sort()
+    return {
+        "p50": percentile(waits, 0.5),
+        "p95": percentile(waits, 0.95),
+        "utilization": sum(busy) / (workers * elapsed),
+        "shared": 1 - len(finished) / args.sessions
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16], help="비교할 작업자 수")
+    parser.add_argument("--sessions", type=int, default=400, help="시작 버튼을 누르는 세션 수")
+    parser.add_argument("--rate", type=float, default=1.0, help="초당 평균 세션 도착 수")
+    parser.add_argument("--median", type=float, default=6.0, help="생성 시간 중앙값 (초)")
+    parser.add_argument("--sigma", type=float, default=0.4, help="로그정규분포의 sigma")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="실제로 기다리는 시간 배율")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'p50':>8} {'p95':>8} {'util':>6} {'shared':>7}")
+    for workers in args.workers:
+        result = run(args, workers)
+        print(f"{workers:>8} {result['p50']:>7.2f}s {result['p95']:>7.2f}s "
+              f"{result['utilization']:>6.1%} {result['shared']:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""streamlit_app.py 부하 테스트 - 가짜 OpenAI 서버를 띄우고 AppTest로 N개 세션이 테스트 전체를 진행
+
+각 세션은 시작 화면 → "🚀 테스트 시작하기" → option_a/option_b로 모든 질문에 답변 → 결과 화면
+순서로 진행하며, 재실행(rerun)당 스크립트 시간, 첫 질문까지 걸린 시간, 전체 소요 시간 p50/p99,
+세션당 메모리(RSS 증가량)를 보고한다. 세션들은 한 서버 프로세스처럼 같은 프로세스의 스레드에서 진행한다.
+AppTest는 실행마다 전역 상태(st.secrets, Runtime, 스크립트 컴파일)를 건드리므로 스크립트 실행은 한 번에
+하나씩만 하고(생성 작업과 API 대기는 그동안에도 백그라운드에서 겹쳐 진행됨), secrets는 시작 전에 한 번만 설정한다.
+
+    python -m benchmarks.load_test --sessions 20 --concurrency 10   # 새 프로세스에서 3번 실행한 중앙값 (--repeat)
+    python -m benchmarks.load_test --sessions 20 --save-baseline     # 기준값 저장
+    python -m benchmarks.load_test --sessions 20 --check-baseline    # 기준값 대비 회귀 확인
+    python -m benchmarks.load_test --cassette runs/load.jsonl.gz        # 녹화본 재생 (가짜 서버 대신)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.session_memory import rss_bytes
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_test.json")
+START_LABEL = "🚀 테스트 시작하기"
+# 첫 질문이나 다음 질문을 기다리며 다시 실행하는 간격 (브라우저의 fragment 갱신처럼)
+POLL_INTERVAL = 0.05
+
+# AppTest 실행을 한 번에 하나씩 - 동시에 실행하면 전역 Runtime/secrets가 섞이고 파이썬 3.11의 ast.parse가 깨짐
+_RUN_LOCK = threading.Lock()
+
+# 기준값 비교 대상 (모두 낮을수록 좋음)
+TRACKED_METRICS = [
+    "rerun_ms_p50", "rerun_ms_p99",
+    "time_to_first_question_s_p50", "time_to_first_question_s_p99",
+    "end_to_end_s_p50", "end_to_end_s_p99",
+    "memory_per_session_kb"
+]
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def has_button(at, key):
+    return any(button.key == key for button in at.button)
+
+
+def timed_run(at, rerun_times):
+    """스크립트를 한 번 실행하고 걸린 시간을 기록 (다른 세션의 실행을 기다린 시간은 빼고)"""
+    with _RUN_LOCK:
+        started = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - started)
+    if at.exception:
+        raise RuntimeError(f"스크립트 오류: {at.exception[0].message}")
+
+
+def app_secrets(base_url, args):
+    """모든 세션이 함께 쓰는 secrets.toml 내용"""
+    secrets = {
+        "openai": {"API_KEY": "fake-key", "BASE_URL": base_url},
+        "generation": {"mode": args.mode}
+    }
+    if args.cassette:
+        secrets["cassette"] = {"path": args.cassette, "mode": args.cassette_mode, "latency_scale": args.latency_scale,
+                               "fuzzy": args.cassette_fuzzy}
+    return secrets
+
+
+def install_secrets(secrets):
+    """전역 st.secrets를 바꾸고 원래 값을 반환 - 세션마다 at.secrets를 주면 AppTest가 실행마다 전역 값을
+    바꿨다 되돌리므로, 동시에 진행하는 다른 세션이 빈 secrets를 보게 됨"""
+    saved = st.secrets
+    installed = Secrets()
+    installed._secrets = secrets
+    st.secrets = installed
+    return saved
+
+
+def run_session(args, seed):
+    """한 세션의 전체 흐름을 진행하고 (측정값, AppTest) 반환"""
+    rng = random.Random(seed)
+    rerun_times = []
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    at.session_state["question_count"] = args.count
+
+    session_started = time.perf_counter()
+    timed_run(at, rerun_times)
+
+    start_button = next(button for button in at.sidebar.button if button.label == START_LABEL)
+    start_clicked = time.perf_counter()
+    start_button.click()
+    timed_run(at, rerun_times)
+
+    # 첫 질문이 보일 때까지 (생성 작업을 기다리는 동안 몇 번 더 실행됨)
+    deadline = start_clicked + args.timeout
+    while not has_button(at, "option_a") and not at.session_state["test_completed"]:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("첫 질문이 표시되지 않습니다")
+        time.sleep(POLL_INTERVAL)
+        timed_run(at, rerun_times)
+    time_to_first_question = time.perf_counter() - start_clicked
+
+    answered = 0
+    deadline = time.perf_counter() + args.timeout
+    while not at.session_state["test_completed"]:
+        if answered > args.count * 3 or time.perf_counter() > deadline:
+            raise RuntimeError("테스트가 끝나지 않습니다")
+        if has_button(at, "option_a"):
+            at.button(key=rng.choice(["option_a", "option_b"])).click()
+            answered += 1
+        else:
+            time.sleep(POLL_INTERVAL)
+        timed_run(at, rerun_times)
+
+    if not any("테스트 완료" in markdown.value for markdown in at.markdown):
+        raise RuntimeError("결과 화면이 표시되지 않았습니다")
+
+    return {
+        "rerun_times": rerun_times,
+        "time_to_first_question": time_to_first_question,
+        "end_to_end": time.perf_counter() - session_started
+    }, at
+
+
+def run_load_test(args):
+    server = FakeOpenAIServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    ).start()
+
+    saved_secrets = install_secrets(app_secrets(server.base_url, args))
+    results, apps, errors = [], [], []
+    try:
+        # 처음 한 번 불러오는 모듈(openai 등)과 공용 자원이 세션당 메모리에 섞이지 않도록 세지 않는 세션을 먼저 진행
+        run_session(args, args.seed - 1)
+        memory_before = rss_bytes()
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            futures = [executor.submit(run_session, args, args.seed + i) for i in range(args.sessions)]
+            for future in futures:
+                try:
+                    result, at = future.result()
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    continue
+                results.append(result)
+                apps.append(at)
+    finally:
+        st.secrets = saved_secrets
+
+    # 끝난 세션(AppTest)을 모두 붙잡아 둔 상태에서 측정
+    memory_after = rss_bytes()
+    # AppTest는 같은 프로세스에서 실행되므로 앱이 만든 공용 연결의 풀 사용량을 그대로 읽을 수 있음
+    from openai_client import connection_health
+    connections = connection_health()
+    server.stop()
+
+    rerun_ms = [seconds * 1000 for result in results for seconds in result["rerun_times"]]
+    first_question = [result["time_to_first_question"] for result in results]
+    end_to_end = [result["end_to_end"] for result in results]
+
+    return {
+        "sessions": args.sessions,
+        "completed": len(results),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "reruns": len(rerun_ms),
+        "rerun_ms_p50": percentile(rerun_ms, 50),
+        "rerun_ms_p99": percentile(rerun_ms, 99),
+        "time_to_first_question_s_p50": percentile(first_question, 50),
+        "time_to_first_question_s_p99": percentile(first_question, 99),
+        "end_to_end_s_p50": percentile(end_to_end, 50),
+        "end_to_end_s_p99": percentile(end_to_end, 99),
+        "memory_per_session_kb": (memory_after - memory_before) / max(len(apps), 1) / 1024,
+        "server": dict(server.stats),
+        "connections": connections
+    }
+
+
+def baseline_key(args):
+    return f"{args.mode}-q{args.count}-s{args.sessions}-c{args.concurrency}"
+
+
+def check_baseline(report, args):
+    """저장된 기준값보다 tolerance 이상 나빠진 지표 목록"""
+    if not os.path.exists(BASELINE_PATH):
+        return None
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        baseline = json.load(f).get(baseline_key(args))
+    if baseline is None:
+        return None
+
+    regressions = []
+    for metric in TRACKED_METRICS:
+        before, after = baseline.get(metric), report.get(metric)
+        if before and after and after > before * (1 + args.tolerance):
+            regressions.append(f"{metric}: {before:.2f} → {after:.2f}")
+    return regressions
+
+
+def save_baseline(report, args):
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baselines = json.load(f)
+    baselines[baseline_key(args)] = {metric: report[metric] for metric in TRACKED_METRICS}
+
+    os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def run_child():
+    """새 프로세스에서 한 번 실행한 보고서 - 앞선 실행이 남긴 메모리와 캐시가 다음 실행에 섞이지 않도록"""
+    argv = [arg for arg in sys.argv[1:] if arg not in ("--save-baseline", "--check-baseline")]
+    command = [sys.executable, "-m", "benchmarks.load_test", *argv, "--child"]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="진행할 세션 수")
+    parser.add_argument("--concurrency", type=int, default=5, help="동시에 진행하는 세션 수")
+    parser.add_argument("--count", type=int, default=8, choices=[4, 8, 12, 16, 20], help="세션당 질문 개수")
+    parser.add_argument("--mode", default="single", help="[generation] mode 설정값")
+    parser.add_argument("--latency", type=float, default=0.8, help="가짜 서버 기본 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="가짜 서버 지연 흔들림 폭 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 서버 500 오류 확률")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="가짜 서버 429 오류 확률")
+    parser.add_argument("--timeout", type=float, default=60.0, help="스크립트 한 번 실행의 제한 시간 (초)")
+    parser.add_argument("--cassette", help="앱이 녹화/재생할 카세트 파일 경로")
+    parser.add_argument("--cassette-mode", default="replay", choices=["record", "replay"])
+    parser.add_argument("--cassette-fuzzy", action="store_true", help="녹화되지 않은 요청을 비슷한 녹화 응답으로 재생")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="카세트 재생 지연 시간 배율")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--check-baseline", action="store_true", help="기준값 대비 회귀가 있으면 종료 코드 1")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 판단할 악화 비율")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 실행 횟수 - 기준값 비교 지표는 중앙값을 씀")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_load_test(args), ensure_ascii=False))
+        return
+
+    reports = [run_child() for _ in range(args.repeat)]
+    report = reports[-1]
+    for metric in TRACKED_METRICS:
+        values = [run[metric] for run in reports if run[metric] is not None]
+        report[metric] = statistics.median(values) if values else None
+    report["errors"] = sum(run["errors"] for run in reports)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.save_baseline:
+        save_baseline(report, args)
+        print(f"기준값 저장: {BASELINE_PATH} [{baseline_key(args)}]")
+
+    if args.check_baseline:
+        regressions = check_baseline(report, args)
+        if regressions is None:
+            print(f"기준값이 없습니다: [{baseline_key(args)}]")
+        elif regressions:
+            print("⚠️ 성능 회귀:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        else:
+            print("✅ 기준값 대비 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""질문 개수별 프롬프트 벤치마크 - 프롬프트 버전마다 첫 시도 성공률과 세트당 평균 요청 수
+
+가짜 클라이언트는 system 프롬프트의 총 개수가 사용자 프롬프트와 어긋나면 --system-bias 확률로
+system 쪽 개수를 따른다 (v1은 8개로 고정되어 있어 8개 외의 요청에서 어긋남).
+--live면 실제 API로 같은 비교를 한다.
+
+    python -m benchmarks.prompt_counts --sessions 50
+    python -m benchmarks.prompt_counts --live --sessions 5   # OPENAI_API_KEY 필요
+"""
+
+import argparse
+import os
+
+from benchmarks.fake_openai import FakeOpenAI
+from prompts import PROMPT_VERSIONS, max_tokens_for, use_prompt_version
+from question_generator import generate_all_questions
+from rate_limiter import RATE_LIMITER
+
+QUESTION_OPTIONS = [4, 8, 12, 16, 20]
+
+
+class CountingCompletions:
+    """chat.completions.create 호출 수를 세는 래퍼"""
+
+    def __init__(self, completions):
+        self._completions = completions
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return self._completions.create(**kwargs)
+
+
+def run(client, question_count, sessions):
+    """sessions번 생성하여 (첫 시도 성공률, 세트당 평균 요청 수, 기본 질문으로 끝난 비율)"""
+    counting = CountingCompletions(client.chat.completions)
+    original, client.chat.completions = client.chat.completions, counting
+    first_try = failed = 0
+    try:
+        for _ in range(sessions):
+            before = counting.calls
+            questions = generate_all_questions(client, question_count, fallback=False)
+            if questions is None:
+                failed += 1
+            elif counting.calls - before == 1:
+                first_try += 1
+    finally:
+        client.chat.completions = original
+    return first_try / sessions, counting.calls / sessions, failed / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=QUESTION_OPTIONS, help="질문 개수")
+    parser.add_argument("--versions", nargs="+", default=list(PROMPT_VERSIONS), help="비교할 프롬프트 버전")
+    parser.add_argument("--sessions", type=int, default=50, help="조합마다 생성할 세트 수")
+    parser.add_argument("--system-bias", type=float, default=0.5, help="가짜 클라이언트가 어긋난 system 개수를 따를 확률")
+    parser.add_argument("--live", action="store_true", help="가짜 클라이언트 대신 실제 OpenAI API 사용")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.live:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+    else:
+        client = FakeOpenAI(latency=0.0, per_token_latency=0.0, system_bias=args.system_bias, seed=args.seed)
+        # 가짜 클라이언트는 지연 없이 응답하므로 요청 속도 제한은 끔 (실제 한도에 맞춘 대기만 재게 됨)
+        RATE_LIMITER.configure({"enabled": False})
+
+    print(f"{'version':>7} {'count':>5} {'max_tokens':>10} {'first try':>10} {'attempts':>9} {'failed':>7}")
+    try:
+        for version in args.versions:
+            use_prompt_version(version)
+            for question_count in args.counts:
+                first_try, attempts, failed = run(client, question_count, args.sessions)
+                print(f"{version:>7} {question_count:>5} {max_tokens_for(question_count):>10} "
+                      f"{first_try:>10.0%} {attempts:>9.2f} {failed:>7.0%}")
+    finally:
+        use_prompt_version(None)
+        RATE_LIMITER.configure()
+
+
+if __name__ == "__main__":
+    main()
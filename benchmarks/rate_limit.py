@@ -0,0 +1,90 @@
+"""요청 스케줄러 벤치마크 - 분당 한도가 있는 가짜 서버에 세션이 한꺼번에 몰릴 때 스케줄러 전후 비교
+
+가짜 서버는 OpenAI처럼 분당 요청/토큰 한도를 지키고 x-ratelimit-* 헤더를 붙이며, 넘치면 429를 돌려준다.
+세션마다 generate_all_questions를 동시에 실행해 429 수, API로 세트를 받은 세션 비율, 세트 생성 시간과
+그중 스케줄러에서 기다린 시간을 보고한다.
+
+    python -m benchmarks.rate_limit --sessions 40
+    python -m benchmarks.rate_limit --tpm 300000 --rpm 200
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from circuit_breaker import OPENAI_BREAKER
+from metrics import METRICS
+from openai_client import OpenAIConnection
+from question_generator import generate_all_questions
+from rate_limiter import RATE_LIMITER, request_owner
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def queue_seconds():
+    """지금까지 openai_queue_seconds에 쌓인 (합, 횟수)"""
+    summary = METRICS.snapshot()["summaries"].get('openai_queue_seconds{operation="generate_all_questions"}', {})
+    return summary.get("sum", 0.0), summary.get("count", 0)
+
+
+def run(args, enabled):
+    RATE_LIMITER.configure({"enabled": enabled})
+    OPENAI_BREAKER.record_success()
+    queued_before, calls_before = queue_seconds()
+
+    with FakeOpenAIServer(latency=args.latency, jitter=args.latency / 4, seed=args.seed,
+                          rpm=args.rpm, tpm=args.tpm, burst_seconds=args.burst_seconds) as server:
+        connection = OpenAIConnection("fake-key", base_url=server.base_url)
+        timings = [None] * args.sessions
+
+        def session(index):
+            with request_owner(f"session-{index}"):
+                started = time.perf_counter()
+                questions = generate_all_questions(connection.client, args.count, fallback=False)
+                timings[index] = (time.perf_counter() - started, questions is not None)
+
+        threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = dict(server.stats)
+
+    queued, calls = queue_seconds()
+    seconds = sorted(timing[0] for timing in timings)
+    return {
+        "rate_limited": stats["rate_limited"],
+        "requests": stats["requests"],
+        "succeeded": sum(1 for timing in timings if timing[1]) / args.sessions,
+        "p50": percentile(seconds, 0.5),
+        "p95": percentile(seconds, 0.95),
+        "queue": (queued - queued_before) / max(calls - calls_before, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40, help="동시에 시작하는 세션 수")
+    parser.add_argument("--count", type=int, default=8, help="세트당 질문 개수")
+    parser.add_argument("--rpm", type=int, default=300, help="가짜 서버의 분당 요청 한도")
+    parser.add_argument("--tpm", type=int, default=120000, help="가짜 서버의 분당 토큰 한도")
+    parser.add_argument("--burst-seconds", type=float, default=5.0, help="가짜 서버가 한꺼번에 받아 주는 양 (초)")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 서버의 응답 지연 (초)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'scheduler':>9} {'429s':>6} {'requests':>9} {'api sets':>9} {'p50':>7} {'p95':>7} {'queue':>7}")
+    try:
+        for enabled in (False, True):
+            result = run(args, enabled)
+            print(f"{'on' if enabled else 'off':>9} {result['rate_limited']:>6} {result['requests']:>9} "
+                  f"{result['succeeded']:>9.0%} {result['p50']:>6.1f}s {result['p95']:>6.1f}s {result['queue']:>6.2f}s")
+    finally:
+        RATE_LIMITER.configure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""재실행(rerun)마다 브라우저로 보내는 화면 요소 크기 측정 - 시작/질문/결과 화면별 평균 바이트
+
+각 재실행의 화면 요소(proto)를 직렬화한 크기의 합을 웹소켓 델타 크기로 본다.
+--compare로 다른 커밋의 streamlit_app.py를 같은 흐름으로 돌려 전후를 비교할 수 있다.
+(이전 버전 스크립트도 현재 트리의 모듈을 import 하므로 화면 코드의 차이만 비교된다)
+
+    python -m benchmarks.rerun_payload
+    python -m benchmarks.rerun_payload --compare HEAD~1
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.load_test import APP_PATH, START_LABEL, has_button
+
+
+def tree_bytes(node):
+    """화면 요소 트리의 직렬화 크기 합"""
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if proto is not None else 0
+    for child in getattr(node, "children", {}).values():
+        size += tree_bytes(child)
+    return size
+
+
+def rerun_bytes(at):
+    return tree_bytes(at.main) + tree_bytes(at.sidebar)
+
+
+def measure(app_path, args):
+    """한 세션을 끝까지 진행하며 화면별 재실행당 바이트 목록을 모음"""
+    rng = random.Random(args.seed)
+    phases = {"start": [], "question": [], "result": []}
+
+    with FakeOpenAIServer(latency=0.0, jitter=0.0, seed=args.seed) as server:
+        at = AppTest.from_file(app_path, default_timeout=args.timeout)
+        at.secrets["openai"] = {"API_KEY": "fake-key", "BASE_URL": server.base_url}
+        at.secrets["generation"] = {"mode": "single"}
+        at.session_state["question_count"] = args.count
+
+        at.run()
+        phases["start"].append(rerun_bytes(at))
+
+        next(button for button in at.sidebar.button if button.label == START_LABEL).click()
+        at.run()
+        while not at.session_state["test_completed"]:
+            if has_button(at, "option_a"):
+                phases["question"].append(rerun_bytes(at))
+                at.button(key=rng.choice(["option_a", "option_b"])).click()
+            at.run()
+
+        # 결과 화면은 표시된 뒤 한 번 더 재실행 (버튼 클릭 등)
+        phases["result"].append(rerun_bytes(at))
+        at.run()
+        phases["result"].append(rerun_bytes(at))
+
+    return phases
+
+
+def summarize(phases):
+    summary = {phase: sum(sizes) / len(sizes) for phase, sizes in phases.items() if sizes}
+    all_sizes = [size for sizes in phases.values() for size in sizes]
+    summary["session_total"] = sum(all_sizes)
+    return summary
+
+
+def app_at(ref):
+    """ref 커밋의 streamlit_app.py를 같은 디렉터리의 임시 파일로 꺼냄 (호출한 쪽에서 삭제)"""
+    source = subprocess.run(
+        ["git", "show", f"{ref}:streamlit_app.py"],
+        cwd=os.path.dirname(APP_PATH), check=True, capture_output=True
+    ).stdout
+    fd, path = tempfile.mkstemp(prefix=".rerun_payload_", suffix=".py", dir=os.path.dirname(APP_PATH))
+    with os.fdopen(fd, "wb") as f:
+        f.write(source)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=8, choices=[4, 8, 12, 16, 20], help="질문 개수")
+    parser.add_argument("--compare", help="비교할 이전 커밋 (예: HEAD~1)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="스크립트 한 번 실행의 제한 시간 (초)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = {"current": summarize(measure(APP_PATH, args))}
+    if args.compare:
+        path = app_at(args.compare)
+        try:
+            results[args.compare] = summarize(measure(path, args))
+        finally:
+            os.remove(path)
+
+    columns = list(results)
+    print(f"{'bytes/rerun':<14}" + "".join(f"{name:>14}" for name in columns))
+    for phase in ["start", "question", "result", "session_total"]:
+        print(f"{phase:<14}" + "".join(f"{results[name].get(phase, 0):>14.0f}" for name in columns))
+
+
+if __name__ == "__main__":
+    main()
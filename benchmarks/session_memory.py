@@ -0,0 +1,111 @@
+"""세션 상태 메모리 벤치마크 - 세션 1,000개가 들고 있는 질문/답변의 메모리를 예전 방식과 비교
+
+예전 방식은 세션마다 질문 dict 목록, 답변 글자 목록, 답한 질문 번호 목록을 들고 있다. 지금 방식은
+질문 세트를 공용 캐시(QUESTION_SETS)에 한 번만 두고, 세션은 세트 ID와 답변 비트 두 개만 들고 있다.
+--shared는 대체 경로의 기본 질문처럼 같은 내용의 세트를 받는 세션의 비율이다. 나머지 세션은 저마다
+다른 세트를 받는다. 방식마다 새 프로세스에서 잰 파이썬 힙 증가량(tracemalloc)과 RSS 증가량을 보고하며,
+tracemalloc이 RSS를 늘리므로 RSS는 추적하지 않는 별도 프로세스에서 잰다.
+
+    python -m benchmarks.session_memory
+    python -m benchmarks.session_memory --shared 0 0.3 1.0 --count 20
+"""
+
+import argparse
+import gc
+import json
+import random
+import subprocess
+import sys
+import tracemalloc
+
+from adaptive import pack_answer
+from question_generator import get_default_questions
+from question_sets import QUESTION_SETS
+
+
+def rss_bytes():
+    """현재 RSS (리눅스의 /proc이 없으면 0)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * 4096
+    except OSError:
+        return 0
+
+
+def session_questions(index, count, shared, rng):
+    """세션 하나가 받는 질문 세트 - 생성되거나 저장소에서 읽혀 세션마다 새로 만들어진 dict 목록"""
+    questions = get_default_questions(count)
+    if rng.random() < shared:
+        return json.loads(json.dumps(questions, ensure_ascii=False))
+    return [
+        {**q, "question": f"{q['question']} ({index}-{number})"}
+        for number, q in enumerate(json.loads(json.dumps(questions, ensure_ascii=False)))
+    ]
+
+
+def build(layout, args, shared):
+    rng = random.Random(args.seed)
+    sessions = []
+    for index in range(args.sessions):
+        questions = session_questions(index, args.count, shared, rng)
+        letters = [rng.choice(q["options"])["type"] for q in questions]
+        if layout == "before":
+            sessions.append({"all_questions": questions, "answers": letters, "asked_questions": list(range(args.count))})
+        else:
+            answers = asked = 0
+            for number, (q, letter) in enumerate(zip(questions, letters)):
+                answers, asked = pack_answer(answers, asked, number, q["type"], letter)
+            sessions.append({"question_set": QUESTION_SETS.intern(questions), "answers": answers, "asked_questions": asked})
+    return sessions
+
+
+def child(args):
+    """새 프로세스에서 한 방식의 세션을 만들고 늘어난 메모리(--trace면 힙, 아니면 RSS)를 JSON으로 출력"""
+    QUESTION_SETS.configure({"capacity": args.sessions})
+    gc.collect()
+    rss_before = rss_bytes()
+    if args.trace:
+        tracemalloc.start()
+    sessions = build(args.child, args, args.child_shared)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] if args.trace else rss_bytes() - rss_before
+    print(json.dumps({"bytes": used, "sets": len(QUESTION_SETS), "sessions": len(sessions)}))
+
+
+def measure(layout, args, shared, trace):
+    command = [sys.executable, "-m", "benchmarks.session_memory", "--child", layout, "--child-shared", str(shared),
+               "--sessions", str(args.sessions), "--count", str(args.count), "--seed", str(args.seed)]
+    if trace:
+        command.append("--trace")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000, help="세션 수")
+    parser.add_argument("--count", type=int, default=8, help="세트당 질문 개수")
+    parser.add_argument("--shared", type=float, nargs="+", default=[0.0, 0.5, 1.0], help="같은 세트를 받는 세션 비율")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-shared", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    per = 1000 / args.sessions
+    print(f"{'shared':>6} {'layout':>7} {'sets':>6} {'heap/1k':>10} {'rss/1k':>10}")
+    for shared in args.shared:
+        for layout in ("before", "after"):
+            heap = measure(layout, args, shared, trace=True)
+            rss = measure(layout, args, shared, trace=False)
+            sets = heap["sets"] if layout == "after" else args.sessions
+            print(f"{shared:>6.0%} {layout:>7} {sets:>6} {heap['bytes'] * per / 1e6:>8.2f}MB "
+                  f"{rss['bytes'] * per / 1e6:>8.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+import anyio
+import httpx
+
+
+# 재생할 때 다시 계산되거나 의미가 없어지는 헤더는 저장하지 않음
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "date", "set-cookie"}
+
+
+class CassetteMiss(httpx.TransportError):
+    """재생 모드에서 요청에 맞는 녹화 응답이 카세트에 없을 때"""
+
+
+def request_key(request):
+    """요청 본문을 정규화한 해시 - 같은 프롬프트/파라미터의 요청은 같은 키"""
+    try:
+        body = json.dumps(json.loads(request.content or b"{}"), sort_keys=True, ensure_ascii=False)
+    except ValueError:
+        body = request.content.decode("utf-8", "replace")
+    digest = hashlib.sha256(f"{request.method} {request.url.path} {body}".encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def _is_stream_request(request):
+    try:
+        return bool(json.loads(request.content or b"{}").get("stream"))
+    except ValueError:
+        return False
+
+
+class Cassette:
+    """OpenAI 요청/응답 쌍과 응답 시간을 담는 카세트 파일 (gzip JSON Lines)
+
+    mode="record"면 실제 요청을 그대로 보내면서 응답을 파일에 덧붙이고, mode="replay"면
+    네트워크 없이 녹화된 응답을 원래 시간(또는 latency_scale배)에 맞춰 돌려준다.
+    같은 키의 요청이 여러 번 녹화되어 있으면 녹화된 순서대로 돌아가며 재생한다.
+    녹화되지 않은 요청은 CassetteMiss로 실패하며, fuzzy=True일 때만 같은 종류의 다른 응답으로 대신한다.
+    """
+
+    def __init__(self, path, mode="replay", latency_scale=1.0, fuzzy=False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"알 수 없는 카세트 모드: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.fuzzy = fuzzy
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(list)
+        self._by_shape = defaultdict(list)
+        self._cursors = defaultdict(int)
+        self.stats = {"recorded": 0, "replayed": 0, "fuzzy_matches": 0}
+
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._by_key[entry["key"]].append(entry)
+                    self._by_shape[entry["stream"]].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._by_key.values())
+
+    def record(self, entry):
+        """녹화 항목 하나를 파일 끝에 덧붙임"""
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+            self.stats["recorded"] += 1
+
+    def lookup(self, request):
+        """요청에 맞는 녹화 항목 - 키가 정확히 같은 항목이 없으면 CassetteMiss
+
+        fuzzy=True면 대신 같은 종류(스트리밍 여부)의 항목을 순서대로 돌려주고 fuzzy_matches에 센다.
+        """
+        key = request_key(request)
+        with self._lock:
+            entries = self._by_key.get(key)
+            if not entries:
+                stream = _is_stream_request(request)
+                entries = self._by_shape.get(stream) if self.fuzzy else None
+                if not entries:
+                    raise CassetteMiss(f"카세트에 맞는 응답이 없습니다: {request.url.path} (key={key})")
+                key = ("shape", stream)
+                self.stats["fuzzy_matches"] += 1
+
+            entry = entries[self._cursors[key] % len(entries)]
+            self._cursors[key] += 1
+            self.stats["replayed"] += 1
+            return entry
+
+    def wrap(self, transport):
+        """동기 httpx 전송 계층을 모드에 맞게 감쌈 (재생 모드에서는 transport를 쓰지 않음)"""
+        return RecordingTransport(transport, self) if self.mode == "record" else ReplayTransport(self)
+
+    def wrap_async(self, transport):
+        """비동기 httpx 전송 계층을 모드에 맞게 감쌈"""
+        return AsyncRecordingTransport(transport, self) if self.mode == "record" else AsyncReplayTransport(self)
+
+
+def _entry(request, response, elapsed):
+    return {
+        "key": request_key(request),
+        "path": request.url.path,
+        "stream": _is_stream_request(request),
+        "status": response.status_code,
+        "headers": [[name, value] for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS],
+        "elapsed": round(elapsed, 4)
+    }
+
+
+def _replay_response(request, entry, stream):
+    return httpx.Response(entry["status"], headers=entry["headers"], stream=stream, request=request)
+
+
+class _ChunkLog:
+    """스트리밍 응답 조각을 (도착 시각, 텍스트)로 모음
+
+    조각 경계에서 잘린 멀티바이트 글자(한국어 등)는 다음 조각과 합쳐 디코딩하므로, 재생할 때 다시 인코딩한
+    바이트가 녹화한 바이트와 같다 (글자가 걸친 조각 경계만 글자 뒤로 옮겨짐).
+    """
+
+    def __init__(self, started):
+        self._started = started
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.chunks = []
+
+    def add(self, chunk):
+        text = self._decoder.decode(chunk)
+        if text:
+            self.chunks.append([round(time.perf_counter() - self._started, 4), text])
+
+    def finish(self):
+        text = self._decoder.decode(b"", final=True)
+        if text:
+            self.chunks.append([round(time.perf_counter() - self._started, 4), text])
+        return self.chunks
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """스트리밍 응답 조각과 도착 시각을 모았다가 닫힐 때 카세트에 기록"""
+
+    def __init__(self, stream, cassette, entry, started):
+        self._stream = stream
+        self._cassette = cassette
+        self._entry = entry
+        self._log = _ChunkLog(started)
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._log.add(chunk)
+            yield chunk
+
+    def close(self):
+        self._stream.close()
+        if self._entry is not None:
+            self._entry["chunks"] = self._log.finish()
+            self._cassette.record(self._entry)
+            self._entry = None
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    """_RecordingStream의 비동기 버전"""
+
+    def __init__(self, stream, cassette, entry, started):
+        self._stream = stream
+        self._cassette = cassette
+        self._entry = entry
+        self._log = _ChunkLog(started)
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._log.add(chunk)
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+        if self._entry is not None:
+            self._entry["chunks"] = self._log.finish()
+            self._cassette.record(self._entry)
+            self._entry = None
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    """녹화된 조각을 녹화 당시 간격(latency_scale배)에 맞춰 돌려줌"""
+
+    def __init__(self, chunks, offset, latency_scale):
+        self._chunks = chunks
+        self._offset = offset
+        self._latency_scale = latency_scale
+
+    def __iter__(self):
+        previous = self._offset
+        for at, text in self._chunks:
+            time.sleep(max(0.0, at - previous) * self._latency_scale)
+            previous = at
+            yield text.encode("utf-8")
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    """_ReplayStream의 비동기 버전"""
+
+    def __init__(self, chunks, offset, latency_scale):
+        self._chunks = chunks
+        self._offset = offset
+        self._latency_scale = latency_scale
+
+    async def __aiter__(self):
+        previous = self._offset
+        for at, text in self._chunks:
+            await anyio.sleep(max(0.0, at - previous) * self._latency_scale)
+            previous = at
+            yield text.encode("utf-8")
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """실제 전송 계층으로 요청을 보내고 응답을 카세트에 녹화"""
+
+    def __init__(self, transport, cassette):
+        self._transport = transport
+        self._cassette = cassette
+
+    def handle_request(self, request):
+        # 녹화본을 그대로 재생할 수 있도록 압축 없이 받음
+        request.headers["Accept-Encoding"] = "identity"
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        entry = _entry(request, response, time.perf_counter() - started)
+
+        if entry["stream"] and response.status_code == 200:
+            response.stream = _RecordingStream(response.stream, self._cassette, entry, started)
+            return response
+
+        body = response.read()
+        response.close()
+        entry["body"] = body.decode("utf-8", "replace")
+        entry["duration"] = round(time.perf_counter() - started, 4)
+        self._cassette.record(entry)
+        return httpx.Response(response.status_code, headers=entry["headers"], content=body, request=request)
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """RecordingTransport의 비동기 버전"""
+
+    def __init__(self, transport, cassette):
+        self._transport = transport
+        self._cassette = cassette
+
+    async def handle_async_request(self, request):
+        request.headers["Accept-Encoding"] = "identity"
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        entry = _entry(request, response, time.perf_counter() - started)
+
+        if entry["stream"] and response.status_code == 200:
+            response.stream = _AsyncRecordingStream(response.stream, self._cassette, entry, started)
+            return response
+
+        body = await response.aread()
+        await response.aclose()
+        entry["body"] = body.decode("utf-8", "replace")
+        entry["duration"] = round(time.perf_counter() - started, 4)
+        self._cassette.record(entry)
+        return httpx.Response(response.status_code, headers=entry["headers"], content=body, request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """네트워크 없이 카세트의 응답을 녹화 당시 지연 시간에 맞춰 돌려줌"""
+
+    def __init__(self, cassette):
+        self._cassette = cassette
+
+    def handle_request(self, request):
+        entry = self._cassette.lookup(request)
+        scale = self._cassette.latency_scale
+        time.sleep(entry["elapsed"] * scale)
+
+        if "chunks" in entry:
+            return _replay_response(request, entry, _ReplayStream(entry["chunks"], entry["elapsed"], scale))
+
+        time.sleep(max(0.0, entry.get("duration", entry["elapsed"]) - entry["elapsed"]) * scale)
+        return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"].encode("utf-8"), request=request)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """ReplayTransport의 비동기 버전"""
+
+    def __init__(self, cassette):
+        self._cassette = cassette
+
+    async def handle_async_request(self, request):
+        entry = self._cassette.lookup(request)
+        scale = self._cassette.latency_scale
+        await anyio.sleep(entry["elapsed"] * scale)
+
+        if "chunks" in entry:
+            return _replay_response(request, entry, _AsyncReplayStream(entry["chunks"], entry["elapsed"], scale))
+
+        await anyio.sleep(max(0.0, entry.get("duration", entry["elapsed"]) - entry["elapsed"]) * scale)
+        return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"].encode("utf-8"), request=request)
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+
+import openai
+
+from metrics import METRICS
+
+
+# 서킷 브레이커 기본 설정 (secrets.toml의 [circuit_breaker] 섹션으로 덮어쓸 수 있음)
+DEFAULT_BREAKER_SETTINGS = {
+    "failure_threshold": 5,   # 연속으로 이만큼 실패(타임아웃/연결 오류/429/5xx)하면 열림
+    "reset_timeout": 30.0,    # 열린 뒤 이 시간(초)이 지나면 시험 요청(half-open)을 허용
+    "half_open_probes": 1,    # half-open 상태에서 동시에 보낼 수 있는 시험 요청 수
+    "backoff_base": 0.5,      # 재시도 대기 시간의 시작값 (초) - 시도마다 두 배
+    "backoff_max": 8.0        # 재시도 대기 시간의 상한 (초)
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Prometheus 게이지로 내보내는 상태 값
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(openai.OpenAIError):
+    """서킷이 열려 있어 API를 호출하지 않고 바로 실패 처리할 때"""
+
+
+def is_outage_error(error):
+    """API 장애로 볼 실패인지 - 타임아웃, 연결 오류, 429, 5xx (인증/요청 오류는 장애가 아님)"""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and getattr(error, "status_code", 0) >= 500
+
+
+def backoff_delay(attempt, base=DEFAULT_BREAKER_SETTINGS["backoff_base"], cap=DEFAULT_BREAKER_SETTINGS["backoff_max"],
+                  rng=random):
+    """attempt번째(0부터) 재시도 전 대기 시간 - 0 ~ min(cap, base * 2^attempt) 사이 무작위 (full jitter)
+
+    여러 세션이 동시에 실패해도 재시도가 한꺼번에 몰리지 않도록 대기 시간을 흩뜨린다.
+    """
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """프로세스의 모든 세션이 공유하는 OpenAI 호출 서킷 브레이커
+
+    closed: 평소 상태. 연속 실패가 failure_threshold에 닿으면 open.
+    open: 호출하지 않고 바로 기본 질문/질문 은행으로 넘어감. reset_timeout이 지나면 half-open.
+    half_open: half_open_probes개 시험 요청만 허용. 성공하면 closed, 실패하면 다시 open.
+    """
+
+    def __init__(self, settings=None, name="openai", clock=time.monotonic):
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        self.settings = {**DEFAULT_BREAKER_SETTINGS, **dict(settings or {})}
+        self._publish()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.settings["reset_timeout"]:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state):
+        self._state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = self._clock()
+        if state == CLOSED:
+            self._failures = 0
+        METRICS.increment("circuit_breaker_transitions_total", breaker=self.name, state=state)
+        METRICS.emit("circuit_breaker", breaker=self.name, state=state, failures=self._failures)
+        self._publish()
+
+    def _publish(self):
+        METRICS.set("circuit_breaker_state", STATE_VALUES[self._state], breaker=self.name)
+        METRICS.set("circuit_breaker_consecutive_failures", self._failures, breaker=self.name)
+
+    def allow(self):
+        """지금 API를 호출해도 되는지 - False면 호출하지 말고 바로 대체 경로로"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.settings["half_open_probes"]:
+                self._probes += 1
+                return True
+        METRICS.increment("circuit_breaker_rejected_total", breaker=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+            elif self._failures:
+                self._failures = 0
+                self._publish()
+
+    def release(self):
+        """성공도 장애도 아닌 결과로 끝난 half-open 시험 요청의 자리를 돌려줌
+
+        돌려주지 않으면 시험 요청이 400/401 등으로 끝났을 때 상태가 바뀌지 않은 채 자리가 모두 차서
+        allow()가 프로세스가 끝날 때까지 False를 반환한다.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record_failure(self, error=None):
+        """호출 실패를 기록 - error가 장애로 볼 실패가 아니면(인증 오류 등) 시험 요청 자리만 돌려줌"""
+        if error is not None and not is_outage_error(error):
+            self.release()
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.settings["failure_threshold"]):
+                self._transition(OPEN)
+            else:
+                self._publish()
+
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (설정의 backoff_base/backoff_max 기준)"""
+        return backoff_delay(attempt, self.settings["backoff_base"], self.settings["backoff_max"])
+
+    def snapshot(self):
+        """모니터링용 현재 상태"""
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "open_for": round(self._clock() - self._opened_at, 3) if state == OPEN else None,
+                **self.settings
+            }
+
+
+# 프로세스 전체에서 공유하는 OpenAI 서킷 브레이커
+OPENAI_BREAKER = CircuitBreaker()
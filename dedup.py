@@ -0,0 +1,158 @@
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+
+# 중복 질문 검사 기본 설정 (secrets.toml의 [dedup] 섹션으로 덮어쓸 수 있음)
+DEFAULT_DEDUP_SETTINGS = {
+    "enabled": True,
+    "threshold": 0.5,     # 문자 n-gram 집합의 Jaccard 유사도(MinHash 추정치)가 이 값 이상이면 거의 같은 질문
+    "capacity": 100_000,  # 이전에 내보낸 질문을 기억하는 최대 개수 (넘으면 오래된 것부터 덮어씀)
+    "max_age": 7 * 24 * 3600   # 내보낸 지 이 시간(초)이 지난 질문은 다시 내보낼 수 있음 (0이면 만료 없음)
+}
+
+_NON_WORD = re.compile(r"[\s\W_]+")
+_PRIME = (1 << 32) + 15
+
+
+def shingles(text, ngram=3):
+    """공백과 문장부호를 뺀 문자 n-gram 집합"""
+    normalized = _NON_WORD.sub("", text.lower())
+    if len(normalized) <= ngram:
+        return {normalized}
+    return {normalized[i:i + ngram] for i in range(len(normalized) - ngram + 1)}
+
+
+class MinHasher:
+    """문자 n-gram 집합의 MinHash 서명 - 서명끼리 같은 칸의 비율이 Jaccard 유사도의 추정치
+
+    서명은 해시값의 하위 16비트만 남긴 uint16 배열이라 질문 하나에 num_perm * 2바이트만 든다.
+    """
+
+    def __init__(self, num_perm=64, ngram=3, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self._a = rng.integers(1, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text):
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, self.ngram)),
+            dtype=np.uint64
+        )
+        permuted = (self._a * hashes + self._b) % _PRIME
+        return (permuted.min(axis=1) & 0xFFFF).astype(np.uint16)
+
+
+class NearDuplicateIndex:
+    """이전에 내보낸 질문의 MinHash 서명을 담는 고정 크기 인덱스
+
+    서명은 (num_perm, capacity) uint16 배열 하나에 칸별로 이어 쌓인다. 조회는 칸마다 모든 질문의
+    값을 한 번에 비교해 일치 개수를 더하는 NumPy 연산이라 질문 10만 개에서도 1~2ms 안에 끝난다.
+    메모리는 capacity개(질문당 num_perm * 2 + 8바이트)에서 더 늘지 않는다. 가득 차면 가장 오래된 서명부터
+    덮어쓰고, 추가된 지 max_age초가 지난 서명은 덮어쓰이기 전이라도 조회에서 빠진다.
+    """
+
+    def __init__(self, threshold=DEFAULT_DEDUP_SETTINGS["threshold"], capacity=DEFAULT_DEDUP_SETTINGS["capacity"],
+                 hasher=None, max_age=DEFAULT_DEDUP_SETTINGS["max_age"], clock=time.time):
+        self.enabled = True
+        self.threshold = threshold
+        self.capacity = capacity
+        self.max_age = max_age
+        self.hasher = hasher or MinHasher()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self, capacity=None):
+        """저장된 서명을 모두 비움 - capacity를 주면 최대 개수도 바꿈"""
+        with self._lock:
+            self.capacity = capacity or self.capacity
+            self._signatures = np.zeros((self.hasher.num_perm, min(self.capacity, 1024)), dtype=np.uint16)
+            self._added_at = np.zeros(self._signatures.shape[1], dtype=np.float64)
+            self._size = 0
+            self._next = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._signatures.nbytes + self._added_at.nbytes
+
+    def add(self, text):
+        self.add_signature(self.hasher.signature(text))
+
+    def add_many(self, texts):
+        for text in texts:
+            self.add(text)
+
+    def add_signature(self, signature):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._size == self._signatures.shape[1] < self.capacity:
+                grown = np.zeros((self.hasher.num_perm, min(self.capacity, self._size * 2)), dtype=np.uint16)
+                grown[:, :self._size] = self._signatures
+                self._signatures = grown
+                self._added_at = np.resize(self._added_at, grown.shape[1])
+            self._signatures[:, self._next] = signature
+            self._added_at[self._next] = self._clock()
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def similarity(self, signature):
+        """max_age 안에 추가된 질문 중 가장 비슷한 질문과의 추정 유사도 (비어 있거나 꺼져 있으면 0.0)"""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            if not self._size:
+                return 0.0
+            matches = np.zeros(self._size, dtype=np.uint8)
+            for row, value in zip(self._signatures[:, :self._size], signature):
+                matches += row == value
+            if self.max_age:
+                matches[self._added_at[:self._size] < self._clock() - self.max_age] = 0
+            return int(matches.max()) / len(signature)
+
+    def is_duplicate(self, text):
+        return self.similarity(self.hasher.signature(text)) >= self.threshold
+
+
+class DuplicateFilter:
+    """질문 세트 하나를 만드는 동안 쓰는 검사기 - 세트 안의 질문끼리와 인덱스(이전에 내보낸 질문)를 함께 확인"""
+
+    def __init__(self, index):
+        self.index = index
+        self._signatures = []
+
+    def check(self, text):
+        """거의 같은 질문이 없으면 세트에 넣고 True, 있으면 False"""
+        if not self.index.enabled:
+            return True
+        signature = self.index.hasher.signature(text)
+        if self._signatures and (np.stack(self._signatures) == signature).mean(axis=1).max() >= self.index.threshold:
+            return False
+        if self.index.similarity(signature) >= self.index.threshold:
+            return False
+        self._signatures.append(signature)
+        return True
+
+
+# 프로세스 전체에서 이미 내보낸 질문 (질문 생성 함수들이 완성된 세트를 등록함)
+SERVED_QUESTIONS = NearDuplicateIndex()
+
+
+def configure_dedup(settings=None, index=SERVED_QUESTIONS):
+    """[dedup] 설정을 인덱스에 적용 - capacity가 바뀌면 그동안 모은 서명은 비움"""
+    settings = {**DEFAULT_DEDUP_SETTINGS, **dict(settings or {})}
+    index.enabled = bool(settings["enabled"])
+    index.threshold = settings["threshold"]
+    index.max_age = settings["max_age"]
+    if settings["capacity"] != index.capacity:
+        index.clear(settings["capacity"])
+    return index
@@ -0,0 +1,180 @@
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import METRICS
+from rate_limiter import RATE_LIMITER
+
+
+# 헤지 요청 기본 설정 (secrets.toml의 [hedging] 섹션으로 덮어쓸 수 있음)
+DEFAULT_HEDGING_SETTINGS = {
+    "enabled": False,
+    "percentile": 0.9,       # 첫 요청이 최근 지연 시간의 이 백분위수를 넘기면 두 번째 요청을 보냄
+    "min_samples": 20,       # 최근 지연 시간이 이만큼 쌓이기 전에는 헤지하지 않음
+    "window": 200,           # 백분위수와 헤지 비율을 계산할 최근 요청 수
+    "max_hedge_rate": 0.1,   # 최근 요청 중 헤지한 비율의 상한 (추가 비용 상한)
+    "max_workers": 16        # 요청을 실행할 스레드 수
+}
+
+
+class RollingHistogram:
+    """최근 window개 지연 시간을 로그 간격 구간으로 센 히스토그램
+
+    구간 경계는 min_seconds부터 2배마다 buckets_per_doubling개씩이라 백분위수 오차는 구간 폭(약 19%) 이내다.
+    """
+
+    def __init__(self, window=DEFAULT_HEDGING_SETTINGS["window"], min_seconds=0.01, max_seconds=300.0,
+                 buckets_per_doubling=4):
+        count = math.ceil(math.log2(max_seconds / min_seconds) * buckets_per_doubling) + 1
+        self.window = window
+        self._bounds = [min_seconds * 2 ** (i / buckets_per_doubling) for i in range(count)]
+        self._counts = [0] * (count + 1)
+        self._samples = deque()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds):
+        index = bisect.bisect_left(self._bounds, seconds)
+        self._samples.append(index)
+        self._counts[index] += 1
+        if len(self._samples) > self.window:
+            self._counts[self._samples.popleft()] -= 1
+
+    def percentile(self, fraction):
+        """fraction(0~1) 백분위수가 들어 있는 구간의 위쪽 경계 (기록이 없으면 None)"""
+        if not self._samples:
+            return None
+        target = max(1, math.ceil(fraction * len(self._samples)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return self._bounds[min(index, len(self._bounds) - 1)]
+        return self._bounds[-1]
+
+
+class Hedger:
+    """느린 요청을 두 번째 요청으로 헤지하는 실행기
+
+    첫 요청이 같은 종류(key) 요청의 최근 지연 시간 백분위수를 넘기도록 끝나지 않으면 같은 요청을 한 번 더
+    보내고, 먼저 유효한 결과를 돌려준 쪽을 쓴다. 진 쪽은 아직 시작 전이면 취소하고, 이미 보낸 요청은
+    결과만 버린다 (응답을 받기 전에 끊어도 서버는 생성을 끝내므로 비용은 같음). 헤지 비율은 최근 window개
+    요청 중 max_hedge_rate 이하로 제한된다. 헤지 요청도 limiter(RATE_LIMITER)의 한도에서 빼며, 기다리지 않고
+    바로 보낼 수 없으면 헤지하지 않는다.
+    """
+
+    def __init__(self, settings=None, limiter=RATE_LIMITER):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._executor = None
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        with self._lock:
+            self.settings = {**DEFAULT_HEDGING_SETTINGS, **dict(settings or {})}
+            self._hedged = deque(maxlen=self.settings["window"])
+            self._histograms = {}
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(self.settings["max_workers"], thread_name_prefix="openai-hedge")
+
+    def hedge_delay(self, key):
+        """key 요청을 헤지하기 전에 기다릴 시간 - 기록이 모자라면 None"""
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None or len(histogram) < self.settings["min_samples"]:
+                return None
+            return histogram.percentile(self.settings["percentile"])
+
+    def _record(self, key, seconds, hedged):
+        with self._lock:
+            histogram = self._histograms.setdefault(key, RollingHistogram(self.settings["window"]))
+            if seconds is not None:
+                histogram.record(seconds)
+            self._hedged.append(hedged)
+
+    def _may_hedge(self):
+        with self._lock:
+            if not self._hedged:
+                return True
+            return (sum(self._hedged) + 1) / (len(self._hedged) + 1) <= self.settings["max_hedge_rate"]
+
+    def hedge_rate(self):
+        with self._lock:
+            return sum(self._hedged) / len(self._hedged) if self._hedged else 0.0
+
+    def _timed(self, call):
+        started = time.perf_counter()
+        result = call()
+        return result, time.perf_counter() - started
+
+    def call(self, call, key=None, valid=lambda result: True, tokens=1, usage=lambda result: None):
+        """call()을 실행하고 결과를 반환 - 느리면 헤지하여 먼저 valid한 결과를 씀
+
+        tokens는 요청 하나의 estimate_tokens로, 헤지 요청을 보내기 전에 limiter에서 뺀다. 반환한 결과의 사용량은
+        호출한 쪽이 settle()하고, 버린 쪽 요청의 사용량(usage(result))은 그 요청이 끝날 때 여기서 settle()한다.
+        지연 시간과 헤지 여부는 헤지했더라도 호출당 한 번만 기록한다.
+        두 요청이 모두 실패하면 첫 요청의 예외를 그대로 던지고, 둘 다 valid하지 않으면 먼저 끝난 결과를 반환한다.
+        """
+        if not self.settings["enabled"]:
+            return call()
+
+        delay = self.hedge_delay(key)
+        primary = self._executor.submit(self._timed, call)
+        pending = {primary}
+        if delay is not None and not wait(pending, timeout=delay).done and self._may_hedge():
+            if self.limiter.try_acquire(tokens):
+                METRICS.increment("hedged_requests_total", key=key)
+                pending.add(self._executor.submit(self._timed, call))
+            else:
+                METRICS.increment("hedges_skipped_total", key=key, reason="rate_limit")
+        started = tuple(pending)
+        hedged = len(started) == 2
+
+        fallback = None
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    if future is primary or first_error is None:
+                        first_error = e
+                    continue
+                if valid(result):
+                    for other in pending:
+                        other.cancel()
+                    if hedged:
+                        METRICS.increment("hedge_wins_total", key=key, winner="primary" if future is primary else "hedge")
+                    return self._finish(key, started, future, tokens, usage)
+                if fallback is None:
+                    fallback = future
+
+        if fallback is not None:
+            return self._finish(key, started, fallback, tokens, usage)
+        self._record(key, None, hedged)
+        raise first_error
+
+    def _finish(self, key, started, winner, tokens, usage):
+        """winner의 결과를 반환 - 호출당 한 번 기록하고, 버린 요청은 끝나는 대로 실제 사용량을 settle()"""
+        result, seconds = winner.result()
+        self._record(key, seconds, len(started) == 2)
+        for other in started:
+            if other is not winner:
+                other.add_done_callback(lambda future: self._settle_discarded(future, tokens, usage))
+        return result
+
+    def _settle_discarded(self, future, tokens, usage):
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.limiter.settle(tokens, usage(future.result()[0]))
+
+
+# 프로세스 전체에서 공유하는 헤지 실행기 (기본은 꺼짐)
+HEDGER = Hedger()
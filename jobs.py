@@ -0,0 +1,162 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+
+
+# 백그라운드 작업 큐 기본 설정 (secrets.toml의 [jobs] 섹션으로 덮어쓸 수 있음)
+DEFAULT_JOB_SETTINGS = {
+    "max_workers": 4,     # 동시에 실행하는 작업 수 - 남는 작업은 대기열에서 기다림
+    "retention": 600.0    # 끝난 작업의 결과를 보관하는 시간(초) - 그 안에 세션이 가져가지 않으면 버림
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """큐에 들어간 작업 하나의 상태와 시각 (시각은 큐의 clock 기준)"""
+
+    __slots__ = ("id", "key", "state", "submitted_at", "started_at", "finished_at", "future")
+
+    def __init__(self, job_id, key, submitted_at):
+        self.id = job_id
+        self.key = key
+        self.state = QUEUED
+        self.submitted_at = submitted_at
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+
+class JobQueue:
+    """프로세스 전체에서 공유하는 백그라운드 작업 큐 (크기가 정해진 스레드 풀)
+
+    세션은 작업 ID만 세션 상태에 들고 있다가 status()로 확인하므로 스크립트 스레드가 생성을 기다리지 않고,
+    재실행되어도 작업이 버려지지 않는다. 같은 key의 작업이 대기/실행 중이면 새로 넣지 않고 그 작업 ID를 준다.
+    대기열 길이, 실행 중인 작업 수, 작업자 사용률은 METRICS 게이지로, 대기/실행 시간은 요약으로 나간다.
+    """
+
+    def __init__(self, settings=None, name="generation", clock=time.monotonic):
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._inflight = {}
+        self._queued = 0
+        self._running = 0
+        self._executor = None
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        with self._lock:
+            self.settings = {**DEFAULT_JOB_SETTINGS, **dict(settings or {})}
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(self.settings["max_workers"], thread_name_prefix=f"mbti-{self.name}")
+            self._publish()
+
+    def _publish(self):
+        METRICS.set("job_queue_depth", self._queued, queue=self.name)
+        METRICS.set("job_queue_running", self._running, queue=self.name)
+        METRICS.set("job_queue_utilization", self._running / self.settings["max_workers"], queue=self.name)
+
+    def _prune(self):
+        """보관 시간이 지난 끝난 작업을 지움"""
+        expired = self._clock() - self.settings["retention"]
+        for job_id in [job.id for job in self._jobs.values() if job.finished_at is not None and job.finished_at < expired]:
+            del self._jobs[job_id]
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        """fn(*args, **kwargs)를 큐에 넣고 작업 ID를 반환 - 같은 key의 작업이 대기/실행 중이면 그 작업 ID"""
+        with self._lock:
+            self._prune()
+            if key is not None and key in self._inflight:
+                METRICS.increment("jobs_deduplicated_total", queue=self.name)
+                return self._inflight[key]
+
+            job = Job(uuid.uuid4().hex, key, self._clock())
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job.id
+            self._queued += 1
+            METRICS.increment("jobs_submitted_total", queue=self.name)
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            self._publish()
+            return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            job.state = RUNNING
+            job.started_at = self._clock()
+            self._queued -= 1
+            self._running += 1
+            self._publish()
+        METRICS.observe("job_wait_seconds", job.started_at - job.submitted_at, queue=self.name)
+
+        state = FAILED
+        try:
+            result = fn(*args, **kwargs)
+            state = DONE
+            return result
+        finally:
+            with self._lock:
+                job.state = state
+                job.finished_at = self._clock()
+                self._running -= 1
+                if self._inflight.get(job.key) == job.id:
+                    del self._inflight[job.key]
+                self._publish()
+            METRICS.observe("job_run_seconds", job.finished_at - job.started_at, queue=self.name)
+            METRICS.increment("jobs_finished_total", queue=self.name, state=state)
+
+    def status(self, job_id):
+        """작업 상태 (queued/running/done/failed) - 모르는 작업이거나 보관 시간이 지났으면 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            # 작업 함수가 끝난 뒤 Future에 결과가 들어가기 전까지는 실행 중으로 봄
+            if job.state in (DONE, FAILED) and not job.future.done():
+                return RUNNING
+            return job.state
+
+    def position(self, job_id):
+        """대기 중인 작업 앞에 있는 대기 작업 수 (대기 중이 아니면 0)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != QUEUED:
+                return 0
+            return sum(1 for other in self._jobs.values() if other.state == QUEUED and other.submitted_at < job.submitted_at)
+
+    def future(self, job_id):
+        """작업의 Future (모르는 작업이면 None) - add_done_callback으로 결과를 넘겨받을 때"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.future if job is not None else None
+
+    def result(self, job_id, timeout=None):
+        """작업 결과 - 끝날 때까지 최대 timeout초 기다리고, 실패했으면 작업의 예외를 그대로 던짐"""
+        future = self.future(job_id)
+        if future is None:
+            raise KeyError(job_id)
+        return future.result(timeout)
+
+    def snapshot(self):
+        """모니터링용 현재 상태"""
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "running": self._running,
+                "utilization": round(self._running / self.settings["max_workers"], 3),
+                "jobs": len(self._jobs),
+                **self.settings
+            }
+
+
+# 프로세스 전체에서 공유하는 질문 생성 작업 큐
+GENERATION_JOBS = JobQueue()
@@ -0,0 +1,221 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+
+
+# 메트릭 설정 기본값 (secrets.toml의 [metrics] 섹션으로 덮어쓸 수 있음)
+DEFAULT_METRICS_SETTINGS = {
+    "jsonl_path": None,         # 이벤트를 남길 JSON Lines 파일 (없으면 파일로 남기지 않음)
+    "max_bytes": 10_000_000,    # 이 크기를 넘으면 파일을 돌려 씀
+    "backup_count": 5,
+    "prometheus_port": None,    # /metrics를 노출할 포트 (없으면 띄우지 않음)
+    "prometheus_host": "127.0.0.1"
+}
+
+PROMETHEUS_PREFIX = "simple_mbti_"
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+class Metrics:
+    """프로세스 공용 계측 - 카운터/게이지/요약(count, sum, max)을 모으고 이벤트를 싱크(sink)로 내보냄
+
+    싱크는 write(record) 메서드를 가진 객체이며, 여러 개를 붙일 수 있다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._summaries = {}
+        self._sinks = []
+
+    def add_sink(self, sink):
+        with self._lock:
+            self._sinks.append(sink)
+
+    def increment(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def set(self, name, value, **labels):
+        """게이지를 지금 값으로 바꿈 (상태처럼 오르내리는 값)"""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            summary = self._summaries.setdefault((name, _label_key(labels)), [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def emit(self, kind, **fields):
+        """이벤트 하나를 모든 싱크로 전달 (싱크가 없으면 버림)"""
+        if not self._sinks:
+            return
+        record = {"ts": round(time.time(), 3), "kind": kind, **fields}
+        for sink in list(self._sinks):
+            sink.write(record)
+
+    @contextmanager
+    def span(self, name, **fields):
+        """블록 실행 시간을 span_seconds{span=name}에 기록 - st.rerun()/st.stop()으로 빠져나가도 기록됨"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe("span_seconds", seconds, span=name)
+            self.emit("span", span=name, seconds=round(seconds, 6), **fields)
+
+    def snapshot(self):
+        """현재 카운터/게이지/요약값 - {"counters": {...}, "gauges": {...}, "summaries": {...}}"""
+        with self._lock:
+            counters = {f"{name}{_format_labels(key)}": value for (name, key), value in self._counters.items()}
+            gauges = {f"{name}{_format_labels(key)}": value for (name, key), value in self._gauges.items()}
+            summaries = {
+                f"{name}{_format_labels(key)}": {"count": count, "sum": total, "max": peak}
+                for (name, key), (count, total, peak) in self._summaries.items()
+            }
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+    def prometheus_text(self):
+        """Prometheus 텍스트 노출 형식으로 변환"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            summaries = sorted(self._summaries.items())
+
+        lines = []
+        typed = set()
+        for (name, key), value in counters:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        for (name, key), value in gauges:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        for (name, key), (count, total, _) in summaries:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_count{_format_labels(key)} {count}")
+            lines.append(f"{metric}_sum{_format_labels(key)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def record_openai_call(operation, attempt, seconds, usage=None, failure=None, queue_seconds=0.0):
+    """OpenAI 호출 한 번의 지연 시간, 토큰 수, 시도 번호, 실패 유형(성공이면 None)을 기록
+
+    queue_seconds는 요청 스케줄러(RATE_LIMITER)에서 차례를 기다린 시간으로, seconds와 따로 기록한다.
+    """
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    outcome = failure or "ok"
+
+    METRICS.increment("openai_requests_total", operation=operation, outcome=outcome)
+    METRICS.observe("openai_request_seconds", seconds, operation=operation)
+    METRICS.observe("openai_queue_seconds", queue_seconds, operation=operation)
+    if prompt_tokens or completion_tokens:
+        METRICS.increment("openai_tokens_total", prompt_tokens, operation=operation, kind="prompt")
+        METRICS.increment("openai_tokens_total", completion_tokens, operation=operation, kind="completion")
+    METRICS.emit(
+        "openai_call",
+        operation=operation,
+        attempt=attempt,
+        seconds=round(seconds, 4),
+        queue_seconds=round(queue_seconds, 4),
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        outcome=outcome
+    )
+
+
+class JsonlSink:
+    """이벤트를 JSON Lines 파일에 덧붙이고 max_bytes를 넘으면 파일을 돌려 쓰는 싱크"""
+
+    def __init__(self, path, max_bytes=DEFAULT_METRICS_SETTINGS["max_bytes"],
+                 backup_count=DEFAULT_METRICS_SETTINGS["backup_count"]):
+        self.path = path
+        self._logger = logging.Logger(f"simple_mbti.metrics.{path}")
+        self._logger.propagate = False
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(handler)
+
+    def write(self, record):
+        self._logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+class PrometheusExporter:
+    """METRICS를 http://host:port/metrics 로 노출하는 백그라운드 HTTP 서버"""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                payload = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def configure_metrics(settings=None, metrics=METRICS):
+    """[metrics] 설정대로 JSONL 싱크와 Prometheus 엔드포인트를 붙임 - 띄운 PrometheusExporter(없으면 None) 반환
+
+    프로세스마다 한 번만 호출해야 한다 (앱에서는 st.cache_resource로 감쌈).
+    """
+    settings = {**DEFAULT_METRICS_SETTINGS, **dict(settings or {})}
+
+    if settings["jsonl_path"]:
+        metrics.add_sink(JsonlSink(settings["jsonl_path"], settings["max_bytes"], settings["backup_count"]))
+
+    if settings["prometheus_port"] is not None:
+        return PrometheusExporter(metrics, int(settings["prometheus_port"]), settings["prometheus_host"])
+    return None
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from rate_limiter import RATE_LIMITER
+
+
+# 연결 풀 기본 설정 (secrets.toml의 [http] 섹션으로 덮어쓸 수 있음)
+DEFAULT_HTTP_SETTINGS = {
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60.0,
+    "connect_timeout": 5.0,
+    "timeout": 60.0,
+    "http2": True
+}
+
+
+def http2_available():
+    """HTTP/2에 필요한 h2 패키지가 설치되어 있는지 확인"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PoolUsage:
+    """전송 계층을 지나가는 요청 수를 집계 (현재 동시 요청 수, 최대치, 누적)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.failed_requests = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.total_requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, failed=False):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failed_requests += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "total_requests": self.total_requests,
+                "failed_requests": self.failed_requests
+            }
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """응답 본문을 다 읽고 닫을 때(연결이 풀로 돌아갈 때) 요청 종료를 기록"""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class _AsyncTrackedStream(httpx.AsyncByteStream):
+    """_TrackedStream의 비동기 버전"""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """요청마다 PoolUsage를 갱신하는 httpx 전송 계층
+
+    응답마다 x-ratelimit-* 헤더와 429를 공용 스케줄러(RATE_LIMITER)에 알린다 (openai 클라이언트가
+    안에서 재시도하는 요청까지 포함).
+    """
+
+    def __init__(self, usage, **kwargs):
+        super().__init__(**kwargs)
+        self.usage = usage
+
+    def handle_request(self, request):
+        self.usage.started()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.usage.finished(failed=True)
+            raise
+        RATE_LIMITER.observe_headers(response.headers, response.status_code)
+        response.stream = _TrackedStream(response.stream, self.usage.finished)
+        return response
+
+
+class AsyncPooledTransport(httpx.AsyncHTTPTransport):
+    """PooledTransport의 비동기 버전"""
+
+    def __init__(self, usage, **kwargs):
+        super().__init__(**kwargs)
+        self.usage = usage
+
+    async def handle_async_request(self, request):
+        self.usage.started()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.usage.finished(failed=True)
+            raise
+        RATE_LIMITER.observe_headers(response.headers, response.status_code)
+        response.stream = _AsyncTrackedStream(response.stream, self.usage.finished)
+        return response
+
+
+def pool_connections(transport):
+    """httpcore 연결 풀의 연결 상태 (전체/유휴/사용 중/HTTP2)"""
+    connections = list(getattr(getattr(transport, "_pool", None), "connections", []))
+    idle = sum(1 for connection in connections if connection.is_idle())
+    http2 = sum(1 for connection in connections if "HTTP/2" in connection.info())
+    return {
+        "connections": len(connections),
+        "idle_connections": idle,
+        "active_connections": len(connections) - idle,
+        "http2_connections": http2
+    }
+
+
+# 이 프로세스에서 만든 연결 - 관리자 대시보드와 부하 테스트가 connection_health()로 상태를 봄
+_CONNECTIONS = weakref.WeakSet()
+
+
+def connection_health():
+    """이 프로세스에 살아 있는 연결마다 health() (아직 연결을 만들지 않았으면 빈 목록)"""
+    return [connection.health() for connection in list(_CONNECTIONS)]
+
+
+class OpenAIConnection:
+    """프로세스 전체에서 공유하는 OpenAI 클라이언트(동기/비동기)와 튜닝된 연결 풀
+
+    비동기 클라이언트는 전용 이벤트 루프 스레드에 묶어 두고 run_async()로 실행한다.
+    매 호출마다 이벤트 루프와 연결 풀을 새로 만들지 않기 위함이다.
+    cassette(Cassette)를 주면 전송 계층에서 요청/응답을 녹화하거나 네트워크 없이 재생한다.
+    """
+
+    def __init__(self, api_key, settings=None, base_url=None, cassette=None):
+        self.settings = {**DEFAULT_HTTP_SETTINGS, **dict(settings or {})}
+        self.http2 = bool(self.settings["http2"]) and http2_available()
+
+        limits = httpx.Limits(
+            max_connections=self.settings["max_connections"],
+            max_keepalive_connections=self.settings["max_keepalive_connections"],
+            keepalive_expiry=self.settings["keepalive_expiry"]
+        )
+        timeout = httpx.Timeout(self.settings["timeout"], connect=self.settings["connect_timeout"])
+
+        self.cassette = cassette
+
+        self.usage = PoolUsage()
+        self.transport = PooledTransport(self.usage, http2=self.http2, limits=limits)
+        self.http_client = httpx.Client(
+            transport=cassette.wrap(self.transport) if cassette else self.transport,
+            timeout=timeout
+        )
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client)
+
+        self.async_usage = PoolUsage()
+        self.async_transport = AsyncPooledTransport(self.async_usage, http2=self.http2, limits=limits)
+        self.async_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=httpx.AsyncClient(
+                transport=cassette.wrap_async(self.async_transport) if cassette else self.async_transport,
+                timeout=timeout
+            )
+        )
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="openai-async-loop", daemon=True)
+        self._loop_thread.start()
+        _CONNECTIONS.add(self)
+
+    def run_async(self, coro):
+        """공유 이벤트 루프에서 코루틴을 실행하고 결과를 기다림 (어느 스레드에서든 호출 가능)"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def warm_up(self):
+        """API 서버 연결을 미리 열어 풀에 넣어 둠 - 첫 생성 요청이 TCP/TLS 연결을 기다리지 않도록
+
+        인증이 필요 없는 HEAD 요청이라 토큰이나 요청 한도를 쓰지 않고, 실패하면 False만 반환한다.
+        카세트를 쓰면 네트워크를 타지 않으므로 건너뛴다.
+        """
+        if self.cassette is not None:
+            return False
+        try:
+            self.http_client.head(str(self.client.base_url))
+        except httpx.HTTPError:
+            return False
+        return True
+
+    def health(self):
+        """연결 풀 설정과 현재 사용량 - 동시 부하 상황에서 풀 크기를 정할 때 사용"""
+        return {
+            "base_url": str(self.client.base_url),
+            "http2": self.http2,
+            "cassette": dict(self.cassette.stats, mode=self.cassette.mode) if self.cassette else None,
+            "max_connections": self.settings["max_connections"],
+            "max_keepalive_connections": self.settings["max_keepalive_connections"],
+            "sync": {**self.usage.snapshot(), **pool_connections(self.transport)},
+            "async": {**self.async_usage.snapshot(), **pool_connections(self.async_transport)}
+        }
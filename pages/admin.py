@@ -0,0 +1,101 @@
+import hmac
+
+import streamlit as st
+
+from analytics import ANALYTICS, DEFAULT_ANALYTICS_SETTINGS
+
+# 관리자 대시보드 - 결과 분석 집계 테이블만 읽음 (이벤트 로그는 읽지 않음)
+st.set_page_config(
+    page_title="📊 결과 분석 - Simple MBTI",
+    page_icon="📊",
+    layout="wide"
+)
+
+SETTINGS = {**DEFAULT_ANALYTICS_SETTINGS, **st.secrets.get("analytics", {})}
+
+
+@st.cache_resource
+def get_analytics():
+    """앱과 같은 결과 분석 로그 - 앱이 이미 열었으면 그대로 씀"""
+    return ANALYTICS.configure(st.secrets.get("analytics", {}))
+
+
+@st.cache_data(ttl=10)
+def load_rollups(top_questions):
+    """집계는 10초 동안 캐시 - 여러 관리자가 보고 있어도 쿼리는 한 번"""
+    return get_analytics().store.rollups(top_questions)
+
+
+st.markdown("# 📊 결과 분석")
+
+if not SETTINGS["admin_password"]:
+    st.info("secrets.toml의 [analytics] 섹션에 admin_password를 설정하면 대시보드를 볼 수 있습니다.")
+    st.stop()
+
+password = st.text_input("관리자 비밀번호", type="password")
+if not hmac.compare_digest(password.encode("utf-8"), SETTINGS["admin_password"].encode("utf-8")):
+    st.stop()
+
+# 이 프로세스의 OpenAI 연결 풀 - 앱에서 아직 생성 요청이 없었으면 연결도 없음
+with st.expander("🔌 OpenAI 연결"):
+    from openai_client import connection_health
+    connections = connection_health()
+    for health in connections:
+        st.json(health)
+    if not connections:
+        st.markdown("아직 만들어진 연결이 없습니다.")
+
+if get_analytics().store is None:
+    st.info("결과 분석이 꺼져 있습니다 ([analytics] enabled = false).")
+    st.stop()
+
+top_questions = st.sidebar.slider("질문별 선택에 보여줄 질문 수", 5, 100, 20)
+rollups = load_rollups(top_questions)
+
+# 질문 개수별 시작/완료
+st.markdown("### 🏁 질문 개수별 완료율")
+funnel = rollups["funnel"]
+if funnel:
+    columns = st.columns(len(funnel))
+    for column, row in zip(columns, funnel):
+        rate = f"{row['completion_rate']:.0%}" if row["completion_rate"] is not None else "-"
+        mean = f"평균 {row['mean_seconds']:.0f}초" if row["mean_seconds"] is not None else "완료 없음"
+        column.metric(f"{row['question_count']}개", rate, f"{row['completed']}/{row['started']} · {mean}", delta_color="off")
+else:
+    st.markdown("아직 시작된 테스트가 없습니다.")
+
+# 몇 번째 질문까지 답했는지 - 질문 개수별로 각 위치까지 온 세션 수
+st.markdown("### 📉 이탈 위치")
+if rollups["progress"]:
+    st.line_chart(
+        [{**row, "question_count": f"{row['question_count']}개"} for row in rollups["progress"]],
+        x="answered", y="sessions", color="question_count"
+    )
+
+# 결과 유형 분포
+st.markdown("### 🧠 유형 분포")
+if rollups["types"]:
+    st.bar_chart(
+        {"유형": list(rollups["types"]), "결과 수": list(rollups["types"].values())},
+        x="유형", y="결과 수"
+    )
+
+# 질문별 A/B 선택
+st.markdown("### ⚖️ 질문별 선택")
+if rollups["questions"]:
+    st.dataframe(
+        [
+            {
+                "질문": row["question"],
+                "차원": row["type"],
+                "A": row["option_a"],
+                "B": row["option_b"],
+                "A 비율": row["a"] / (row["a"] + row["b"]),
+                "응답 수": row["a"] + row["b"]
+            }
+            for row in rollups["questions"]
+        ],
+        column_config={"A 비율": st.column_config.ProgressColumn("A 비율", min_value=0.0, max_value=1.0, format="%.2f")},
+        hide_index=True,
+        use_container_width=True
+    )
@@ -0,0 +1,77 @@
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+# 부팅 워밍업 기본 설정 (secrets.toml의 [warmup] 섹션으로 덮어쓸 수 있음)
+DEFAULT_WARMUP_SETTINGS = {
+    "enabled": False,
+    "question_counts": [8],  # 미리 채울 질문 개수 (기본 선택값)
+    "sets": 2                # 질문 개수별로 공용 풀에 미리 채울 세트 수 (풀 크기까지만 보관됨)
+}
+
+
+class QuestionPrefetcher:
+    """시작 버튼을 누르기 전에 질문 세트를 미리 생성해 두는 프로세스 공용 프리페처
+
+    세션이 더 이상 쓰지 않는 프리페치(질문 개수 변경, 다시 시작 등)는 버리지 않고
+    질문 개수별 공용 풀에 모아 두었다가 다음 세션에 바로 내어준다.
+    """
+
+    def __init__(self, max_workers=4, pool_size=3):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mbti-prefetch")
+        self._lock = threading.Lock()
+        self._pool = defaultdict(deque)
+        self._pool_size = pool_size
+
+    def prefetch(self, question_count, generate):
+        """공용 풀에 준비된 세트가 있으면 완료된 Future를, 없으면 generate(question_count) 작업을 반환"""
+        with self._lock:
+            if self._pool[question_count]:
+                future = Future()
+                future.set_result(self._pool[question_count].popleft())
+                return future
+
+        return self._executor.submit(generate, question_count)
+
+    def release(self, future, question_count):
+        """필요 없어진 프리페치를 취소하고, 이미 실행 중이면 끝난 뒤 공용 풀로 넘김"""
+        if future is None or future.cancel():
+            return
+        self.adopt(future, question_count)
+
+    def adopt(self, future, question_count):
+        """다른 곳에서 시작한 생성 작업(취소하면 안 되는 작업)의 결과를 끝나는 대로 공용 풀로 넘김"""
+        future.add_done_callback(lambda done: self._donate(question_count, done))
+
+    def stock(self, question_count, questions):
+        """완성된 질문 세트를 공용 풀에 보관 - 풀이 가득 차서 버렸으면 False"""
+        with self._lock:
+            if len(self._pool[question_count]) >= self._pool_size:
+                return False
+            self._pool[question_count].append(questions)
+            return True
+
+    def warm_up(self, question_counts, sets, generate):
+        """질문 개수별로 공용 풀이 sets개가 되도록 generate(question_count) 작업을 시작 - 시작한 작업 목록을 반환"""
+        futures = []
+        for question_count in question_counts:
+            for _ in range(sets - self.pooled(question_count)):
+                future = self._executor.submit(generate, question_count)
+                self.adopt(future, question_count)
+                futures.append(future)
+        return futures
+
+    def pooled(self, question_count):
+        """질문 개수별로 풀에 쌓여 있는 세트 수"""
+        with self._lock:
+            return len(self._pool[question_count])
+
+    def _donate(self, question_count, future):
+        """완료된 프리페치 결과를 공용 풀에 보관 (실패했거나 풀이 가득 차면 버림)"""
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        questions = future.result()
+        if questions:
+            self.stock(question_count, questions)
@@ -0,0 +1,264 @@
+"""질문 생성 요청의 프롬프트와 max_tokens 계산
+
+전체 세트 요청의 system 프롬프트는 PROMPT_VERSIONS에 버전별로 남겨 두고, 앱은
+[generation] prompt_version으로 고른 버전(기본 DEFAULT_PROMPT_VERSION)을 쓴다.
+"""
+
+DIMENSION_LABELS = {
+    "E/I": "외향성/내향성",
+    "S/N": "감각/직관",
+    "T/F": "사고/감정",
+    "J/P": "판단/인식"
+}
+
+# 전체 세트 요청의 system 프롬프트 변형 - 바꿀 때는 이전 버전을 지우지 말고 새 버전을 추가해서
+# 메트릭/벤치마크에서 버전끼리 비교할 수 있게 함 ({question_count}, {questions_per_dimension}은 요청마다 채움)
+PROMPT_VERSIONS = {
+    # 최초 버전 - 개수가 8개로 고정되어 있어 4/12/16/20개 요청 때 사용자 프롬프트와 어긋남
+    "v1": (
+        "당신은 MBTI 전문가입니다. 정확하고 균형잡힌 8개의 MBTI 질문을 생성해주세요. 각 차원별로 2개씩, 총 8개의 서로 다른 질문을 만들어주세요. 반드시 올바른 JSON 형식으로만 응답하고, 다른 설명이나 텍스트는 포함하지 마세요."
+        "질문의 어휘는 감성적인 표현으로 하고 창의적이고 다양한 생각을 하지만 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요."
+        "질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다."
+    ),
+    # 요청한 개수에 맞춰 system 프롬프트의 개수도 바꿈
+    "v2": (
+        "당신은 MBTI 전문가입니다. 정확하고 균형잡힌 {question_count}개의 MBTI 질문을 생성해주세요. 각 차원별로 {questions_per_dimension}개씩, 총 {question_count}개의 서로 다른 질문을 만들어주세요. 반드시 올바른 JSON 형식으로만 응답하고, 다른 설명이나 텍스트는 포함하지 마세요."
+        "질문의 어휘는 감성적인 표현으로 하고 창의적이고 다양한 생각을 하지만 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요."
+        "질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다."
+    )
+}
+DEFAULT_PROMPT_VERSION = "v2"
+
+# max_tokens 계산용 질문 하나의 출력 토큰 수 - 기본 질문 8개를 들여쓰기한 JSON으로 바꿨을 때
+# 질문당 평균 약 160토큰 (실제 응답의 값은 METRICS의 completion_tokens_per_question으로 확인)
+TOKENS_PER_QUESTION = 160
+# 응답을 감싸는 {"questions": [...]} / {"sets": [...]} 부분
+RESPONSE_OVERHEAD_TOKENS = 32
+# 질문이 추정보다 길어도 잘리지 않도록 두는 여유
+MAX_TOKENS_HEADROOM = 1.5
+# 모델(gpt-4o-mini)이 한 응답에 낼 수 있는 최대 출력 토큰 - 이보다 큰 max_tokens는 400으로 거절됨
+MODEL_MAX_OUTPUT_TOKENS = 16384
+# max_tokens_for()가 잘리지 않고 담을 수 있는 최대 질문 개수 (68개) - batch 요청의 세트 수를 이 안으로 제한
+MAX_QUESTIONS_PER_RESPONSE = int((MODEL_MAX_OUTPUT_TOKENS / MAX_TOKENS_HEADROOM - RESPONSE_OVERHEAD_TOKENS)
+                                 // TOKENS_PER_QUESTION)
+
+TARGETED_SYSTEM_PROMPT = (
+    "당신은 MBTI 전문가입니다. 요청받은 MBTI 차원의 질문만 요청한 개수대로 정확히 생성해주세요. 반드시 올바른 JSON 형식으로만 응답하고, 다른 설명이나 텍스트는 포함하지 마세요."
+    "질문의 어휘는 감성적인 표현으로 하고 창의적이고 다양한 생각을 하지만 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요."
+    "질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다."
+)
+
+
+def build_question_prompt(question_count):
+    """질문 생성 요청에 쓰는 사용자 프롬프트"""
+
+    questions_per_dimension = question_count // 4
+
+    prompt = f"""
+    MBTI 성격 테스트를 위한 {question_count}개의 질문을 생성해주세요. 각 MBTI 차원별로 {questions_per_dimension}개씩 균형있게 배치해주세요:
+
+    - E/I (외향성/내향성): {questions_per_dimension}개 질문
+    - S/N (감각/직관): {questions_per_dimension}개 질문
+    - T/F (사고/감정): {questions_per_dimension}개 질문
+    - J/P (판단/인식): {questions_per_dimension}개 질문
+
+    각 질문은 일상적이고 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요.
+    모든 질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다.
+
+    반드시 아래 JSON 형식으로만 응답해주세요. 다른 텍스트는 포함하지 마세요:
+    {{
+        "questions": [
+            {{
+                "question": "질문 내용",
+                "type": "E/I",
+                "options": [
+                    {{"text": "첫 번째 선택지", "type": "E"}},
+                    {{"text": "두 번째 선택지", "type": "I"}}
+                ]
+            }}
+        ]
+    }}
+
+    한국어로 작성해주세요.
+    """
+
+    return prompt
+
+
+def build_dimension_prompt(dimension, count):
+    """한 차원의 질문만 생성하도록 요청하는 사용자 프롬프트"""
+
+    first, second = dimension.split("/")
+
+    prompt = f"""
+    MBTI 성격 테스트의 {dimension} ({DIMENSION_LABELS[dimension]}) 차원을 판별하기 위한 질문 {count}개를 생성해주세요.
+
+    각 질문은 일상적이고 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요.
+    첫 번째 선택지는 {first} 성향, 두 번째 선택지는 {second} 성향이어야 합니다.
+    모든 질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다.
+
+    반드시 아래 JSON 형식으로만 응답해주세요. 다른 텍스트는 포함하지 마세요:
+    {{
+        "questions": [
+            {{
+                "question": "질문 내용",
+                "type": "{dimension}",
+                "options": [
+                    {{"text": "첫 번째 선택지", "type": "{first}"}},
+                    {{"text": "두 번째 선택지", "type": "{second}"}}
+                ]
+            }}
+        ]
+    }}
+
+    한국어로 작성해주세요.
+    """
+
+    return prompt
+
+
+def build_batch_prompt(question_count, set_count):
+    """서로 겹치지 않는 질문 세트 여러 개를 한 번에 요청하는 사용자 프롬프트"""
+
+    questions_per_dimension = question_count // 4
+
+    prompt = f"""
+    MBTI 성격 테스트를 위한 질문 세트 {set_count}개를 한 번에 생성해주세요.
+    각 세트는 {question_count}개의 질문으로 이루어지며, 각 MBTI 차원별로 {questions_per_dimension}개씩 균형있게 배치해주세요:
+
+    - E/I (외향성/내향성): {questions_per_dimension}개 질문
+    - S/N (감각/직관): {questions_per_dimension}개 질문
+    - T/F (사고/감정): {questions_per_dimension}개 질문
+    - J/P (판단/인식): {questions_per_dimension}개 질문
+
+    각 세트는 서로 다른 사람이 따로 보는 독립적인 테스트이므로, 세트 안에서는 물론 세트끼리도
+    질문의 상황과 맥락이 겹치지 않아야 합니다.
+    각 질문은 일상적이고 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요.
+
+    반드시 아래 JSON 형식으로만 응답해주세요. 다른 텍스트는 포함하지 마세요:
+    {{
+        "sets": [
+            {{
+                "questions": [
+                    {{
+                        "question": "질문 내용",
+                        "type": "E/I",
+                        "options": [
+                            {{"text": "첫 번째 선택지", "type": "E"}},
+                            {{"text": "두 번째 선택지", "type": "I"}}
+                        ]
+                    }}
+                ]
+            }}
+        ]
+    }}
+
+    한국어로 작성해주세요.
+    """
+
+    return prompt
+
+
+def build_system_prompt(question_count, version=None):
+    """전체 세트 요청의 system 프롬프트 - version이 없으면 use_prompt_version으로 지정한 버전"""
+    template = PROMPT_VERSIONS[version or _prompt_version]
+    return template.format(question_count=question_count, questions_per_dimension=question_count // 4)
+
+
+def build_messages(question_count, version=None):
+    """질문 생성 요청에 쓰는 system/user 메시지"""
+    return [
+        {"role": "system", "content": build_system_prompt(question_count, version)},
+        {"role": "user", "content": build_question_prompt(question_count)}
+    ]
+
+
+def build_dimension_messages(dimension, count):
+    """한 차원의 질문만 요청하는 system/user 메시지"""
+    return [
+        {"role": "system", "content": TARGETED_SYSTEM_PROMPT},
+        {"role": "user", "content": build_dimension_prompt(dimension, count)}
+    ]
+
+
+def build_repair_prompt(missing, existing):
+    """부족한 차원의 질문만 추가로 요청하는 사용자 프롬프트 - 기존 질문과 겹치지 않도록 함께 전달"""
+
+    total = sum(missing.values())
+    missing_lines = "\n".join(
+        f"    - {dimension} ({DIMENSION_LABELS[dimension]}): {count}개 질문"
+        for dimension, count in missing.items()
+    )
+    existing_lines = "\n".join(f"    - {q['question']}" for q in existing)
+
+    prompt = f"""
+    MBTI 성격 테스트를 위한 질문 {total}개를 추가로 생성해주세요. 아래 차원별 개수를 정확히 지켜주세요:
+
+{missing_lines}
+
+    이미 아래 질문들이 있으니, 이 질문들과 상황이나 맥락이 겹치지 않는 새로운 질문만 만들어주세요:
+{existing_lines}
+
+    각 질문은 일상적이고 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요.
+
+    반드시 아래 JSON 형식으로만 응답해주세요. 다른 텍스트는 포함하지 마세요:
+    {{
+        "questions": [
+            {{
+                "question": "질문 내용",
+                "type": "E/I",
+                "options": [
+                    {{"text": "첫 번째 선택지", "type": "E"}},
+                    {{"text": "두 번째 선택지", "type": "I"}}
+                ]
+            }}
+        ]
+    }}
+
+    한국어로 작성해주세요.
+    """
+
+    return prompt
+
+
+def build_batch_messages(question_count, set_count):
+    """질문 세트 여러 개를 한 번에 요청하는 system/user 메시지"""
+    return [
+        {"role": "system", "content": TARGETED_SYSTEM_PROMPT},
+        {"role": "user", "content": build_batch_prompt(question_count, set_count)}
+    ]
+
+
+def build_repair_messages(missing, existing):
+    """부족한 질문만 보충 요청하는 system/user 메시지"""
+    return [
+        {"role": "system", "content": TARGETED_SYSTEM_PROMPT},
+        {"role": "user", "content": build_repair_prompt(missing, existing)}
+    ]
+
+
+def max_tokens_for(question_count):
+    """질문 question_count개를 담은 응답에 필요한 max_tokens (TOKENS_PER_QUESTION 기준 추정치에 여유를 둠)
+
+    모델의 최대 출력 토큰(MODEL_MAX_OUTPUT_TOKENS)을 넘지 않도록 자른다.
+    """
+    estimate = int((question_count * TOKENS_PER_QUESTION + RESPONSE_OVERHEAD_TOKENS) * MAX_TOKENS_HEADROOM)
+    return min(estimate, MODEL_MAX_OUTPUT_TOKENS)
+
+
+# 전체 세트 요청에 쓸 system 프롬프트 버전 (use_prompt_version으로 지정)
+_prompt_version = DEFAULT_PROMPT_VERSION
+
+
+def use_prompt_version(version):
+    """전체 세트 요청에 쓸 system 프롬프트 버전을 지정 (None이면 기본 버전)"""
+    global _prompt_version
+    version = version or DEFAULT_PROMPT_VERSION
+    if version not in PROMPT_VERSIONS:
+        raise ValueError(f"알 수 없는 프롬프트 버전: {version} (가능: {', '.join(PROMPT_VERSIONS)})")
+    _prompt_version = version
+
+
+def prompt_version():
+    """지금 쓰는 system 프롬프트 버전"""
+    return _prompt_version
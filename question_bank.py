@@ -0,0 +1,257 @@
+"""질문 은행 - 미리 생성해 둔 질문을 차원별로 색인한 SQLite 저장소와 빌더 CLI
+
+앱은 QuestionBankSampler로 API 호출 없이 균형잡힌 질문 세트를 꺼낸다.
+빌더는 generate_all_questions와 같은 프롬프트로 동시에 여러 요청을 보내며, 다시 실행하면
+이미 모인 개수부터 이어서 채운다.
+
+    OPENAI_API_KEY=... python question_bank.py build --target 250 --concurrency 8 --rpm 300
+    python question_bank.py stats
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from question_schema import DEFAULT_RESPONSE_FORMAT, DIMENSIONS, validate_question
+
+
+SCHEMA_VERSION = 1
+DEFAULT_BANK_PATH = "question_bank.db"
+# 빌더가 질문에 붙이는 버전 - 프롬프트를 바꾸면 올려서 이전 질문과 구분
+DEFAULT_BANK_VERSION = "v1"
+
+
+class QuestionBank:
+    """차원별로 색인된 질문 저장소 (SQLite) - 같은 질문 문장은 한 번만 저장"""
+
+    def __init__(self, path=DEFAULT_BANK_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                "id INTEGER PRIMARY KEY, dimension TEXT NOT NULL, question TEXT NOT NULL UNIQUE, "
+                "payload TEXT NOT NULL, version TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS questions_by_dimension ON questions (version, dimension)")
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+        stored = self.schema_version
+        if stored != SCHEMA_VERSION:
+            raise RuntimeError(f"질문 은행 스키마 버전이 다릅니다: {stored} (필요: {SCHEMA_VERSION})")
+
+    @property
+    def schema_version(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        return int(row[0])
+
+    def add(self, questions, version=DEFAULT_BANK_VERSION):
+        """형식이 올바른 질문만 저장하고 새로 들어간 개수를 반환 (이미 있는 문장은 건너뜀)"""
+        rows = [
+            (q["type"], q["question"], json.dumps(q, ensure_ascii=False), version, time.time())
+            for q in questions
+            if validate_question(q) is None
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO questions (dimension, question, payload, version, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            return self._conn.total_changes - before
+
+    def counts(self, version=None):
+        """차원별 질문 수 - version을 주면 그 버전만"""
+        query = "SELECT dimension, COUNT(*) FROM questions"
+        params = ()
+        if version is not None:
+            query += " WHERE version = ?"
+            params = (version,)
+        with self._lock:
+            rows = dict(self._conn.execute(query + " GROUP BY dimension", params).fetchall())
+        return {dimension: rows.get(dimension, 0) for dimension in DIMENSIONS}
+
+    def versions(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT version FROM questions ORDER BY version")]
+
+    def load(self, version=None):
+        """차원별 질문 목록 - {"E/I": [q, ...], ...}"""
+        query = "SELECT dimension, payload FROM questions"
+        params = ()
+        if version is not None:
+            query += " WHERE version = ?"
+            params = (version,)
+        by_dimension = {dimension: [] for dimension in DIMENSIONS}
+        with self._lock:
+            for dimension, payload in self._conn.execute(query + " ORDER BY id", params):
+                by_dimension[dimension].append(json.loads(payload))
+        return by_dimension
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QuestionBankSampler:
+    """질문 은행에서 균형잡힌 세트를 꺼내는 샘플러
+
+    시작할 때 한 번 차원별 질문을 메모리에 올리고 섞어 두며, 이후 세트 하나를 꺼내는 비용은
+    질문 개수에만 비례한다. 차원별로 섞인 목록을 차례로 넘기며 꺼내므로, 한 바퀴를 다 돌기
+    전까지는 어떤 세션에도 같은 질문이 다시 나오지 않는다.
+    """
+
+    def __init__(self, bank, version=None, seed=None):
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._decks = bank.load(version)
+        self._cursors = {dimension: 0 for dimension in DIMENSIONS}
+        for deck in self._decks.values():
+            self._random.shuffle(deck)
+
+    def __len__(self):
+        return sum(len(deck) for deck in self._decks.values())
+
+    def available(self, dimension):
+        return len(self._decks[dimension])
+
+    def _draw(self, dimension, count, exclude):
+        deck = self._decks[dimension]
+        drawn = []
+        # 한 바퀴 안에서 count개를 못 채우면 (은행이 너무 작거나 exclude가 많으면) 있는 만큼만
+        for _ in range(len(deck)):
+            if len(drawn) == count:
+                break
+            if self._cursors[dimension] >= len(deck):
+                self._random.shuffle(deck)
+                self._cursors[dimension] = 0
+            q = deck[self._cursors[dimension]]
+            self._cursors[dimension] += 1
+            if q["question"] not in exclude:
+                exclude.add(q["question"])
+                drawn.append(q)
+        return drawn
+
+    def sample(self, missing, exclude=()):
+        """차원별 개수({"E/I": 2, ...})만큼 꺼냄 - exclude의 문장과 겹치는 질문은 건너뜀"""
+        exclude = set(exclude)
+        with self._lock:
+            return {dimension: self._draw(dimension, count, exclude) for dimension, count in missing.items()}
+
+    def sample_set(self, question_count):
+        """차원 순서대로 번갈아 놓인 question_count개 질문 세트 - 은행이 모자라면 None"""
+        questions_per_dimension = question_count // 4
+        drawn = self.sample({dimension: questions_per_dimension for dimension in DIMENSIONS})
+        if any(len(questions) < questions_per_dimension for questions in drawn.values()):
+            return None
+        return [drawn[dimension][i] for i in range(questions_per_dimension) for dimension in DIMENSIONS]
+
+
+async def build_bank(bank, async_client, target, concurrency=8, rpm=300, per_request=8, max_requests=None,
+                     version=DEFAULT_BANK_VERSION, response_format=DEFAULT_RESPONSE_FORMAT, log=print):
+    """차원마다 target개가 모일 때까지 generate_all_questions와 같은 프롬프트로 동시에 요청
+
+    요청은 앱과 같은 RateLimitScheduler(이 실행 전용, 분당 rpm개)로 한도를 기다리고 응답 사용량으로 맞춘다.
+    이미 저장된 질문 수부터 이어서 채우므로 중단했다가 다시 실행해도 된다.
+    반환값은 이번 실행의 {"requests", "failed", "added"}.
+    """
+    import openai
+
+    from prompts import build_messages, max_tokens_for
+    from question_schema import ResponseFormatError, parse_response_list, response_format_kwargs
+    from rate_limiter import RateLimitScheduler, estimate_tokens
+
+    def remaining():
+        counts = bank.counts(version)
+        return sum(max(0, target - count) for count in counts.values())
+
+    if max_requests is None:
+        # 중복으로 버려지는 질문을 감안해 필요한 요청 수의 두 배까지
+        max_requests = max(1, 2 * -(-remaining() // per_request))
+
+    limiter = RateLimitScheduler({"enabled": bool(rpm), "requests_per_minute": rpm or 1}, name="question_bank")
+    messages = build_messages(per_request)
+    max_tokens = max_tokens_for(per_request)
+    reserved = estimate_tokens(messages, max_tokens)
+    stats = {"requests": 0, "failed": 0, "added": 0}
+
+    async def worker():
+        while remaining() > 0 and stats["requests"] < max_requests:
+            stats["requests"] += 1
+            # 스케줄러 대기는 블로킹이므로 이벤트 루프를 막지 않도록 스레드에서
+            await asyncio.to_thread(limiter.acquire, reserved)
+            try:
+                response = await async_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=messages,
+                    temperature=1.0,
+                    max_tokens=max_tokens,
+                    **response_format_kwargs(response_format)
+                )
+                limiter.settle(reserved, getattr(response.usage, "total_tokens", None))
+                questions = parse_response_list(response.choices[0].message.content)
+            except openai.AuthenticationError:
+                raise
+            except (openai.OpenAIError, ResponseFormatError) as e:
+                stats["failed"] += 1
+                if isinstance(e, openai.OpenAIError):
+                    # 429면 Retry-After 동안 모든 워커가 멈춤
+                    limiter.observe_error(e)
+                log(f"요청 실패: {e}")
+                continue
+
+            added = bank.add(questions, version)
+            stats["added"] += added
+            log(f"[{stats['requests']}/{max_requests}] +{added}  {bank.counts(version)}")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "stats"])
+    parser.add_argument("--path", default=DEFAULT_BANK_PATH, help="질문 은행 SQLite 파일")
+    parser.add_argument("--version", default=DEFAULT_BANK_VERSION, help="저장할/셀 질문 버전")
+    parser.add_argument("--target", type=int, default=250, help="차원별 목표 질문 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 보낼 요청 수")
+    parser.add_argument("--rpm", type=float, default=300, help="분당 최대 요청 수")
+    parser.add_argument("--per-request", type=int, default=8, choices=[4, 8, 12, 16, 20], help="요청당 질문 수")
+    parser.add_argument("--max-requests", type=int, help="이번 실행에서 보낼 최대 요청 수")
+    parser.add_argument("--base-url", help="OpenAI 호환 서버 주소 (예: 가짜 서버)")
+    parser.add_argument("--response-format", default=DEFAULT_RESPONSE_FORMAT)
+    args = parser.parse_args()
+
+    bank = QuestionBank(args.path)
+    if args.command == "stats":
+        print(f"schema v{bank.schema_version}, versions: {bank.versions()}")
+        print(bank.counts(args.version))
+        return
+
+    from openai import AsyncOpenAI
+
+    async def run():
+        async with AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY", "fake-key"), base_url=args.base_url) as client:
+            return await build_bank(
+                bank, client, args.target, args.concurrency, args.rpm, args.per_request,
+                args.max_requests, args.version, args.response_format
+            )
+
+    started = time.perf_counter()
+    stats = asyncio.run(run())
+    print(f"완료: {stats} ({time.perf_counter() - started:.1f}s) → {bank.counts(args.version)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,861 @@
+import asyncio
+import re
+import threading
+import time
+
+import openai
+
+from circuit_breaker import OPENAI_BREAKER, CircuitOpenError
+from dedup import SERVED_QUESTIONS, DuplicateFilter
+from hedging import HEDGER
+from metrics import METRICS, record_openai_call
+from prompts import (
+    MAX_QUESTIONS_PER_RESPONSE,
+    build_batch_messages,
+    build_dimension_messages,
+    build_messages,
+    build_repair_messages,
+    max_tokens_for,
+    prompt_version
+)
+from question_schema import (
+    DEFAULT_RESPONSE_FORMAT,
+    DIMENSIONS,
+    RETRY_STATS,
+    ResponseFormatError,
+    failure_class,
+    parse_json_response,
+    parse_response_list,
+    response_format_kwargs,
+    validate_question
+)
+from rate_limiter import RATE_LIMITER, estimate_tokens
+
+
+def silent_notify(level, message):
+    """화면이 없는 곳(백그라운드 스레드 등)에서 쓰는 기본 알림 함수 - 아무것도 출력하지 않음"""
+
+
+def is_well_formed(q):
+    """엄격한 구조 검증(validate_question)을 통과하는지 확인"""
+    return validate_question(q) is None
+
+
+def response_has_questions(response, count):
+    """응답에 형식이 올바른 질문이 count개 이상 있는지 - 헤지한 두 요청 중 먼저 쓸 응답을 고를 때 사용"""
+    try:
+        questions = parse_response_list(response.choices[0].message.content)
+    except ResponseFormatError:
+        return False
+    return sum(1 for q in questions if is_well_formed(q)) >= count
+
+
+def classify_shortfall(questions, question_count):
+    """응답만으로 세트가 완성되지 않은 이유 - invalid_question / short_count / unbalanced"""
+    if any(not is_well_formed(q) for q in questions):
+        return "invalid_question"
+    if len(questions) < question_count:
+        return "short_count"
+    return "unbalanced"
+
+
+def salvage_questions(questions, question_count):
+    """형식이 올바른 질문만 순서대로 남기고, 차원별 필요 개수를 넘는 질문과 중복 질문은 잘라냄
+
+    문장이 같지 않아도 앞 질문이나 이전에 내보낸 질문(SERVED_QUESTIONS)과 거의 같은 질문은
+    버리므로, 그 자리는 부족한 차원으로 남아 보충 요청에서 다시 채워진다.
+    """
+    questions_per_dimension = question_count // 4
+    type_counts = {dimension: 0 for dimension in DIMENSIONS}
+    seen = set()
+    duplicates = DuplicateFilter(SERVED_QUESTIONS)
+
+    kept = []
+    for q in questions:
+        if not is_well_formed(q) or q["question"] in seen or type_counts[q["type"]] >= questions_per_dimension:
+            continue
+        if not duplicates.check(q["question"]):
+            METRICS.increment("near_duplicate_questions_total")
+            continue
+        type_counts[q["type"]] += 1
+        seen.add(q["question"])
+        kept.append(q)
+    return kept
+
+
+def missing_dimensions(questions, question_count):
+    """차원별로 부족한 질문 개수 - {"E/I": 1, ...}"""
+    questions_per_dimension = question_count // 4
+    type_counts = count_dimensions(questions)
+    return {
+        dimension: questions_per_dimension - type_counts[dimension]
+        for dimension in DIMENSIONS
+        if type_counts[dimension] < questions_per_dimension
+    }
+
+
+# RepairStats 항목마다 METRICS에 올리는 카운터 (이름, 라벨)
+REPAIR_METRICS = {
+    "first_try": ("question_sets_total", {"outcome": "first_try"}),
+    "repair_needed": ("question_sets_total", {"outcome": "repair_needed"}),
+    "repaired": ("question_sets_total", {"outcome": "repaired"}),
+    "salvaged_questions": ("repair_questions_total", {"source": "salvaged"}),
+    "requested_questions": ("repair_questions_total", {"source": "requested"})
+}
+
+
+class RepairStats:
+    """부분 복구(salvage) 결과를 모으는 프로세스 공용 통계
+
+    기록할 때마다 METRICS에도 카운터(REPAIR_METRICS)와 복구 성공률/재활용률 게이지
+    (repair_success_rate, salvage_rate)로 올린다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.first_try = 0            # 복구 없이 첫 응답으로 완성된 세트
+        self.repair_needed = 0        # 복구 단계로 넘어간 세트
+        self.repaired = 0             # 부족분 보충으로 완성된 세트
+        self.salvaged_questions = 0   # 불완전한 첫 응답에서 살려 쓴 질문 수
+        self.requested_questions = 0  # 보충 요청으로 새로 요청한 질문 수
+
+    def record(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+        for name, value in counts.items():
+            metric, labels = REPAIR_METRICS[name]
+            METRICS.increment(metric, value, **labels)
+
+        data = self.snapshot()
+        for rate in ("repair_success_rate", "salvage_rate"):
+            if data[rate] is not None:
+                METRICS.set(rate, data[rate])
+
+    def snapshot(self):
+        """현재 통계와 복구 성공률/재활용률"""
+        with self._lock:
+            data = {
+                "first_try": self.first_try,
+                "repair_needed": self.repair_needed,
+                "repaired": self.repaired,
+                "salvaged_questions": self.salvaged_questions,
+                "requested_questions": self.requested_questions
+            }
+
+        salvaged_and_requested = data["salvaged_questions"] + data["requested_questions"]
+        data["repair_success_rate"] = data["repaired"] / data["repair_needed"] if data["repair_needed"] else None
+        data["salvage_rate"] = data["salvaged_questions"] / salvaged_and_requested if salvaged_and_requested else None
+        return data
+
+
+REPAIR_STATS = RepairStats()
+
+
+def count_dimensions(questions):
+    """질문 목록의 차원별 개수"""
+    type_counts = {dimension: 0 for dimension in DIMENSIONS}
+    for q in questions:
+        if q.get("type") in type_counts:
+            type_counts[q["type"]] += 1
+    return type_counts
+
+
+def generate_all_questions(client, question_count=8, notify=silent_notify, fallback=True,
+                           response_format=DEFAULT_RESPONSE_FORMAT):
+    """OpenAI API를 사용하여 지정된 개수의 MBTI 질문을 한번에 생성
+
+    응답이 조금 모자라거나 불균형하면 전체를 버리지 않고, 올바른 질문은 살린 채 부족한 차원의
+    질문만 다시 요청한다. notify(level, message)로 진행 상황을 알리며, fallback=False이면
+    실패 시 기본 질문 대신 None을 반환. 실패한 시도는 유형별로 RETRY_STATS에 기록되고,
+    호출마다 지연 시간/토큰 수/시도 번호/실패 유형이 METRICS로 나간다.
+    요청은 공용 스케줄러(RATE_LIMITER)에서 분당 한도와 세션 간 차례를 기다린 뒤 보낸다.
+    느린 요청은 HEDGER 설정에 따라 한 번 더 보내 먼저 온 응답을 쓴다.
+    API 오류 뒤에는 지터를 둔 지수 백오프로 기다렸다 재시도하며, 공용 서킷 브레이커(OPENAI_BREAKER)가
+    열려 있으면 API를 호출하지 않고 바로 기본 질문(또는 질문 은행)으로 넘어간다.
+    """
+
+    kept = []
+    entered_repair = False
+
+    max_retries = 3
+    for attempt in range(max_retries):
+        if not OPENAI_BREAKER.allow():
+            RETRY_STATS.record("circuit_open", 0.0)
+            notify("warning", "⚠️ OpenAI API 장애가 감지되어 잠시 API 호출을 건너뜁니다.")
+            break
+
+        missing = missing_dimensions(kept, question_count)
+        repairing = bool(kept)
+        started = time.perf_counter()
+        queue_seconds = 0.0
+        try:
+            if repairing:
+                REPAIR_STATS.record(requested_questions=sum(missing.values()))
+
+            requested = sum(missing.values())
+            messages = build_repair_messages(missing, kept) if repairing else build_messages(question_count)
+            max_tokens = max_tokens_for(requested)
+            # 분당 요청/토큰 한도와 세션 간 차례를 기다림 (헤지 요청은 기다리지 않고 한도가 남을 때만 보냄)
+            reserved = estimate_tokens(messages, max_tokens)
+            queue_seconds = RATE_LIMITER.acquire(reserved)
+
+            # 최근 지연 시간보다 오래 걸리면 같은 요청을 한 번 더 보내고 먼저 온 온전한 응답을 씀 (HEDGER 설정)
+            call_started = time.perf_counter()
+            response = HEDGER.call(
+                lambda: client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=messages,
+                    temperature=0.8,
+                    max_tokens=max_tokens,
+                    **response_format_kwargs(response_format)
+                ),
+                key=f"questions_{requested}",
+                valid=lambda response: response_has_questions(response, requested),
+                tokens=reserved,
+                usage=lambda response: getattr(response.usage, "total_tokens", None)
+            )
+            call_seconds = time.perf_counter() - call_started
+            OPENAI_BREAKER.record_success()
+            RATE_LIMITER.settle(reserved, getattr(response.usage, "total_tokens", None))
+
+            # JSON 응답 파싱 (응답 내용은 화면 대신 메트릭 이벤트로 남김)
+            response_content = response.choices[0].message.content.strip()
+            METRICS.emit("openai_response", operation="generate_all_questions", attempt=attempt + 1,
+                         prompt_version=prompt_version(), preview=response_content[:200])
+
+            # JSON 파싱 시도 (코드 펜스, 끝에 남은 쉼표 등은 정리해서 읽음)
+            try:
+                questions = parse_response_list(response_content)
+                notify("success", f"✅ {len(questions)}개 질문 생성 성공!")
+                # max_tokens 추정치(TOKENS_PER_QUESTION)를 실제 응답과 비교할 수 있도록 기록
+                if questions and getattr(response.usage, "completion_tokens", None):
+                    METRICS.observe("completion_tokens_per_question", response.usage.completion_tokens / len(questions))
+            except ResponseFormatError as json_err:
+                RETRY_STATS.record("parse_error", time.perf_counter() - started)
+                record_openai_call("generate_all_questions", attempt + 1, call_seconds, response.usage, "parse_error",
+                                   queue_seconds=queue_seconds)
+                METRICS.emit("openai_parse_error", operation="generate_all_questions", attempt=attempt + 1,
+                             error=str(json_err), content=response_content)
+                notify("error", f"❌ JSON 파싱 오류: {str(json_err)}")
+                continue
+
+            # 형식이 올바른 질문만 남기고 차원별 초과분과 중복 질문은 잘라냄
+            kept = salvage_questions(kept + questions, question_count)
+            type_counts = count_dimensions(kept)
+
+            # 지정된 개수의 질문이 균형있게 모였으면 성공
+            if len(kept) == question_count:
+                record_openai_call("generate_all_questions", attempt + 1, call_seconds, response.usage,
+                                   queue_seconds=queue_seconds)
+                if repairing:
+                    REPAIR_STATS.record(repaired=1)
+                    notify("success", f"🛠️ 부족한 질문만 보충하여 균형잡힌 질문 생성 완료! {type_counts}")
+                else:
+                    REPAIR_STATS.record(first_try=1)
+                    notify("success", f"🎯 균형잡힌 질문 생성 완료! {type_counts}")
+                SERVED_QUESTIONS.add_many(q["question"] for q in kept)
+                return kept
+
+            shortfall = classify_shortfall(questions, question_count)
+            RETRY_STATS.record(shortfall, time.perf_counter() - started)
+            record_openai_call("generate_all_questions", attempt + 1, call_seconds, response.usage, shortfall,
+                               queue_seconds=queue_seconds)
+            invalid = [reason for reason in map(validate_question, questions) if reason]
+            if invalid:
+                notify("warning", f"⚠️ 형식이 잘못된 질문 {len(invalid)}개를 제외했습니다: {invalid[0]}")
+
+            if not repairing:
+                if len(questions) == question_count:
+                    notify("warning", f"⚠️ 질문 분포가 불균형합니다: {count_dimensions(questions)}")
+                else:
+                    notify("warning", f"⚠️ {len(questions)}개 질문만 생성됨 ({question_count}개 필요)")
+                if not entered_repair:
+                    entered_repair = True
+                    REPAIR_STATS.record(repair_needed=1, salvaged_questions=len(kept))
+
+            # 조건에 맞지 않으면 부족한 질문만 다시 요청
+            if attempt < max_retries - 1:
+                notify("info", f"🔄 {len(kept)}개 질문을 살리고 부족한 질문만 다시 요청합니다: {missing_dimensions(kept, question_count)} ({attempt + 1}/{max_retries})")
+                continue
+
+        except openai.AuthenticationError as e:
+            # 재시도해도 소용없으므로 호출한 쪽에서 처리하도록 그대로 전달 (half-open 시험 요청이면 자리는 돌려줌)
+            OPENAI_BREAKER.record_failure(e)
+            record_openai_call("generate_all_questions", attempt + 1, time.perf_counter() - started - queue_seconds,
+                               failure=failure_class(e), queue_seconds=queue_seconds)
+            raise
+
+        except openai.OpenAIError as e:
+            RETRY_STATS.record(failure_class(e), time.perf_counter() - started)
+            record_openai_call("generate_all_questions", attempt + 1, time.perf_counter() - started - queue_seconds,
+                               failure=failure_class(e), queue_seconds=queue_seconds)
+            OPENAI_BREAKER.record_failure(e)
+            # 429면 Retry-After 동안 모든 세션의 요청을 멈춤
+            RATE_LIMITER.observe_error(e)
+            notify("error", f"❌ OpenAI API 호출 중 오류: {str(e)}")
+            if attempt < max_retries - 1:
+                notify("info", f"🔄 재시도 중... ({attempt + 1}/{max_retries})")
+                time.sleep(OPENAI_BREAKER.backoff(attempt))
+            continue
+
+        except Exception as e:
+            RETRY_STATS.record(failure_class(e), time.perf_counter() - started)
+            record_openai_call("generate_all_questions", attempt + 1, time.perf_counter() - started,
+                               failure=failure_class(e))
+            OPENAI_BREAKER.record_failure(e)
+            notify("error", f"❌ 예상치 못한 오류: {str(e)}")
+            if attempt < max_retries - 1:
+                notify("info", f"🔄 재시도 중... ({attempt + 1}/{max_retries})")
+                continue
+            else:
+                break
+
+    if not fallback:
+        return None
+
+    # 실패시 살린 질문은 유지하고 부족한 차원만 기본 질문 사용
+    notify("warning", "⚠️ API 질문 생성에 실패하여 기본 질문을 사용합니다.")
+    SERVED_QUESTIONS.add_many(q["question"] for q in kept)
+    return kept + default_questions_for_missing(kept, question_count)
+
+def generate_question_sets(client, question_count=8, set_count=4, notify=silent_notify,
+                           response_format=DEFAULT_RESPONSE_FORMAT):
+    """한 번의 요청으로 서로 겹치지 않는 질문 세트 여러 개를 생성
+
+    세트마다 따로 검증하여 온전한 세트만 남기고, 앞 세트와 겹치는 질문은 버린다.
+    반환값은 (질문 세트 목록, 토큰 사용량) - API 오류는 호출한 쪽으로 그대로 전달되며,
+    서킷 브레이커가 열려 있으면 호출하지 않고 CircuitOpenError를 던진다.
+    모든 세트가 한 응답(MAX_QUESTIONS_PER_RESPONSE)에 담기도록 set_count를 줄인다.
+    """
+
+    if not OPENAI_BREAKER.allow():
+        raise CircuitOpenError("OpenAI API 장애로 서킷 브레이커가 열려 있습니다")
+
+    set_count = max(1, min(set_count, MAX_QUESTIONS_PER_RESPONSE // question_count))
+    messages = build_batch_messages(question_count, set_count)
+    max_tokens = max_tokens_for(question_count * set_count)
+    reserved = estimate_tokens(messages, max_tokens)
+    queue_seconds = RATE_LIMITER.acquire(reserved)
+
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.8,
+            max_tokens=max_tokens,
+            **response_format_kwargs(response_format, batch=True)
+        )
+    except openai.OpenAIError as e:
+        OPENAI_BREAKER.record_failure(e)
+        RATE_LIMITER.observe_error(e)
+        raise
+    OPENAI_BREAKER.record_success()
+    RATE_LIMITER.settle(reserved, getattr(response.usage, "total_tokens", None))
+    record_openai_call("generate_question_sets", 1, time.perf_counter() - started, response.usage,
+                       queue_seconds=queue_seconds)
+
+    usage = {
+        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(response.usage, "completion_tokens", 0)
+    }
+
+    response_content = response.choices[0].message.content.strip()
+    try:
+        raw_sets = parse_response_list(response_content, key="sets")
+    except ResponseFormatError as e:
+        notify("error", f"❌ 질문 세트 파싱 오류: {str(e)}")
+        return [], usage
+
+    sets = []
+    seen = set()
+    for raw_set in raw_sets:
+        questions = raw_set.get("questions") if isinstance(raw_set, dict) else None
+        if not isinstance(questions, list):
+            continue
+
+        # 앞 세트와 겹치는 질문은 빼고 세트별로 개수/균형 검증 (앞 세트와 거의 같은 질문은 salvage에서 걸러짐)
+        fresh = [q for q in questions if not (is_well_formed(q) and q["question"] in seen)]
+        kept = salvage_questions(fresh, question_count)
+        if len(kept) == question_count:
+            seen.update(q["question"] for q in kept)
+            SERVED_QUESTIONS.add_many(q["question"] for q in kept)
+            sets.append(kept)
+
+    notify("success", f"📦 질문 세트 {len(sets)}/{set_count}개 생성 완료!")
+    return sets, usage
+
+
+def get_default_questions(question_count=8):
+    """API 오류 시 사용할 기본 질문들"""
+
+    base_questions = [
+        {
+            "question": "새로운 사람들과의 모임에서 당신은?",
+            "type": "E/I",
+            "options": [
+                {"text": "적극적으로 다른 사람들에게 말을 걸고 대화를 시작한다", "type": "E"},
+                {"text": "조용히 있다가 누군가 먼저 말을 걸어주길 기다린다", "type": "I"}
+            ]
+        },
+        {
+            "question": "주말에 에너지를 충전하는 방법은?",
+            "type": "E/I",
+            "options": [
+                {"text": "친구들과 만나서 활발하게 대화하며 시간을 보낸다", "type": "E"},
+                {"text": "혼자만의 조용한 시간을 가지며 휴식한다", "type": "I"}
+            ]
+        },
+        {
+            "question": "새로운 정보를 학습할 때 당신은?",
+            "type": "S/N",
+            "options": [
+                {"text": "구체적인 사실과 세부사항부터 차근차근 익힌다", "type": "S"},
+                {"text": "전체적인 개념과 원리를 먼저 파악하려 한다", "type": "N"}
+            ]
+        },
+        {
+            "question": "문제를 해결할 때 당신은?",
+            "type": "S/N",
+            "options": [
+                {"text": "검증된 방법과 과거 경험을 활용한다", "type": "S"},
+                {"text": "새로운 아이디어와 창의적 방법을 시도한다", "type": "N"}
+            ]
+        },
+        {
+            "question": "중요한 결정을 내릴 때 당신은?",
+            "type": "T/F",
+            "options": [
+                {"text": "논리적 분석과 객관적 기준을 중시한다", "type": "T"},
+                {"text": "관련된 사람들의 감정과 가치를 우선 고려한다", "type": "F"}
+            ]
+        },
+        {
+            "question": "팀에서 갈등이 생겼을 때 당신은?",
+            "type": "T/F",
+            "options": [
+                {"text": "사실에 근거해 문제의 원인을 분석하고 해결방안을 찾는다", "type": "T"},
+                {"text": "구성원들의 마음을 달래고 화합을 이루려 노력한다", "type": "F"}
+            ]
+        },
+        {
+            "question": "여행 계획을 세울 때 당신은?",
+            "type": "J/P",
+            "options": [
+                {"text": "미리 상세한 일정을 짜고 예약을 완료한다", "type": "J"},
+                {"text": "대략적인 계획만 세우고 현지에서 즉흥적으로 결정한다", "type": "P"}
+            ]
+        },
+        {
+            "question": "업무나 과제를 처리할 때 당신은?",
+            "type": "J/P",
+            "options": [
+                {"text": "계획을 세워 단계별로 체계적으로 진행한다", "type": "J"},
+                {"text": "상황에 따라 유연하게 순서를 바꿔가며 진행한다", "type": "P"}
+            ]
+        }
+    ]
+
+    # 요청된 질문 개수에 맞춰 반복하여 반환 (차원마다 2개씩 있으므로 차원별로 번갈아 반복해야 균형이 맞음)
+    questions_per_dimension = question_count // 4
+    result_questions = []
+
+    for i in range(questions_per_dimension):
+        for j in range(4):  # 4개 차원
+            question_index = j * 2 + i % 2
+            result_questions.append(base_questions[question_index])
+
+    return result_questions
+
+
+class QuestionStreamParser:
+    """스트리밍으로 들어오는 {"questions": [...]} JSON 조각에서 완성된 질문 객체를 하나씩 꺼내는 파서"""
+
+    _ARRAY_START = re.compile(r'"questions"\s*:\s*\[')
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = None
+        self.finished = False
+
+    def feed(self, chunk):
+        """새 조각을 추가하고 이번에 완성된 질문 객체 목록을 반환"""
+        self._buffer += chunk
+        items = []
+
+        # "questions" 배열이 시작되기 전까지는 버퍼만 쌓음 (코드 펜스 등 앞부분 텍스트는 무시)
+        if self._pos is None:
+            match = self._ARRAY_START.search(self._buffer)
+            if not match:
+                return items
+            self._pos = match.end()
+
+        while self._pos < len(self._buffer) and not self.finished:
+            ch = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = self._pos
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(parse_json_response(self._buffer[self._start:self._pos + 1]))
+                    except ResponseFormatError:
+                        pass
+                    self._start = None
+            elif ch == "]" and self._depth == 0:
+                self.finished = True
+
+            self._pos += 1
+
+        # 이미 처리한 앞부분은 버려서 버퍼가 계속 커지지 않도록 함
+        keep_from = self._start if self._start is not None else self._pos
+        self._buffer = self._buffer[keep_from:]
+        self._pos -= keep_from
+        if self._start is not None:
+            self._start = 0
+
+        return items
+
+
+# 기본 질문을 꺼낼 질문 은행 샘플러 (use_question_bank로 지정, 없으면 하드코딩된 기본 질문만 사용)
+_question_bank = None
+
+
+def use_question_bank(sampler):
+    """부족한 질문을 채울 때 쓸 QuestionBankSampler를 지정 (None이면 하드코딩된 기본 질문으로 되돌림)"""
+    global _question_bank
+    _question_bank = sampler
+
+
+def default_questions_for_missing(questions, question_count):
+    """차원별로 부족한 만큼만 채울 기본 질문 목록 - 질문 은행이 있으면 은행에서 먼저 꺼냄"""
+    questions_per_dimension = question_count // 4
+    type_counts = count_dimensions(questions)
+
+    result = []
+    if _question_bank is not None:
+        drawn = _question_bank.sample(
+            missing_dimensions(questions, question_count),
+            exclude=(q.get("question") for q in questions if isinstance(q, dict))
+        )
+        for dimension_questions in drawn.values():
+            for q in dimension_questions:
+                type_counts[q["type"]] += 1
+                result.append(q)
+
+    # 은행이 없거나 모자라면 하드코딩된 기본 질문으로
+    for q in get_default_questions(question_count):
+        if type_counts[q["type"]] < questions_per_dimension:
+            type_counts[q["type"]] += 1
+            result.append(q)
+    return result
+
+
+def stream_questions(client, question_count=8, notify=silent_notify, fallback=True,
+                     response_format=DEFAULT_RESPONSE_FORMAT):
+    """질문을 스트리밍으로 생성하여 완성되는 대로 하나씩 yield
+
+    차원별 개수 검증은 질문이 도착할 때마다 수행하며, 이미 꽉 찬 차원의 질문이나 중복 질문(거의 같은
+    질문 포함)은 버린다. 재시도 후에도 부족하면 fallback=True일 때 부족한 차원만 기본 질문으로 채운다.
+    """
+
+    questions_per_dimension = question_count // 4
+    accepted = []
+    type_counts = count_dimensions(accepted)
+    seen = set()
+    duplicates = DuplicateFilter(SERVED_QUESTIONS)
+
+    max_retries = 3
+    for attempt in range(max_retries):
+        if not OPENAI_BREAKER.allow():
+            RETRY_STATS.record("circuit_open", 0.0)
+            notify("warning", "⚠️ OpenAI API 장애가 감지되어 잠시 API 호출을 건너뜁니다.")
+            break
+
+        started = time.perf_counter()
+        queue_seconds = 0.0
+        shortfall = "short_count"
+        try:
+            # 재시도 때는 이미 보여준 질문을 알려주고 부족한 차원만 요청
+            missing = missing_dimensions(accepted, question_count)
+            if accepted:
+                REPAIR_STATS.record(requested_questions=sum(missing.values()))
+                messages = build_repair_messages(missing, accepted)
+            else:
+                messages = build_messages(question_count)
+
+            # 사용량은 스트림 마지막 chunk로 받아(include_usage) 다 읽은 뒤 추정치와 맞춤
+            max_tokens = max_tokens_for(sum(missing.values()))
+            reserved = estimate_tokens(messages, max_tokens)
+            queue_seconds = RATE_LIMITER.acquire(reserved)
+            call_started = time.perf_counter()
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.8,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                **response_format_kwargs(response_format)
+            )
+            OPENAI_BREAKER.record_success()
+
+            parser = QuestionStreamParser()
+            usage = None
+            try:
+                for chunk in response:
+                    usage = getattr(chunk, "usage", None) or usage
+                    if len(accepted) == question_count or not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+
+                    for q in parser.feed(chunk.choices[0].delta.content):
+                        if not is_well_formed(q):
+                            shortfall = "invalid_question"
+                            continue
+                        if type_counts[q["type"]] >= questions_per_dimension or q["question"] in seen:
+                            if shortfall == "short_count":
+                                shortfall = "unbalanced"
+                            continue
+                        if not duplicates.check(q["question"]):
+                            METRICS.increment("near_duplicate_questions_total")
+                            continue
+
+                        type_counts[q["type"]] += 1
+                        seen.add(q["question"])
+                        SERVED_QUESTIONS.add(q["question"])
+                        accepted.append(q)
+                        yield q
+            finally:
+                response.close()
+            call_seconds = time.perf_counter() - call_started
+            RATE_LIMITER.settle(reserved, getattr(usage, "total_tokens", None))
+
+            if len(accepted) == question_count:
+                record_openai_call("stream_questions", attempt + 1, call_seconds, usage, queue_seconds=queue_seconds)
+                notify("success", f"🎯 균형잡힌 질문 생성 완료! {type_counts}")
+                return
+
+            RETRY_STATS.record(shortfall, time.perf_counter() - started)
+            record_openai_call("stream_questions", attempt + 1, call_seconds, usage, shortfall,
+                               queue_seconds=queue_seconds)
+            notify("warning", f"⚠️ {len(accepted)}개 질문만 생성됨 ({question_count}개 필요) - 분포: {type_counts}")
+            if attempt < max_retries - 1:
+                notify("info", f"🔄 부족한 질문을 다시 요청합니다... ({attempt + 1}/{max_retries})")
+
+        except openai.AuthenticationError as e:
+            OPENAI_BREAKER.record_failure(e)
+            record_openai_call("stream_questions", attempt + 1, time.perf_counter() - started - queue_seconds,
+                               failure=failure_class(e), queue_seconds=queue_seconds)
+            raise
+
+        except openai.OpenAIError as e:
+            RETRY_STATS.record(failure_class(e), time.perf_counter() - started)
+            record_openai_call("stream_questions", attempt + 1, time.perf_counter() - started - queue_seconds,
+                               failure=failure_class(e), queue_seconds=queue_seconds)
+            OPENAI_BREAKER.record_failure(e)
+            RATE_LIMITER.observe_error(e)
+            notify("error", f"❌ OpenAI API 호출 중 오류: {str(e)}")
+            if attempt < max_retries - 1:
+                notify("info", f"🔄 재시도 중... ({attempt + 1}/{max_retries})")
+                time.sleep(OPENAI_BREAKER.backoff(attempt))
+
+    if not fallback:
+        return
+
+    # 이미 보여준 질문은 유지하고 부족한 차원만 기본 질문으로 채움
+    notify("warning", "⚠️ 일부 질문을 생성하지 못해 기본 질문으로 채웁니다.")
+    for q in default_questions_for_missing(accepted, question_count):
+        yield q
+
+
+class QuestionStream:
+    """백그라운드에서 채워지는 질문 목록 - 생성 중에도 앞쪽 질문부터 읽을 수 있음"""
+
+    def __init__(self, question_count):
+        self.question_count = question_count
+        self.questions = []
+        self.error = None
+        self._done = threading.Event()
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __getitem__(self, index):
+        return self.questions[index]
+
+    def __iter__(self):
+        return iter(list(self.questions))
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def fill(self, questions):
+        """질문 iterator를 끝까지 소비하며 목록을 채움 - 모두 채워지면 self, 아니면 None 반환"""
+        try:
+            for q in questions:
+                self.questions.append(q)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+        return self if len(self.questions) >= self.question_count else None
+
+    def complete_with_defaults(self):
+        """생성이 끝났는데 질문이 부족하면 부족한 차원만 기본 질문으로 채움"""
+        if self.done:
+            self.questions.extend(default_questions_for_missing(self.questions, self.question_count))
+
+
+async def _generate_dimension(async_client, dimension, count, notify, response_format, max_retries=3):
+    """한 차원의 질문을 생성하고 검증 - 모자라면 그 차원의 부족분만 재요청하며, 끝내 실패하면 None"""
+    kept = []
+    duplicates = DuplicateFilter(SERVED_QUESTIONS)
+    for attempt in range(max_retries):
+        if not OPENAI_BREAKER.allow():
+            RETRY_STATS.record("circuit_open", 0.0)
+            notify("warning", f"⚠️ OpenAI API 장애가 감지되어 {dimension} 질문 생성을 건너뜁니다.")
+            return None
+
+        started = time.perf_counter()
+        if kept:
+            REPAIR_STATS.record(requested_questions=count - len(kept))
+            messages = build_repair_messages({dimension: count - len(kept)}, kept)
+        else:
+            messages = build_dimension_messages(dimension, count)
+
+        queue_seconds = 0.0
+        response = None
+        try:
+            # 스케줄러 대기는 블로킹이므로 이벤트 루프를 막지 않도록 스레드에서 (세션 정보는 그대로 전달됨)
+            max_tokens = max_tokens_for(count - len(kept))
+            reserved = estimate_tokens(messages, max_tokens)
+            queue_seconds = await asyncio.to_thread(RATE_LIMITER.acquire, reserved)
+            response = await async_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.8,
+                max_tokens=max_tokens,
+                **response_format_kwargs(response_format)
+            )
+            OPENAI_BREAKER.record_success()
+            RATE_LIMITER.settle(reserved, getattr(response.usage, "total_tokens", None))
+            questions = parse_response_list(response.choices[0].message.content)
+
+        except openai.AuthenticationError as e:
+            OPENAI_BREAKER.record_failure(e)
+            record_openai_call("generate_dimension", attempt + 1, time.perf_counter() - started - queue_seconds,
+                               failure=failure_class(e), queue_seconds=queue_seconds)
+            raise
+
+        except (openai.OpenAIError, ResponseFormatError) as e:
+            failure = "parse_error" if isinstance(e, ResponseFormatError) else failure_class(e)
+            RETRY_STATS.record(failure, time.perf_counter() - started)
+            record_openai_call("generate_dimension", attempt + 1, time.perf_counter() - started - queue_seconds,
+                               getattr(response, "usage", None), failure, queue_seconds=queue_seconds)
+            notify("warning", f"⚠️ {dimension} 질문 생성 실패: {str(e)}")
+            if attempt < max_retries - 1:
+                notify("info", f"🔄 {dimension} 재시도 중... ({attempt + 1}/{max_retries})")
+            if isinstance(e, openai.OpenAIError):
+                OPENAI_BREAKER.record_failure(e)
+                RATE_LIMITER.observe_error(e)
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(OPENAI_BREAKER.backoff(attempt))
+            continue
+
+        # 이 차원에 해당하는 올바른 질문만 살려서 누적 (거의 같은 질문은 버리고 그 자리는 재요청)
+        seen = {q["question"] for q in kept}
+        for q in questions:
+            if len(kept) < count and is_well_formed(q) and q["type"] == dimension and q["question"] not in seen:
+                if not duplicates.check(q["question"]):
+                    METRICS.increment("near_duplicate_questions_total")
+                    continue
+                seen.add(q["question"])
+                kept.append(q)
+
+        call_seconds = time.perf_counter() - started - queue_seconds
+        if len(kept) == count:
+            record_openai_call("generate_dimension", attempt + 1, call_seconds, response.usage,
+                               queue_seconds=queue_seconds)
+            return kept
+
+        shortfall = "invalid_question" if any(not is_well_formed(q) for q in questions) else "short_count"
+        RETRY_STATS.record(shortfall, time.perf_counter() - started)
+        record_openai_call("generate_dimension", attempt + 1, call_seconds, response.usage, shortfall,
+                           queue_seconds=queue_seconds)
+        notify("warning", f"⚠️ {dimension} 질문이 {len(kept)}개만 생성됨 ({count}개 필요)")
+        if attempt < max_retries - 1:
+            notify("info", f"🔄 {dimension} 재시도 중... ({attempt + 1}/{max_retries})")
+
+    return None
+
+
+async def generate_questions_by_dimension(async_client, question_count=8, notify=silent_notify, fallback=True,
+                                          response_format=DEFAULT_RESPONSE_FORMAT):
+    """네 차원의 질문을 동시에 요청한 뒤 차원 순서대로 섞어 합침
+
+    한 차원이 실패해도 그 차원만 다시 요청하므로 전체 세트를 버리지 않는다.
+    끝내 실패한 차원은 fallback=True면 기본 질문으로 채우고, 아니면 None을 반환한다.
+    """
+
+    questions_per_dimension = question_count // 4
+    results = await asyncio.gather(*(
+        _generate_dimension(async_client, dimension, questions_per_dimension, notify, response_format)
+        for dimension in DIMENSIONS
+    ))
+
+    by_dimension = {}
+    generated = []
+    for dimension, questions in zip(DIMENSIONS, results):
+        if questions is None:
+            if not fallback:
+                return None
+            notify("warning", f"⚠️ {dimension} 질문 생성에 실패하여 기본 질문을 사용합니다.")
+            questions = [q for q in default_questions_for_missing([], question_count) if q["type"] == dimension]
+        else:
+            generated.extend(questions)
+        by_dimension[dimension] = questions
+
+    # 모델이 만든 질문만 중복 색인에 넣음 (기본 질문은 세션마다 같으므로 넣으면 다음 생성이 막힘)
+    SERVED_QUESTIONS.add_many(q["question"] for q in generated)
+    notify("success", f"🎯 차원별 병렬 질문 생성 완료! ({question_count}개)")
+    return [by_dimension[dimension][i] for i in range(questions_per_dimension) for dimension in DIMENSIONS]
+
+
+def generate_all_questions_parallel(client, question_count=8, notify=silent_notify, fallback=True,
+                                    response_format=DEFAULT_RESPONSE_FORMAT, connection=None):
+    """generate_all_questions와 같은 형태로 호출할 수 있는 차원별 병렬 생성
+
+    connection(OpenAIConnection)이 있으면 공유 이벤트 루프와 연결 풀에서 실행하고, 없으면
+    client와 같은 설정의 AsyncOpenAI 클라이언트를 만들어 실행한다. 스크립트 스레드와
+    프리페치 스레드 어디서든 호출할 수 있다.
+    """
+
+    if connection is not None:
+        return connection.run_async(
+            generate_questions_by_dimension(connection.async_client, question_count, notify, fallback, response_format)
+        )
+
+    async def run():
+        async with openai.AsyncOpenAI(api_key=client.api_key, base_url=client.base_url) as async_client:
+            return await generate_questions_by_dimension(async_client, question_count, notify, fallback, response_format)
+
+    return asyncio.run(run())
@@ -0,0 +1,223 @@
+import json
+import re
+import threading
+
+from metrics import METRICS
+
+
+DIMENSIONS = ["E/I", "S/N", "T/F", "J/P"]
+
+_QUESTION_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "question": {"type": "string"},
+        "type": {"type": "string", "enum": DIMENSIONS},
+        "options": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string"},
+                    "type": {"type": "string", "enum": ["E", "I", "S", "N", "T", "F", "J", "P"]}
+                },
+                "required": ["text", "type"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["question", "type", "options"],
+    "additionalProperties": False
+}
+
+# {"questions": [...]} 응답 스키마
+QUESTIONS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "questions": {"type": "array", "items": _QUESTION_ITEM_SCHEMA}
+    },
+    "required": ["questions"],
+    "additionalProperties": False
+}
+
+# {"sets": [{"questions": [...]}, ...]} 응답 스키마 (batch 방식)
+QUESTION_SETS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sets": {"type": "array", "items": QUESTIONS_SCHEMA}
+    },
+    "required": ["sets"],
+    "additionalProperties": False
+}
+
+# 응답 형식 강제 방식
+# "json_schema" - 구조화 출력(스키마 강제) / "json_object" - JSON 모드 / "none" - 프롬프트 지시만 사용
+RESPONSE_FORMATS = ["json_schema", "json_object", "none"]
+DEFAULT_RESPONSE_FORMAT = "json_schema"
+
+
+def build_response_format(mode=DEFAULT_RESPONSE_FORMAT, batch=False):
+    """chat.completions.create에 넘길 response_format 인자 - "none"이면 None"""
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "mbti_question_sets" if batch else "mbti_questions",
+                "schema": QUESTION_SETS_SCHEMA if batch else QUESTIONS_SCHEMA,
+                "strict": True
+            }
+        }
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+
+def response_format_kwargs(mode=DEFAULT_RESPONSE_FORMAT, batch=False):
+    """response_format을 지정하지 않는 경우 인자 자체를 빼기 위한 kwargs"""
+    response_format = build_response_format(mode, batch)
+    return {"response_format": response_format} if response_format else {}
+
+
+class ResponseFormatError(ValueError):
+    """응답을 JSON으로 읽을 수 없거나 기대한 최상위 구조가 아닐 때"""
+
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+
+def _remove_trailing_commas(text):
+    """문자열 바깥의 `,}` / `,]` 에서 쉼표를 제거"""
+    result = []
+    in_string = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        result.append(ch)
+    return "".join(result)
+
+
+def parse_json_response(text):
+    """모델 응답을 관대하게 JSON으로 읽음 - 코드 펜스, 앞뒤 설명 문장, 끝에 남은 쉼표를 정리"""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    fenced = _CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ResponseFormatError("JSON 객체를 찾을 수 없습니다")
+    text = _remove_trailing_commas(text[start:end + 1])
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ResponseFormatError(str(e)) from e
+
+
+def parse_response_list(text, key="questions"):
+    """응답에서 최상위 key의 목록을 꺼냄 ({"questions": [...]} / {"sets": [...]})"""
+    data = parse_json_response(text)
+    if not isinstance(data, dict) or not isinstance(data.get(key), list):
+        raise ResponseFormatError(f'"{key}" 목록이 없습니다')
+    return data[key]
+
+
+def validate_question(q):
+    """질문 하나를 엄격하게 검증 - 문제가 없으면 None, 있으면 이유 문자열
+
+    선택지는 정확히 두 개여야 하고, 두 선택지의 type은 질문 차원의 두 글자(예: E/I → E, I)와
+    하나씩 정확히 맞아야 한다. 그렇지 않으면 calculate_mbti에서 KeyError나 잘못된 집계가 생긴다.
+    """
+    if not isinstance(q, dict):
+        return "질문이 객체가 아닙니다"
+    if not isinstance(q.get("question"), str) or not q["question"].strip():
+        return "질문 내용이 비어 있습니다"
+    if q.get("type") not in DIMENSIONS:
+        return f"알 수 없는 차원입니다: {q.get('type')}"
+
+    options = q.get("options")
+    if not isinstance(options, list) or len(options) != 2:
+        return "선택지가 정확히 두 개가 아닙니다"
+    for option in options:
+        if not isinstance(option, dict):
+            return "선택지가 객체가 아닙니다"
+        if not isinstance(option.get("text"), str) or not option["text"].strip():
+            return "선택지 내용이 비어 있습니다"
+        if not isinstance(option.get("type"), str):
+            return "선택지 유형이 없습니다"
+
+    if sorted(option.get("type") for option in options) != sorted(q["type"].split("/")):
+        return f"선택지 유형이 {q['type']} 차원과 맞지 않습니다"
+
+    return None
+
+
+def failure_class(error):
+    """API 예외를 재시도 통계용 실패 유형으로 분류"""
+    # openai는 첫 화면에 필요 없으므로 처음 분류할 때 불러옴 (이때는 이미 불러온 뒤)
+    import openai
+
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limit"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection_error"
+    if isinstance(error, openai.OpenAIError):
+        return "api_error"
+    return "unexpected"
+
+
+class RetryStats:
+    """실패 유형별 재시도 횟수와 그 시도에 쓴 시간을 모으는 프로세스 공용 통계
+
+    실패 유형: parse_error, invalid_question, short_count, unbalanced,
+    timeout, rate_limit, connection_error, api_error, unexpected,
+    circuit_open (서킷 브레이커가 열려 있어 호출하지 않음)
+
+    기록할 때마다 METRICS의 question_retries_total / question_retry_seconds에도 실패 유형 라벨로 올린다
+    (OpenAI 호출별 지표 openai_requests_total 옆에서 볼 수 있음).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._seconds = {}
+
+    def record(self, failure, seconds):
+        with self._lock:
+            self._counts[failure] = self._counts.get(failure, 0) + 1
+            self._seconds[failure] = self._seconds.get(failure, 0.0) + seconds
+        METRICS.increment("question_retries_total", failure=failure)
+        METRICS.observe("question_retry_seconds", seconds, failure=failure)
+
+    def snapshot(self):
+        """{실패 유형: {"count": 횟수, "seconds": 누적 시간, "mean_seconds": 평균}}"""
+        with self._lock:
+            return {
+                failure: {
+                    "count": count,
+                    "seconds": self._seconds[failure],
+                    "mean_seconds": self._seconds[failure] / count
+                }
+                for failure, count in self._counts.items()
+            }
+
+
+RETRY_STATS = RetryStats()
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from adaptive import dimension_masks
+from metrics import METRICS
+
+
+# 질문 세트 캐시 기본 설정 (secrets.toml의 [question_sets] 섹션으로 덮어쓸 수 있음)
+DEFAULT_QUESTION_SET_SETTINGS = {
+    "capacity": 5000   # 보관하는 질문 세트 수 - 넘으면 가장 오래 쓰이지 않은 세트부터 버림
+}
+
+
+def question_set_id(questions):
+    """질문 세트의 내용 주소 - 내용이 같으면 어느 세션에서 만들었든 같은 ID"""
+    payload = json.dumps(list(questions), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class QuestionSet:
+    """캐시에 한 번만 두는 질문 세트 - 질문 튜플과 차원별 마스크(adaptive.dimension_masks)
+
+    여러 세션이 같은 객체를 읽기만 하므로 질문 dict를 고치면 안 된다.
+    """
+
+    __slots__ = ("id", "questions", "masks")
+
+    def __init__(self, set_id, questions):
+        self.id = set_id
+        self.questions = questions
+        self.masks = dimension_masks(questions)
+
+
+class QuestionSetCache:
+    """프로세스 전체에서 공유하는 내용 주소 기반 질문 세트 캐시 (LRU)
+
+    세션은 세트 ID만 세션 상태에 들고 있고, 질문은 여기서 꺼내 읽는다. 대체 경로의 기본 질문처럼 같은
+    세트를 여러 세션이 받으면 세트는 한 벌만 남는다. 밀려난 세트는 get()이 None을 주므로 세션 저장소에
+    남은 질문으로 다시 intern()한다.
+    """
+
+    def __init__(self, settings=None, name="questions"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._sets = OrderedDict()
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        with self._lock:
+            self.settings = {**DEFAULT_QUESTION_SET_SETTINGS, **dict(settings or {})}
+            self._evict()
+
+    def _evict(self):
+        while len(self._sets) > self.settings["capacity"]:
+            self._sets.popitem(last=False)
+            METRICS.increment("question_set_evictions_total", cache=self.name)
+        METRICS.set("question_set_cache_size", len(self._sets), cache=self.name)
+
+    def intern(self, questions):
+        """질문 세트를 캐시에 넣고 ID를 반환 - 같은 내용이 이미 있으면 있는 세트를 씀"""
+        set_id = question_set_id(questions)
+        with self._lock:
+            if set_id in self._sets:
+                self._sets.move_to_end(set_id)
+                METRICS.increment("question_set_interned_total", cache=self.name, result="shared")
+                return set_id
+            self._sets[set_id] = QuestionSet(set_id, tuple(questions))
+            METRICS.increment("question_set_interned_total", cache=self.name, result="new")
+            self._evict()
+        return set_id
+
+    def get(self, set_id):
+        """ID의 QuestionSet - 밀려났거나 없으면 None"""
+        with self._lock:
+            question_set = self._sets.get(set_id)
+            if question_set is None:
+                METRICS.increment("question_set_misses_total", cache=self.name)
+                return None
+            self._sets.move_to_end(set_id)
+            return question_set
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sets)
+
+    def clear(self):
+        with self._lock:
+            self._sets.clear()
+            METRICS.set("question_set_cache_size", 0, cache=self.name)
+
+
+# 프로세스 전체에서 공유하는 질문 세트 캐시
+QUESTION_SETS = QuestionSetCache()
@@ -0,0 +1,259 @@
+import contextvars
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from metrics import METRICS
+
+
+# 요청 스케줄러 기본 설정 (secrets.toml의 [rate_limit] 섹션으로 덮어쓸 수 있음)
+DEFAULT_RATE_LIMIT_SETTINGS = {
+    "enabled": True,
+    "requests_per_minute": 500,     # 처음 한도 - 응답의 x-ratelimit-limit-requests를 받으면 그 값을 씀
+    "tokens_per_minute": 200000,    # 처음 한도 - 응답의 x-ratelimit-limit-tokens를 받으면 그 값을 씀
+    "burst_seconds": 10.0,          # 한꺼번에 보낼 수 있는 양 (분당 한도의 이 시간만큼)
+    "max_pause": 60.0               # 429의 Retry-After로 모든 요청을 멈추는 최대 시간(초)
+}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+_OWNER = contextvars.ContextVar("rate_limit_owner", default=None)
+
+
+def parse_duration(value):
+    """x-ratelimit-reset-* 값("1s", "6m0s", "20ms")을 초로 - 읽을 수 없으면 None"""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(headers):
+    """429 응답에서 다시 보내기까지 기다릴 시간(초) - retry-after-ms, retry-after, x-ratelimit-reset-* 순으로 (없으면 None)"""
+    milliseconds = _number(headers.get("retry-after-ms"))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    seconds = _number(headers.get("retry-after"))
+    if seconds is not None:
+        return seconds
+    resets = [parse_duration(headers.get(f"x-ratelimit-reset-{kind}")) for kind in ("requests", "tokens")]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def estimate_tokens(messages, max_tokens=0):
+    """요청이 분당 토큰 한도에서 차지할 양 추정 - 프롬프트 글자 수의 절반 + max_tokens
+
+    OpenAI도 요청을 받을 때 max_tokens까지 한도에서 미리 빼므로 같은 방식으로 잡는다.
+    프롬프트를 적게 잡았으면 응답을 받은 뒤 settle()로 모자란 만큼 더 뺀다.
+    """
+    return sum(len(str(message.get("content", ""))) for message in messages) // 2 + (max_tokens or 0)
+
+
+@contextmanager
+def request_owner(owner):
+    """이 블록에서 보내는 요청을 owner(세션) 줄에 세움 - 스레드/코루틴마다 따로 적용됨"""
+    token = _OWNER.set(owner)
+    try:
+        yield
+    finally:
+        _OWNER.reset(token)
+
+
+class TokenBucket:
+    """분당 per_minute만큼 고르게 차오르고 burst_seconds 몫까지 쌓이는 버킷 (잠금은 쓰는 쪽에서)"""
+
+    def __init__(self, per_minute, burst_seconds, clock=time.monotonic):
+        self._clock = clock
+        self.level = None
+        self.configure(per_minute, burst_seconds)
+        self.level = self.capacity
+        self._updated = clock()
+
+    def configure(self, per_minute, burst_seconds):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        if self.level is not None:
+            self.level = min(self.level, self.capacity)
+
+    def _refill(self):
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount):
+        """amount를 꺼낼 수 있을 때까지 남은 시간 (capacity보다 큰 양은 가득 찼을 때 꺼냄)"""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount):
+        """amount를 꺼냄 - capacity보다 큰 양이면 모자란 만큼 음수가 되어 다음 요청이 더 기다림"""
+        self._refill()
+        self.level -= amount
+
+    def limit_to(self, remaining):
+        """서버가 알려준 남은 양보다 많이 들고 있지 않도록 맞춤 (같은 키를 쓰는 다른 프로세스 몫 반영)"""
+        self._refill()
+        self.level = min(self.level, remaining)
+
+
+class RateLimitScheduler:
+    """모든 세션이 공유하는 OpenAI 요청 스케줄러 - 요청 수/토큰 수 토큰 버킷과 세션별 공정 큐
+
+    요청은 acquire()로 차례와 한도를 기다린 뒤 보낸다. 기다리는 요청은 owner(세션)별 줄에 서고, 줄 사이는
+    돌아가며(round-robin) 내보내므로 요청이 많은 세션 뒤에 다른 세션이 밀리지 않는다.
+    응답의 x-ratelimit-* 헤더(observe_headers)로 한도와 남은 양을 맞추고, 429면 Retry-After 동안
+    모든 요청을 멈춘다. 기다린 시간은 rate_limit_wait_seconds와 openai_queue_seconds로 따로 나간다.
+    """
+
+    def __init__(self, settings=None, name="openai", clock=time.monotonic):
+        self.name = name
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._lanes = OrderedDict()
+        self._paused_until = 0.0
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        with self._cond:
+            self.settings = {**DEFAULT_RATE_LIMIT_SETTINGS, **dict(settings or {})}
+            burst = self.settings["burst_seconds"]
+            self._requests = TokenBucket(self.settings["requests_per_minute"], burst, self._clock)
+            self._tokens = TokenBucket(self.settings["tokens_per_minute"], burst, self._clock)
+            self._paused_until = 0.0
+            self._publish()
+            self._cond.notify_all()
+
+    def _publish(self):
+        METRICS.set("rate_limit_queue_depth", sum(map(len, self._lanes.values())), limiter=self.name)
+        METRICS.set("rate_limit_requests_per_minute", self._requests.per_minute, limiter=self.name)
+        METRICS.set("rate_limit_tokens_per_minute", self._tokens.per_minute, limiter=self.name)
+
+    def _head(self):
+        """다음에 보낼 요청 - 맨 앞 줄의 맨 앞 (빈 줄은 바로 지우므로 첫 줄만 보면 됨)"""
+        for lane in self._lanes.values():
+            return lane[0]
+        return None
+
+    def _delay(self, tokens):
+        return max(
+            self._paused_until - self._clock(),
+            self._requests.wait_time(1),
+            self._tokens.wait_time(tokens)
+        )
+
+    def acquire(self, tokens, owner=None):
+        """tokens(estimate_tokens)짜리 요청을 보낼 차례를 기다리고 한도에서 뺌 - 기다린 시간(초)을 반환
+
+        owner를 주지 않으면 request_owner()로 정한 세션의 줄에 선다.
+        """
+        if not self.settings["enabled"]:
+            return 0.0
+        if owner is None:
+            owner = _OWNER.get()
+
+        ticket = object()
+        started = self._clock()
+        with self._cond:
+            self._lanes.setdefault(owner, deque()).append(ticket)
+            self._publish()
+            while True:
+                delay = self._delay(tokens) if self._head() is ticket else None
+                if delay is not None and delay <= 0:
+                    break
+                self._cond.wait(delay)
+
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            lane = self._lanes[owner]
+            lane.popleft()
+            if lane:
+                self._lanes.move_to_end(owner)
+            else:
+                del self._lanes[owner]
+            self._publish()
+            self._cond.notify_all()
+
+        waited = self._clock() - started
+        METRICS.observe("rate_limit_wait_seconds", waited, limiter=self.name)
+        return waited
+
+    def try_acquire(self, tokens):
+        """기다리지 않고 지금 바로 보낼 수 있을 때만 한도에서 빼고 True - 기다리는 요청이 있거나 한도가 모자라면 False
+
+        헤지처럼 보내지 않아도 되는 추가 요청용이라 줄에 서지 않고, 기다리는 요청을 앞지르지도 않는다.
+        """
+        if not self.settings["enabled"]:
+            return True
+        with self._cond:
+            if self._lanes or self._delay(tokens) > 0:
+                return False
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self._publish()
+        return True
+
+    def settle(self, reserved, used):
+        """실제 토큰 사용량(used)이 acquire 때 뺀 추정치(reserved)보다 많으면 차이만큼 더 뺌
+
+        OpenAI는 요청을 받을 때 max_tokens까지 한도에서 빼고 덜 써도 돌려주지 않으므로, 적게 쓴 만큼은 돌려받지 않는다.
+        """
+        if used is None or used <= reserved or not self.settings["enabled"]:
+            return
+        with self._cond:
+            self._tokens.take(used - reserved)
+
+    def observe_headers(self, headers, status_code=None):
+        """응답 헤더의 x-ratelimit-*로 한도와 남은 양을 맞추고, 429면 Retry-After 동안 모든 요청을 멈춤"""
+        with self._cond:
+            burst = self.settings["burst_seconds"]
+            for bucket, kind in ((self._requests, "requests"), (self._tokens, "tokens")):
+                limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+                if limit:
+                    bucket.configure(limit, burst)
+                remaining = _number(headers.get(f"x-ratelimit-remaining-{kind}"))
+                if remaining is not None:
+                    bucket.limit_to(remaining)
+
+            if status_code == 429:
+                METRICS.increment("rate_limited_total", limiter=self.name)
+                pause = min(retry_after(headers) or 1.0, self.settings["max_pause"])
+                self._paused_until = max(self._paused_until, self._clock() + pause)
+                METRICS.emit("rate_limit_pause", limiter=self.name, seconds=round(pause, 3))
+
+            self._publish()
+            self._cond.notify_all()
+
+    def observe_error(self, error):
+        """API 오류 응답(429 등)의 헤더를 반영 - 응답이 없는 오류(타임아웃, 연결 오류)는 무시"""
+        response = getattr(error, "response", None)
+        if response is not None:
+            self.observe_headers(response.headers, getattr(response, "status_code", None))
+
+    def snapshot(self):
+        """모니터링용 현재 상태"""
+        with self._cond:
+            # 한도는 설정값 대신 헤더로 맞춘 지금 값
+            return {
+                **self.settings,
+                "queued": sum(map(len, self._lanes.values())),
+                "owners": len(self._lanes),
+                "paused_for": round(max(0.0, self._paused_until - self._clock()), 3),
+                "requests_per_minute": self._requests.per_minute,
+                "tokens_per_minute": self._tokens.per_minute
+            }
+
+
+# 프로세스 전체에서 공유하는 OpenAI 요청 스케줄러
+RATE_LIMITER = RateLimitScheduler()
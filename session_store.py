@@ -0,0 +1,269 @@
+import atexit
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from metrics import METRICS
+
+
+# 세션 저장소 기본 설정 (secrets.toml의 [session_store] 섹션으로 덮어쓸 수 있음)
+DEFAULT_SESSION_STORE_SETTINGS = {
+    "backend": "sqlite",          # "sqlite" / "redis" / "memory" / "none"
+    "path": "sessions.db",        # sqlite 파일 경로
+    "url": "redis://localhost:6379/0",
+    "ttl": 7 * 24 * 3600,         # 마지막 저장 후 이 시간(초)이 지나면 이어하기 불가
+    "flush_interval": 0.5         # write-behind 배치 간격 (초)
+}
+
+# 저장소에 남겨 다른 레플리카/재시작 후에도 테스트를 이어갈 수 있게 하는 세션 상태
+PERSISTED_KEYS = [
+    "question_count",
+    "test_started",
+    "questions_generated",
+    "answers",
+    "asked_questions",
+    "current_question",
+    "test_completed",
+    "started_at"
+]
+
+
+def new_session_token():
+    """URL 쿼리 파라미터에 넣을 이어하기 토큰"""
+    return secrets.token_urlsafe(12)
+
+
+# 질문 세트를 세트 ID로 저장하는 키 접두사 (세션 토큰에는 ':'이 없어 겹치지 않음)
+QUESTION_SET_PREFIX = "question_set:"
+
+
+def snapshot_state(session_state):
+    """세션 상태에서 저장할 값만 JSON으로 바꿀 수 있는 dict로 꺼냄
+
+    완성된 질문 세트는 save_question_set()으로 따로 저장하므로 세트 ID(question_set)만 남기고,
+    아직 생성 중인 QuestionStream은 ID가 없으므로 지금까지의 질문을 all_questions로 함께 저장한다.
+    """
+    state = {key: session_state[key] for key in PERSISTED_KEYS if key in session_state}
+    question_set = session_state.get("question_set")
+    if isinstance(question_set, str):
+        state["question_set"] = question_set
+    else:
+        state["all_questions"] = list(question_set or ())
+    return state
+
+
+class SessionStore:
+    """세션 상태 저장소 인터페이스 - 토큰별로 dict를 저장/조회/삭제"""
+
+    def load(self, token):
+        raise NotImplementedError
+
+    def save(self, token, state):
+        self.save_many({token: state})
+
+    def delete(self, token):
+        self.save_many({token: None})
+
+    def save_many(self, items):
+        """{token: state} 여러 개를 한 번에 저장 - state가 None이면 삭제"""
+        raise NotImplementedError
+
+    def save_question_set(self, set_id, questions):
+        """질문 세트를 세트 ID로 저장 - 세션에 세트를 넣을 때 한 번만 쓰고, 답변마다 저장하는 상태에는 ID만 남김"""
+        self.save(QUESTION_SET_PREFIX + set_id, {"questions": list(questions)})
+
+    def load_question_set(self, set_id):
+        """세트 ID로 저장된 질문 목록 - 없거나 만료되었으면 None"""
+        saved = self.load(QUESTION_SET_PREFIX + set_id)
+        return saved["questions"] if saved else None
+
+    def close(self):
+        pass
+
+
+class NullSessionStore(SessionStore):
+    """아무것도 저장하지 않는 저장소 (backend = "none")"""
+
+    def load(self, token):
+        return None
+
+    def save_many(self, items):
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """로컬 SQLite 파일에 세션을 저장 - 같은 호스트의 여러 프로세스가 파일을 공유할 수 있음 (WAL 모드)"""
+
+    def __init__(self, path, ttl=DEFAULT_SESSION_STORE_SETTINGS["ttl"]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "token TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def load(self, token):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE token = ? AND updated_at >= ?",
+                (token, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, items):
+        now = time.time()
+        upserts = [(token, json.dumps(state, ensure_ascii=False), now) for token, state in items.items() if state is not None]
+        deletes = [(token,) for token, state in items.items() if state is None]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO sessions (token, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(token) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                upserts
+            )
+            self._conn.executemany("DELETE FROM sessions WHERE token = ?", deletes)
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LocalRedis:
+    """Redis 서버 없이 쓰는 프로세스 내부 대체품 - RedisSessionStore가 쓰는 get/set/delete만 흉내냄"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def get(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (None, None))
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+
+class RedisSessionStore(SessionStore):
+    """Redis 호환 클라이언트(get/set(ex=)/delete, 있으면 pipeline)에 세션을 저장
+
+    여러 레플리카가 같은 Redis를 보면 어느 레플리카로 재접속해도 테스트를 이어갈 수 있다.
+    """
+
+    def __init__(self, client, ttl=DEFAULT_SESSION_STORE_SETTINGS["ttl"], prefix="simple_mbti:session:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def load(self, token):
+        value = self.client.get(self.prefix + token)
+        return json.loads(value) if value else None
+
+    def save_many(self, items):
+        target = self.client.pipeline() if hasattr(self.client, "pipeline") else self.client
+        for token, state in items.items():
+            if state is None:
+                target.delete(self.prefix + token)
+            else:
+                target.set(self.prefix + token, json.dumps(state, ensure_ascii=False), ex=int(self.ttl))
+        if target is not self.client:
+            target.execute()
+
+
+class WriteBehindStore(SessionStore):
+    """저장을 메모리에 모았다가 flush_interval마다 백그라운드 스레드에서 한 번에 기록하는 래퍼
+
+    save()는 바로 반환되므로 답변마다 저장해도 응답 시간이 늘지 않는다. 같은 토큰을 여러 번
+    저장하면 마지막 상태만 기록되며, 아직 기록되지 않은 상태도 load()로 읽을 수 있다.
+    """
+
+    def __init__(self, store, flush_interval=DEFAULT_SESSION_STORE_SETTINGS["flush_interval"]):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def load(self, token):
+        with self._lock:
+            if token in self._pending:
+                return self._pending[token]
+        return self.store.load(token)
+
+    def save_many(self, items):
+        with self._lock:
+            self._pending.update(items)
+
+    def flush(self):
+        """모아 둔 저장을 지금 기록 - 실패하면 더 새로운 상태가 없는 항목만 다음 번에 다시 시도"""
+        with self._lock:
+            items, self._pending = self._pending, {}
+        if not items:
+            return
+
+        started = time.perf_counter()
+        try:
+            self.store.save_many(items)
+        except Exception:
+            METRICS.increment("session_store_errors_total")
+            with self._lock:
+                for token, state in items.items():
+                    self._pending.setdefault(token, state)
+            return
+        METRICS.increment("session_store_writes_total", len(items))
+        METRICS.observe("session_store_flush_seconds", time.perf_counter() - started)
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            self.flush()
+            self.store.close()
+
+
+def create_session_store(settings=None):
+    """[session_store] 설정대로 저장소를 만들고 write-behind로 감쌈"""
+    settings = {**DEFAULT_SESSION_STORE_SETTINGS, **dict(settings or {})}
+    backend = settings["backend"]
+
+    if backend == "none":
+        return NullSessionStore()
+    if backend == "sqlite":
+        store = SQLiteSessionStore(settings["path"], settings["ttl"])
+    elif backend == "memory":
+        store = RedisSessionStore(LocalRedis(), settings["ttl"])
+    elif backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError('backend = "redis"를 쓰려면 redis 패키지를 설치해주세요 (pip install redis)') from e
+        store = RedisSessionStore(redis.Redis.from_url(settings["url"]), settings["ttl"])
+    else:
+        raise ValueError(f"알 수 없는 세션 저장소: {backend}")
+
+    return WriteBehindStore(store, settings["flush_interval"])
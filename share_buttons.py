@@ -0,0 +1,22 @@
+import os
+
+import streamlit.components.v1 as components
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# .streamlit/config.toml의 enableStaticServing으로 서빙되는 테마 스타일시트
+THEME_CSS_URL = "app/static/theme.css"
+
+_share_buttons = components.declare_component("share_buttons", path=os.path.join(STATIC_DIR, "share_buttons"))
+
+
+def share_buttons(mbti_type, share_text, share_url, kakao_url, key="share_buttons"):
+    """카카오톡 앱/클립보드 복사/웹 공유 버튼 컴포넌트
+
+    버튼 마크업과 스크립트(static/share_buttons/index.html)는 브라우저가 한 번만 받아 캐시하고,
+    재실행마다는 결과 데이터(share_pages.build_share_content로 미리 계산한 값)만 인자로 보낸다.
+    """
+    return _share_buttons(
+        mbti_type=mbti_type, share_text=share_text, share_url=share_url, kakao_url=kakao_url, key=key, default=None
+    )
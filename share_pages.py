@@ -0,0 +1,163 @@
+"""결과 공유 페이지 - 16개 유형의 공유 문구와 정적 결과 페이지(Open Graph 메타데이터 포함)
+
+공유 문구와 카카오톡 URL은 앱이 시작할 때 한 번 계산한다 (build_share_content).
+공유 링크를 연 친구는 Streamlit 세션 없이 정적 페이지만 받도록, 16개 페이지를 미리 만들어
+정적 호스팅(GitHub Pages, CDN 등)에 올리고 [share] base_url에 그 주소를 넣는다.
+(Streamlit의 static 경로는 .html을 text/plain으로 내려주므로 결과 페이지를 서빙할 수 없다)
+
+    python share_pages.py --out public --base-url https://example.github.io/simple-mbti-share
+"""
+
+import argparse
+import html
+import os
+from urllib.parse import quote
+
+# MBTI 결과 설명
+MBTI_DESCRIPTIONS = {
+    "ENFJ": "🌟 선천적인 리더, 타인을 이끌고 영감을 주는 사람",
+    "ENFP": "🎨 열정적인 자유로운 영혼, 창의적이고 사교적인 사람",
+    "ENTJ": "👑 대담한 지도자, 목표 달성을 위해 노력하는 사람",
+    "ENTP": "💡 똑똑한 호기심 많은 사상가, 새로운 도전을 즐기는 사람",
+    "ESFJ": "🤝 사교적이고 인기 많은 사람, 타인을 돕기 좋아하는 사람",
+    "ESFP": "🎭 자유로운 연예인, 즉흥적이고 열정적인 사람",
+    "ESTJ": "📋 엄격한 관리자, 질서와 규칙을 중시하는 사람",
+    "ESTP": "⚡ 모험을 즐기는 사업가, 실용적이고 현실적인 사람",
+    "INFJ": "🔮 신비로운 옹호자, 이상주의적이고 원칙이 뚜렷한 사람",
+    "INFP": "🌸 중재자, 조화롭고 유연한 사람",
+    "INTJ": "🏗️ 용의주도한 전략가, 독립적이고 결단력 있는 사람",
+    "INTP": "🔬 논리적인 사색가, 지식을 추구하는 사람",
+    "ISFJ": "🛡️ 용감한 수호자, 따뜻하고 헌신적인 사람",
+    "ISFP": "🎨 호기심 많은 예술가, 유연하고 매력적인 사람",
+    "ISTJ": "📚 현실주의자, 신뢰할 수 있고 책임감 강한 사람",
+    "ISTP": "🔧 만능 재주꾼, 대담하고 실용적인 사람"
+}
+
+# 공유 설정 기본값 (secrets.toml의 [share] 섹션으로 덮어쓸 수 있음)
+DEFAULT_SHARE_SETTINGS = {
+    "app_url": "https://simple-mbti.streamlit.app",  # 결과 페이지의 "나도 테스트 해보기" 링크
+    "base_url": None,     # 미리 만든 결과 페이지를 올린 주소 (없으면 공유 링크는 app_url)
+    "image_url": None     # Open Graph 이미지 주소 - {mbti}는 유형으로 바뀜 (없으면 이미지 없이)
+}
+
+TAGLINE = "✨ AI가 생성한 맞춤형 질문으로 알아본 나의 성격!"
+
+
+def share_url(mbti_type, settings=None):
+    """유형별 공유 링크 - base_url이 있으면 그 아래 정적 결과 페이지, 없으면 앱 주소"""
+    settings = {**DEFAULT_SHARE_SETTINGS, **dict(settings or {})}
+    if settings["base_url"]:
+        return f"{settings['base_url'].rstrip('/')}/{mbti_type.lower()}/"
+    return settings["app_url"]
+
+
+def build_share_content(settings=None):
+    """16개 유형의 공유 데이터를 한 번에 계산 - {"ENFJ": {"title", "description", "url", "text", "message", "kakao_url"}, ...}"""
+    content = {}
+    for mbti_type, description in MBTI_DESCRIPTIONS.items():
+        title = f"🧠 MBTI 테스트 결과: {mbti_type}"
+        url = share_url(mbti_type, settings)
+        text = f"{title}\n\n{description} {TAGLINE}\n\n테스트 해보기: {url}"
+        content[mbti_type] = {
+            "title": title,
+            "description": description,
+            "url": url,
+            "text": text,
+            # 결과 복사하기 버튼에 보여줄 메시지
+            "message": (
+                f"🧠 MBTI 성격 테스트 결과 🔍\n\n🎉 나의 MBTI 유형: {mbti_type}\n{description}\n\n"
+                f"{TAGLINE}\n당신도 테스트해보세요! \n\n#MBTI #성격테스트 #AI테스트"
+            ),
+            "kakao_url": "kakaotalk://send?msg=" + quote(text, safe="")
+        }
+    return content
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<meta name="description" content="{description}">
+<meta property="og:type" content="website">
+<meta property="og:site_name" content="Simple MBTI 성격 테스트">
+<meta property="og:title" content="{title}">
+<meta property="og:description" content="{description}">
+<meta property="og:url" content="{url}">
+{image_meta}<meta name="twitter:card" content="{twitter_card}">
+<link rel="canonical" href="{url}">
+<style>
+    body {{ margin: 0; font-family: "Source Sans Pro", sans-serif; background: #f7f7fb; color: #222; }}
+    .result-container {{
+        max-width: 560px; margin: 40px auto; padding: 30px; border-radius: 15px; text-align: center;
+        background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%); box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+    }}
+    .mbti-result {{ font-size: 3rem; font-weight: bold; color: #2E86AB; margin: 10px 0; }}
+    .cta {{
+        display: inline-block; margin-top: 20px; padding: 15px 30px; border-radius: 25px; color: white;
+        font-weight: bold; text-decoration: none; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    }}
+</style>
+</head>
+<body>
+<div class="result-container">
+    <h2>🧠 친구의 MBTI 결과</h2>
+    <div class="mbti-result">{mbti}</div>
+    <h3>{description}</h3>
+    <p>{tagline}</p>
+    <a class="cta" href="{app_url}">🔍 나도 테스트 해보기</a>
+</div>
+</body>
+</html>
+"""
+
+
+def render_share_page(mbti_type, content, settings=None):
+    """유형 하나의 정적 결과 페이지 HTML (스크립트 없음)"""
+    settings = {**DEFAULT_SHARE_SETTINGS, **dict(settings or {})}
+    image_meta = ""
+    if settings["image_url"]:
+        image = html.escape(settings["image_url"].format(mbti=mbti_type, mbti_lower=mbti_type.lower()), quote=True)
+        image_meta = f'<meta property="og:image" content="{image}">\n<meta name="twitter:image" content="{image}">\n'
+    return PAGE_TEMPLATE.format(
+        mbti=mbti_type,
+        title=html.escape(content["title"], quote=True),
+        description=html.escape(content["description"], quote=True),
+        url=html.escape(content["url"], quote=True),
+        app_url=html.escape(settings["app_url"], quote=True),
+        tagline=html.escape(TAGLINE),
+        image_meta=image_meta,
+        twitter_card="summary_large_image" if settings["image_url"] else "summary"
+    )
+
+
+def build_share_pages(out_dir, settings=None):
+    """out_dir/<유형>/index.html 16개를 쓰고 쓴 파일 경로 목록을 반환"""
+    content = build_share_content(settings)
+    written = []
+    for mbti_type, data in content.items():
+        directory = os.path.join(out_dir, mbti_type.lower())
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "index.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_share_page(mbti_type, data, settings))
+        written.append(path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="public", help="결과 페이지를 쓸 디렉터리")
+    parser.add_argument("--base-url", required=True, help="결과 페이지를 올릴 주소 ([share] base_url과 같게)")
+    parser.add_argument("--app-url", default=DEFAULT_SHARE_SETTINGS["app_url"], help="테스트 앱 주소")
+    parser.add_argument("--image-url", help="Open Graph 이미지 주소 ({mbti}, {mbti_lower} 사용 가능)")
+    args = parser.parse_args()
+
+    settings = {"base_url": args.base_url, "app_url": args.app_url, "image_url": args.image_url}
+    written = build_share_pages(args.out, settings)
+    print(f"{len(written)}개 결과 페이지를 {args.out}/ 에 썼습니다")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,29 @@
 import streamlit as st
-import openai
-from openai import OpenAI
-import json
-import urllib.parse
+import os
+import sys
+import time
+
+# openai(와 이를 쓰는 question_generator, openai_client 등)는 첫 화면에 필요 없으므로 여기서 불러오지 않는다.
+# 생성 작업(백그라운드 스레드)이나 부팅 워밍업에서 처음 필요할 때 함수 안에서 불러온다.
+from adaptive import (
+    DEFAULT_ADAPTIVE_SETTINGS,
+    is_decided,
+    letter_counts,
+    mbti_from_answers,
+    next_question_index,
+    pack_answer
+)
+from analytics import ANALYTICS, ANSWERED, COMPLETED, STARTED, choice_string
+from hedging import HEDGER
+from jobs import GENERATION_JOBS, QUEUED, RUNNING
+from metrics import METRICS, configure_metrics
+from prefetch import DEFAULT_WARMUP_SETTINGS, QuestionPrefetcher
+from prompts import prompt_version, use_prompt_version
+from question_sets import QUESTION_SETS, QuestionSet, question_set_id
+from rate_limiter import RATE_LIMITER, request_owner
+from session_store import create_session_store, new_session_token, snapshot_state
+from share_buttons import THEME_CSS_URL, share_buttons
+from share_pages import MBTI_DESCRIPTIONS, build_share_content
 
 # 페이지 설정
 st.set_page_config(
@@ -12,346 +33,514 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 커스텀 CSS 스타일
-st.markdown("""
-<style>
-    .main {
-        padding-top: 2rem;
-    }
-
-    .stTitle {
-        text-align: center;
-        color: #2E86AB;
-        font-size: 3rem;
-        margin-bottom: 2rem;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-    }
-
-    .question-container {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border-radius: 15px;
-        padding: 30px;
-        margin: 20px 0;
-        box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255,255,255,0.2);
-        color: white;
-        text-align: center;
-    }
-
-    .result-container {
-        background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%);
-        border-radius: 15px;
-        padding: 30px;
-        margin: 20px 0;
-        box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-        text-align: center;
-    }
-
-    .progress-bar {
-        background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-        height: 20px;
-        border-radius: 10px;
-        margin: 20px 0;
-        box-shadow: 0 4px 15px rgba(79, 172, 254, 0.3);
-    }
-
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 25px;
-        padding: 15px 30px;
-        font-weight: bold;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-        width: 100%;
-        margin: 10px 0;
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.6);
-    }
-
-    .welcome-message {
-        background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
-        padding: 30px;
-        border-radius: 15px;
-        text-align: center;
-        margin: 20px 0;
-        box-shadow: 0 4px 15px rgba(168, 237, 234, 0.3);
-        color: #2c3e50;
-        font-weight: 500;
-        line-height: 1.6;
-    }
-
-    .welcome-message h2 {
-        color: #2c3e50;
-        font-weight: bold;
-        margin-bottom: 15px;
-        text-shadow: 1px 1px 2px rgba(255,255,255,0.8);
-    }
-
-    .welcome-message h3 {
-        color: #34495e;
-        font-weight: bold;
-        margin-bottom: 10px;
-        text-shadow: 1px 1px 2px rgba(255,255,255,0.8);
-    }
-
-    .welcome-message p {
-        color: #2c3e50;
-        font-size: 1.1rem;
-        margin-bottom: 10px;
-        text-shadow: 0.5px 0.5px 1px rgba(255,255,255,0.8);
-    }
-
-    .mbti-result {
-        font-size: 3rem;
-        font-weight: bold;
-        color: #2E86AB;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-        margin: 20px 0;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-def generate_all_questions(client, question_count=8):
-    """OpenAI API를 사용하여 지정된 개수의 MBTI 질문을 한번에 생성"""
-
-    questions_per_dimension = question_count // 4
-
-    prompt = f"""
-    MBTI 성격 테스트를 위한 {question_count}개의 질문을 생성해주세요. 각 MBTI 차원별로 {questions_per_dimension}개씩 균형있게 배치해주세요:
-
-    - E/I (외향성/내향성): {questions_per_dimension}개 질문
-    - S/N (감각/직관): {questions_per_dimension}개 질문
-    - T/F (사고/감정): {questions_per_dimension}개 질문
-    - J/P (판단/인식): {questions_per_dimension}개 질문
-
-    각 질문은 일상적이고 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요.
-    모든 질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다.
-
-    반드시 아래 JSON 형식으로만 응답해주세요. 다른 텍스트는 포함하지 마세요:
-    {{
-        "questions": [
-            {{
-                "question": "질문 내용",
-                "type": "E/I",
-                "options": [
-                    {{"text": "첫 번째 선택지", "type": "E"}},
-                    {{"text": "두 번째 선택지", "type": "I"}}
-                ]
-            }}
-        ]
-    }}
-
-    한국어로 작성해주세요.
+
+@st.cache_resource
+def get_metrics_exporter():
+    """secrets.toml의 [metrics] 섹션대로 JSONL 파일/Prometheus 엔드포인트를 프로세스마다 한 번만 붙임"""
+    return configure_metrics(st.secrets.get("metrics", {}))
+
+
+@st.cache_resource
+def get_duplicate_index():
+    """secrets.toml의 [dedup] 섹션을 프로세스 공용 중복 질문 인덱스에 한 번만 적용"""
+    from dedup import configure_dedup
+
+    return configure_dedup(st.secrets.get("dedup", {}))
+
+
+@st.cache_resource
+def get_circuit_breaker():
+    """secrets.toml의 [circuit_breaker] 섹션을 모든 세션이 공유하는 OpenAI 서킷 브레이커에 한 번만 적용
+
+    상태는 METRICS 게이지(circuit_breaker_state: 0 closed / 1 half-open / 2 open)로 나간다.
     """
+    from circuit_breaker import OPENAI_BREAKER
 
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "당신은 MBTI 전문가입니다. 정확하고 균형잡힌 8개의 MBTI 질문을 생성해주세요. 각 차원별로 2개씩, 총 8개의 서로 다른 질문을 만들어주세요. 반드시 올바른 JSON 형식으로만 응답하고, 다른 설명이나 텍스트는 포함하지 마세요."
-                                   "질문의 어휘는 감성적인 표현으로 하고 창의적이고 다양한 생각을 하지만 구체적인 상황을 제시하여 두 개의 선택지로 답할 수 있도록 만들어주세요."
-                                   "질문은 서로 다른 상황과 맥락을 다루어야 하며, 중복되지 않아야 합니다."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.8
-            )
+    OPENAI_BREAKER.configure(st.secrets.get("circuit_breaker", {}))
+    return OPENAI_BREAKER
 
-            # JSON 응답 파싱
-            response_content = response.choices[0].message.content.strip()
-            st.write(f"🔍 API 응답 내용: {response_content[:200]}...")  # 디버깅용
 
-            # JSON 파싱 시도
-            try:
-                questions_data = json.loads(response_content)
-                questions = questions_data["questions"]
-                st.success(f"✅ {len(questions)}개 질문 생성 성공!")
-            except json.JSONDecodeError as json_err:
-                st.error(f"❌ JSON 파싱 오류: {str(json_err)}")
-                st.write(f"응답 내용: {response_content}")
-                continue
-
-            # 지정된 개수의 질문이 제대로 생성되었는지 확인
-            if len(questions) == question_count:
-                # 각 차원별로 균등하게 있는지 확인
-                type_counts = {"E/I": 0, "S/N": 0, "T/F": 0, "J/P": 0}
-                for q in questions:
-                    if q.get("type") in type_counts:
-                        type_counts[q["type"]] += 1
-
-                # 모든 차원이 균등하게 있으면 성공
-                if all(count == questions_per_dimension for count in type_counts.values()):
-                    st.success(f"🎯 균형잡힌 질문 생성 완료! {type_counts}")
-                    return questions
-                else:
-                    st.warning(f"⚠️ 질문 분포가 불균형합니다: {type_counts}")
-            else:
-                st.warning(f"⚠️ {len(questions)}개 질문만 생성됨 ({question_count}개 필요)")
-
-            # 조건에 맞지 않으면 재시도
-            if attempt < max_retries - 1:
-                st.info(f"🔄 재시도 중... ({attempt + 1}/{max_retries})")
-                continue
-
-        except openai.AuthenticationError as e:
-            st.error("🚫 API 키가 잘못되었습니다. 올바른 키를 입력해주세요.")
-            st.stop()
+@st.cache_resource
+def get_hedger():
+    """secrets.toml의 [hedging] 섹션을 공용 헤지 실행기에 한 번만 적용 (기본은 꺼짐)"""
+    HEDGER.configure(st.secrets.get("hedging", {}))
+    return HEDGER
+
+
+@st.cache_resource
+def get_rate_limiter():
+    """secrets.toml의 [rate_limit] 섹션을 모든 세션이 공유하는 OpenAI 요청 스케줄러에 한 번만 적용
+
+    한도는 응답의 x-ratelimit-* 헤더를 받으면 그 값으로 맞춰지고, 차례를 기다린 시간은 openai_queue_seconds로 나간다.
+    """
+    RATE_LIMITER.configure(st.secrets.get("rate_limit", {}))
+    return RATE_LIMITER
+
+
+@st.cache_resource
+def get_job_queue():
+    """secrets.toml의 [jobs] 섹션을 질문 생성 작업 큐에 한 번만 적용
+
+    대기열 길이/작업자 사용률은 METRICS 게이지(job_queue_depth, job_queue_utilization)로 나가므로
+    max_workers를 정할 때 참고한다.
+    """
+    GENERATION_JOBS.configure(st.secrets.get("jobs", {}))
+    return GENERATION_JOBS
+
+
+@st.cache_resource
+def get_question_sets():
+    """secrets.toml의 [question_sets] 섹션을 모든 세션이 공유하는 질문 세트 캐시에 한 번만 적용
+
+    세션 상태에는 세트 ID와 답변 비트만 두고 질문은 이 캐시에서 읽는다. 캐시 크기는 question_set_cache_size
+    게이지와 question_set_evictions_total 카운터로 나간다.
+    """
+    QUESTION_SETS.configure(st.secrets.get("question_sets", {}))
+    return QUESTION_SETS
+
+
+@st.cache_resource
+def get_analytics():
+    """secrets.toml의 [analytics] 섹션대로 결과 분석 로그를 프로세스마다 한 번만 엶 (기본은 로컬 SQLite)
+
+    이벤트는 메모리에 모았다가 백그라운드 스레드가 모아서 기록하므로 재실행을 늦추지 않는다.
+    """
+    return ANALYTICS.configure(st.secrets.get("analytics", {}))
+
+
+# 재실행 단계별 소요 시간(span)과 OpenAI 호출 메트릭은 화면 대신 METRICS 싱크로 나감
+get_metrics_exporter()
+get_hedger()
+get_rate_limiter()
+get_job_queue()
+get_question_sets()
+get_analytics()
+
+# 커스텀 CSS 스타일 - static/theme.css는 브라우저가 한 번 받아 캐시하고, 재실행마다는 링크 태그만 보냄
+# (.streamlit/config.toml의 server.enableStaticServing 필요)
+with METRICS.span("css"):
+    st.markdown(f'<link rel="stylesheet" href="{THEME_CSS_URL}">', unsafe_allow_html=True)
+
+# 질문 생성 방식 설정 (secrets.toml의 [generation] 섹션)
+# mode: "single" - 한 번에 전체 생성 / "stream" - 스트리밍으로 생성되는 대로 질문 표시
+#       "parallel" - 차원별로 나눠 동시에 생성
+#       "batch" - 한 번의 요청으로 batch_size개 세트를 만들고 남는 세트는 다음 세션용으로 보관
+#       "bank" - API 호출 없이 질문 은행([question_bank])에서 세트를 꺼냄 (은행이 모자라면 single)
+GENERATION_SETTINGS = st.secrets.get("generation", {})
+GENERATION_MODE = GENERATION_SETTINGS.get("mode", "single")
+BATCH_SIZE = GENERATION_SETTINGS.get("batch_size", 4)
+# response_format: "json_schema" - 구조화 출력 / "json_object" - JSON 모드 / "none" - 프롬프트 지시만
+RESPONSE_FORMAT = GENERATION_SETTINGS.get("response_format", "json_schema")
+# prompt_version: system 프롬프트 버전 (prompts.PROMPT_VERSIONS, 없으면 최신 기본 버전)
+use_prompt_version(GENERATION_SETTINGS.get("prompt_version"))
+
+# 질문 은행 설정 (secrets.toml의 [question_bank] 섹션) - question_bank.py build로 미리 만든 SQLite 파일
+# path가 있으면 부족한 질문을 하드코딩된 기본 질문 대신 은행에서 채움 (version으로 특정 버전만 사용)
+QUESTION_BANK_SETTINGS = st.secrets.get("question_bank", {})
+
+# 적응형 진행 설정 (secrets.toml의 [adaptive] 섹션)
+# enabled: 답변마다 차원별 우세를 계산해 결과가 바뀔 수 없는 차원의 질문은 건너뛰고,
+#          가장 덜 결정된 차원의 질문을 먼저 보여줌 (모든 차원이 결정되면 일찍 끝남)
+ADAPTIVE_SETTINGS = {**DEFAULT_ADAPTIVE_SETTINGS, **st.secrets.get("adaptive", {})}
+ADAPTIVE_ENABLED = ADAPTIVE_SETTINGS["enabled"]
+ADAPTIVE_CONFIDENCE = ADAPTIVE_SETTINGS["confidence"]
+
+
+
+@st.cache_resource
+def get_session_store():
+    """프로세스 전체에서 공유하는 세션 저장소 (secrets.toml의 [session_store] 섹션, 기본은 로컬 SQLite)"""
+    return create_session_store(st.secrets.get("session_store", {}))
+
+
+def set_questions(questions):
+    """질문 세트를 세션에 넣음 - 완성된 세트는 공용 캐시에 한 번만 두고 세션에는 ID만 남김
+
+    완성된 세트는 세션 저장소에도 세트 ID로 한 번 저장해 두어, 답변마다 저장하는 상태에는 ID와 답변 비트만
+    들어간다. 아직 채워지는 중인 QuestionStream은 그대로 두었다가 다 채워지면 session_question_set()이 캐시로 옮긴다.
+    """
+    if questions and not getattr(questions, "done", True):
+        st.session_state.question_set = questions
+    elif questions:
+        set_id = get_question_sets().intern(questions)
+        get_session_store().save_question_set(set_id, questions)
+        st.session_state.question_set = set_id
+    else:
+        st.session_state.question_set = None
+
+
+def session_question_set():
+    """세션의 QuestionSet (질문과 차원별 마스크) - 질문이 아직 없으면 빈 세트, 세트를 잃었으면 None
+
+    캐시에서 밀려난 세트는 세션 저장소에 세트 ID로 남은 질문으로 다시 넣는다. 생성 중인 QuestionStream은
+    지금까지의 목록으로 마스크를 만들고, 다 채워졌으면 캐시로 옮긴다.
+    """
+    question_set = st.session_state.question_set
+    if question_set is None:
+        return QuestionSet(None, ())
+    if not isinstance(question_set, str):
+        if question_set.done and len(question_set) >= st.session_state.question_count:
+            set_questions(list(question_set))
+            return session_question_set()
+        return QuestionSet(None, question_set)
+
+    cached = get_question_sets().get(question_set)
+    if cached is None:
+        questions = get_session_store().load_question_set(question_set)
+        if not questions:
+            return None
+        set_questions(questions)
+        cached = get_question_sets().get(st.session_state.question_set)
+    return cached
+
+
+def restore_session(saved):
+    """저장소에서 읽은 테스트 진행 상황을 세션 상태로 복원
+
+    완성된 세트는 ID(question_set)만 복원하고 질문은 session_question_set()이 캐시나 저장소에서 꺼낸다.
+    """
+    for key, value in saved.items():
+        if key != "all_questions":
+            st.session_state[key] = value
+    if "all_questions" not in saved:
+        return
+
+    # 스트리밍 생성 도중 저장된 세트면 부족한 차원만 기본 질문으로 채움
+    # (생성 작업을 기다리던 중이면 generation_panel이 작업을 다시 넣음)
+    questions = saved["all_questions"]
+    if st.session_state.get("questions_generated") and len(questions) < st.session_state.question_count:
+        from question_generator import default_questions_for_missing
+
+        questions = questions + default_questions_for_missing(questions, st.session_state.question_count)
+    set_questions(questions)
+
+
+def persist_session():
+    """현재 테스트 진행 상황을 저장소에 기록 (write-behind라 바로 반환됨)"""
+    get_session_store().save(st.session_state.session_token, snapshot_state(st.session_state))
 
-        except openai.OpenAIError as e:
-            st.error(f"❌ OpenAI API 호출 중 오류: {str(e)}")
-            if attempt < max_retries - 1:
-                st.info(f"🔄 재시도 중... ({attempt + 1}/{max_retries})")
-            continue
-
-        except Exception as e:
-            st.error(f"❌ 예상치 못한 오류: {str(e)}")
-            if attempt < max_retries - 1:
-                st.info(f"🔄 재시도 중... ({attempt + 1}/{max_retries})")
-                continue
-            else:
-                break
-
-    # 실패시 기본 질문 사용
-    st.warning("⚠️ API 질문 생성에 실패하여 기본 질문을 사용합니다.")
-    return get_default_questions(question_count)
-
-def get_default_questions(question_count=8):
-    """API 오류 시 사용할 기본 질문들"""
-
-    base_questions = [
-        {
-            "question": "새로운 사람들과의 모임에서 당신은?",
-            "type": "E/I",
-            "options": [
-                {"text": "적극적으로 다른 사람들에게 말을 걸고 대화를 시작한다", "type": "E"},
-                {"text": "조용히 있다가 누군가 먼저 말을 걸어주길 기다린다", "type": "I"}
-            ]
-        },
-        {
-            "question": "주말에 에너지를 충전하는 방법은?",
-            "type": "E/I",
-            "options": [
-                {"text": "친구들과 만나서 활발하게 대화하며 시간을 보낸다", "type": "E"},
-                {"text": "혼자만의 조용한 시간을 가지며 휴식한다", "type": "I"}
-            ]
-        },
-        {
-            "question": "새로운 정보를 학습할 때 당신은?",
-            "type": "S/N",
-            "options": [
-                {"text": "구체적인 사실과 세부사항부터 차근차근 익힌다", "type": "S"},
-                {"text": "전체적인 개념과 원리를 먼저 파악하려 한다", "type": "N"}
-            ]
-        },
-        {
-            "question": "문제를 해결할 때 당신은?",
-            "type": "S/N",
-            "options": [
-                {"text": "검증된 방법과 과거 경험을 활용한다", "type": "S"},
-                {"text": "새로운 아이디어와 창의적 방법을 시도한다", "type": "N"}
-            ]
-        },
-        {
-            "question": "중요한 결정을 내릴 때 당신은?",
-            "type": "T/F",
-            "options": [
-                {"text": "논리적 분석과 객관적 기준을 중시한다", "type": "T"},
-                {"text": "관련된 사람들의 감정과 가치를 우선 고려한다", "type": "F"}
-            ]
-        },
-        {
-            "question": "팀에서 갈등이 생겼을 때 당신은?",
-            "type": "T/F",
-            "options": [
-                {"text": "사실에 근거해 문제의 원인을 분석하고 해결방안을 찾는다", "type": "T"},
-                {"text": "구성원들의 마음을 달래고 화합을 이루려 노력한다", "type": "F"}
-            ]
-        },
-        {
-            "question": "여행 계획을 세울 때 당신은?",
-            "type": "J/P",
-            "options": [
-                {"text": "미리 상세한 일정을 짜고 예약을 완료한다", "type": "J"},
-                {"text": "대략적인 계획만 세우고 현지에서 즉흥적으로 결정한다", "type": "P"}
-            ]
-        },
-        {
-            "question": "업무나 과제를 처리할 때 당신은?",
-            "type": "J/P",
-            "options": [
-                {"text": "계획을 세워 단계별로 체계적으로 진행한다", "type": "J"},
-                {"text": "상황에 따라 유연하게 순서를 바꿔가며 진행한다", "type": "P"}
-            ]
-        }
-    ]
-
-    # 요청된 질문 개수에 맞춰 반복하여 반환
-    questions_per_dimension = question_count // 4
-    result_questions = []
-
-    for i in range(questions_per_dimension):
-        for j in range(4):  # 4개 차원
-            question_index = (i * 4 + j) % len(base_questions)
-            result_questions.append(base_questions[question_index])
-
-    return result_questions
-
-# MBTI 결과 설명
-MBTI_DESCRIPTIONS = {
-    "ENFJ": "🌟 선천적인 리더, 타인을 이끌고 영감을 주는 사람",
-    "ENFP": "🎨 열정적인 자유로운 영혼, 창의적이고 사교적인 사람",
-    "ENTJ": "👑 대담한 지도자, 목표 달성을 위해 노력하는 사람",
-    "ENTP": "💡 똑똑한 호기심 많은 사상가, 새로운 도전을 즐기는 사람",
-    "ESFJ": "🤝 사교적이고 인기 많은 사람, 타인을 돕기 좋아하는 사람",
-    "ESFP": "🎭 자유로운 연예인, 즉흥적이고 열정적인 사람",
-    "ESTJ": "📋 엄격한 관리자, 질서와 규칙을 중시하는 사람",
-    "ESTP": "⚡ 모험을 즐기는 사업가, 실용적이고 현실적인 사람",
-    "INFJ": "🔮 신비로운 옹호자, 이상주의적이고 원칙이 뚜렷한 사람",
-    "INFP": "🌸 중재자, 조화롭고 유연한 사람",
-    "INTJ": "🏗️ 용의주도한 전략가, 독립적이고 결단력 있는 사람",
-    "INTP": "🔬 논리적인 사색가, 지식을 추구하는 사람",
-    "ISFJ": "🛡️ 용감한 수호자, 따뜻하고 헌신적인 사람",
-    "ISFP": "🎨 호기심 많은 예술가, 유연하고 매력적인 사람",
-    "ISTJ": "📚 현실주의자, 신뢰할 수 있고 책임감 강한 사람",
-    "ISTP": "🔧 만능 재주꾼, 대담하고 실용적인 사람"
-}
 
 # 세션 상태 초기화
 if "current_question" not in st.session_state:
     st.session_state.current_question = 0
+# 답변은 질문마다 한 비트 (adaptive.pack_answer) - asked_questions는 답한 질문, answers는 그중 앞 글자로 답한 질문
 if "answers" not in st.session_state:
-    st.session_state.answers = []
+    st.session_state.answers = 0
 if "test_completed" not in st.session_state:
     st.session_state.test_completed = False
 if "current_question_data" not in st.session_state:
     st.session_state.current_question_data = None
 if "test_started" not in st.session_state:
     st.session_state.test_started = False
-if "all_questions" not in st.session_state:
-    st.session_state.all_questions = []
+# 질문 세트는 공용 캐시(QUESTION_SETS)에 두고 세션에는 ID만 (생성 중이면 QuestionStream)
+if "question_set" not in st.session_state:
+    st.session_state.question_set = None
 if "questions_generated" not in st.session_state:
     st.session_state.questions_generated = False
 if "question_count" not in st.session_state:
     st.session_state.question_count = 8
+if "asked_questions" not in st.session_state:
+    st.session_state.asked_questions = 0
+if "prefetch_future" not in st.session_state:
+    st.session_state.prefetch_future = None
+if "prefetch_count" not in st.session_state:
+    st.session_state.prefetch_count = None
+if "prefetch_stream" not in st.session_state:
+    st.session_state.prefetch_stream = None
+if "generation_job" not in st.session_state:
+    st.session_state.generation_job = None
+if "started_at" not in st.session_state:
+    st.session_state.started_at = None
+
+# 이어하기 토큰 - URL의 ?session= 값으로 저장된 테스트를 복원 (다른 레플리카로 재접속하거나 서버가 재시작되어도)
+if "session_token" not in st.session_state:
+    session_token = st.query_params.get("session")
+    saved_session = get_session_store().load(session_token) if session_token else None
+    # 답변을 비트로 담기 전(글자 목록)에 저장된 세션은 이어가지 않고 새로 시작 (ttl이 지나면 저장소에서도 사라짐)
+    if saved_session and not isinstance(saved_session.get("answers", 0), int):
+        METRICS.increment("session_restore_rejected_total", reason="legacy_answers")
+        saved_session = None
+    if saved_session:
+        restore_session(saved_session)
+    else:
+        session_token = new_session_token()
+    st.session_state.session_token = session_token
+    st.query_params["session"] = session_token
+
+
+@st.cache_resource
+def get_openai_connection(api_key, base_url=None, cassette_path=None, cassette_mode="replay", latency_scale=1.0,
+                          cassette_fuzzy=False):
+    """프로세스 전체에서 한 번만 만드는 OpenAI 클라이언트와 연결 풀 (secrets.toml의 [http] 섹션으로 조정)
+
+    cassette_path가 있으면 요청/응답을 카세트에 녹화(record)하거나 네트워크 없이 재생(replay)함.
+    재생할 때 녹화되지 않은 요청은 실패하며, cassette_fuzzy면 비슷한 녹화 응답으로 대신함.
+    생성에 쓰는 공용 설정(중복 질문 인덱스, 서킷 브레이커, 질문 은행)도 여기서 한 번 적용한다.
+    """
+    from cassette import Cassette
+    from openai_client import OpenAIConnection
+
+    get_duplicate_index()
+    get_circuit_breaker()
+    get_question_bank_sampler()
+    cassette = Cassette(cassette_path, cassette_mode, latency_scale, cassette_fuzzy) if cassette_path else None
+    return OpenAIConnection(api_key, st.secrets.get("http", {}), base_url, cassette)
+
+
+def openai_connection():
+    """secrets.toml 설정대로 공용 OpenAI 연결을 가져옴 - 처음 부르면 openai를 불러오므로 생성 작업 안에서 부름"""
+    cassette_settings = st.secrets.get("cassette", {})
+    return get_openai_connection(
+        st.secrets['openai']['API_KEY'],
+        st.secrets['openai'].get('BASE_URL'),
+        cassette_settings.get("path"),
+        cassette_settings.get("mode", "replay"),
+        cassette_settings.get("latency_scale", 1.0),
+        cassette_settings.get("fuzzy", False)
+    )
+
+
+@st.cache_resource
+def get_question_bank_sampler():
+    """프로세스 전체에서 공유하는 질문 은행 샘플러 - 은행 파일이 없으면 None"""
+    path = QUESTION_BANK_SETTINGS.get("path")
+    if not path or not os.path.exists(path):
+        return None
+    from question_bank import QuestionBank, QuestionBankSampler
+    from question_generator import use_question_bank
+
+    sampler = QuestionBankSampler(QuestionBank(path), QUESTION_BANK_SETTINGS.get("version"))
+    use_question_bank(sampler)
+    return sampler
+
+
+def generate_questions(connection, question_count, notify=None, fallback=True, stock=None):
+    """설정된 생성 방식(single/parallel/batch)으로 질문 세트를 생성
+
+    batch 방식에서 남는 세트는 stock(question_count, questions)으로 넘겨 다음 세션이 쓰도록 함
+    """
+    import openai
+    from question_generator import (
+        generate_all_questions,
+        generate_all_questions_parallel,
+        generate_question_sets,
+        silent_notify
+    )
+
+    notify = notify or silent_notify
+    if GENERATION_MODE == "bank":
+        sampler = get_question_bank_sampler()
+        questions = sampler.sample_set(question_count) if sampler else None
+        if questions:
+            return questions
+        # 은행이 없거나 모자라면 한 세트만 생성
+
+    if GENERATION_MODE == "parallel":
+        return generate_all_questions_parallel(
+            connection.client, question_count, notify, fallback, RESPONSE_FORMAT, connection=connection
+        )
+
+    if GENERATION_MODE == "batch":
+        try:
+            sets, _ = generate_question_sets(connection.client, question_count, BATCH_SIZE, notify, RESPONSE_FORMAT)
+        except openai.AuthenticationError:
+            raise
+        except openai.OpenAIError as e:
+            notify("error", f"❌ OpenAI API 호출 중 오류: {str(e)}")
+            sets = []
+
+        if sets:
+            for extra in sets[1:]:
+                if stock is not None:
+                    stock(question_count, extra)
+            return sets[0]
+        # 온전한 세트가 하나도 없으면 한 세트만 생성
+
+    return generate_all_questions(connection.client, question_count, notify, fallback, RESPONSE_FORMAT)
+
+
+@st.cache_resource
+def get_prefetcher():
+    """프로세스 전체에서 공유하는 질문 프리페처 (batch 방식이면 남는 세트를 보관할 만큼 풀을 키움)"""
+    pool_size = max(3, BATCH_SIZE) if GENERATION_MODE == "batch" else 3
+    return QuestionPrefetcher(pool_size=pool_size)
+
+
+def make_generation_job(stream=None, owner=None):
+    """백그라운드에서 실행할 질문 생성 작업 - stream이 있으면 생성되는 대로 stream을 채움
+
+    연결(openai_connection)은 작업 안에서 가져오므로 openai import와 클라이언트 생성이 스크립트를 막지 않는다.
+    요청은 owner(기본은 이 세션) 몫으로 요청 스케줄러의 공정 큐에 선다.
+    """
+    stock = get_prefetcher().stock
+    owner = owner or st.session_state.session_token
+
+    def generate(question_count):
+        with request_owner(owner):
+            connection = openai_connection()
+            if stream is None:
+                return generate_questions(connection, question_count, fallback=False, stock=stock)
+
+            from question_generator import stream_questions
+
+            return stream.fill(
+                stream_questions(connection.client, question_count, fallback=False, response_format=RESPONSE_FORMAT)
+            )
+
+    return generate
+
+
+def release_prefetch():
+    """세션이 들고 있던 프리페치를 공용 풀로 넘기고 비움"""
+    get_prefetcher().release(st.session_state.prefetch_future, st.session_state.prefetch_count)
+    st.session_state.prefetch_future = None
+    st.session_state.prefetch_count = None
+    st.session_state.prefetch_stream = None
+
+
+def ensure_prefetch():
+    """현재 질문 개수에 맞는 질문 세트를 백그라운드에서 미리 생성"""
+    if st.session_state.prefetch_future is not None and st.session_state.prefetch_count == st.session_state.question_count:
+        return
+
+    # 질문 개수가 바뀌었으면 이전 프리페치는 공용 풀로
+    release_prefetch()
+    stream = None
+    if GENERATION_MODE == "stream":
+        from question_generator import QuestionStream
+
+        stream = QuestionStream(st.session_state.question_count)
+    st.session_state.prefetch_future = get_prefetcher().prefetch(
+        st.session_state.question_count,
+        make_generation_job(stream)
+    )
+    st.session_state.prefetch_count = st.session_state.question_count
+    st.session_state.prefetch_stream = stream
+
+
+def take_prefetched_questions():
+    """미리 생성된 질문 세트를 가져옴 - (바로 쓸 질문 또는 None, 아직 생성 중인 프리페치 Future 또는 None)"""
+    if st.session_state.prefetch_future is None or st.session_state.prefetch_count != st.session_state.question_count:
+        release_prefetch()
+        return None, None
+
+    future = st.session_state.prefetch_future
+    stream = st.session_state.prefetch_stream
+    st.session_state.prefetch_future = None
+    st.session_state.prefetch_count = None
+    st.session_state.prefetch_stream = None
+
+    # 스트리밍 생성이 진행 중이면 완료를 기다리지 않고 바로 사용
+    if stream is not None and not future.done():
+        return stream, None
+    # 아직 생성 중이면 기다리지 않고 생성 작업에 넘김
+    if not future.done():
+        return None, future
+
+    import openai
+
+    try:
+        return future.result(), None
+    except openai.AuthenticationError:
+        raise
+    except Exception:
+        return None, None
+
+
+def start_question_stream():
+    """스트리밍 생성을 백그라운드에서 시작하고 바로 읽을 수 있는 질문 목록을 반환"""
+    from question_generator import QuestionStream
+
+    stream = QuestionStream(st.session_state.question_count)
+    future = get_prefetcher().prefetch(st.session_state.question_count, make_generation_job(stream))
+    return future.result() if future.done() else stream
+
+
+def generation_job(question_count, prefetched=None, stock=None, owner=None):
+    """생성 작업 큐에서 실행할 작업 - 진행 중이던 프리페치가 있으면 기다렸다가 쓰고, 쓸 수 없으면 새로 생성"""
+    import openai
+
+    if prefetched is not None:
+        try:
+            questions = prefetched.result()
+        except openai.AuthenticationError:
+            raise
+        except Exception:
+            questions = None
+        if questions:
+            return questions
+    with request_owner(owner):
+        return generate_questions(openai_connection(), question_count, stock=stock)
+
+
+def submit_generation_job(prefetched=None):
+    """질문 생성을 작업 큐에 넣고 작업 ID만 세션에 기록 (같은 질문 개수/프롬프트 버전의 진행 중인 작업은 공유)"""
+    question_count = st.session_state.question_count
+    key = None if prefetched is not None else (question_count, prompt_version(), GENERATION_MODE)
+    st.session_state.generation_job = get_job_queue().submit(
+        generation_job, question_count, prefetched, get_prefetcher().stock, st.session_state.session_token, key=key
+    )
+
+
+def release_generation_job():
+    """세션이 기다리던 생성 작업을 놓음 - 같은 작업을 기다리는 세션이 있을 수 있어 취소하지 않고 결과는 공용 풀로"""
+    future = get_job_queue().future(st.session_state.generation_job) if st.session_state.generation_job else None
+    if future is not None:
+        get_prefetcher().adopt(future, st.session_state.question_count)
+    st.session_state.generation_job = None
+
+
+def is_authentication_error(error):
+    """openai.AuthenticationError인지 - openai를 아직 불러오지 않았다면 그 예외일 수 없으므로 스크립트 스레드에서 불러오지 않음"""
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, openai.AuthenticationError)
+
+
+def start_test():
+    """시작 버튼 - 바로 쓸 수 있는 질문이 있으면 세션에 넣고, 없으면 생성 작업을 큐에 넣기만 하고 바로 반환"""
+    questions, pending = take_prefetched_questions()
+    if not questions and pending is None and GENERATION_MODE == "stream":
+        questions = start_question_stream()
+
+    if questions:
+        set_questions(questions)
+        st.session_state.questions_generated = True
+    else:
+        submit_generation_job(pending)
+
+
+def reset_test():
+    """테스트를 시작 전으로 되돌림 - 질문 세트는 공용 캐시에 남기고 세션의 ID만 지움"""
+    st.session_state.test_started = False
+    st.session_state.current_question = 0
+    st.session_state.answers = 0
+    st.session_state.asked_questions = 0
+    st.session_state.test_completed = False
+    st.session_state.question_set = None
+    st.session_state.questions_generated = False
+    st.session_state.started_at = None
+    release_generation_job()
+
+
+@st.cache_resource
+def start_warmup():
+    """secrets.toml의 [warmup] 섹션 - 프로세스마다 첫 실행이 화면을 다 그린 뒤 한 번만 실행
+
+    콜드 스타트 직후 첫 방문자가 환영 문구를 읽는 동안 백그라운드에서 openai를 불러오고, API 서버 연결을
+    열어 두고, 공용 풀에 질문 세트를 미리 채운다. 꺼져 있으면 이 일은 첫 생성 작업이 한다.
+    """
+    settings = {**DEFAULT_WARMUP_SETTINGS, **st.secrets.get("warmup", {})}
+    if not settings["enabled"]:
+        return []
+    get_job_queue().submit(lambda: openai_connection().warm_up(), key="warmup")
+    return get_prefetcher().warm_up(settings["question_counts"], settings["sets"], make_generation_job(owner="warmup"))
+
 
 # 메인 타이틀
 st.markdown('<h1 class="stTitle">🧠 Simple MBTI 성격 테스트 🔍</h1>', unsafe_allow_html=True)
 
 # 사이드바
-with st.sidebar:
+with st.sidebar, METRICS.span("sidebar"):
     st.markdown("### ⚙️ 설정")
     st.markdown("---")
 
@@ -369,36 +558,38 @@ with st.sidebar:
         st.session_state.question_count = selected_count
         # 질문 개수가 변경되면 테스트 초기화
         if st.session_state.test_started:
-            st.session_state.test_started = False
-            st.session_state.current_question = 0
-            st.session_state.answers = []
-            st.session_state.test_completed = False
-            st.session_state.all_questions = []
-            st.session_state.questions_generated = False
+            reset_test()
             st.info(f"질문 개수가 {selected_count}개로 변경되어 테스트가 초기화되었습니다.")
-
-    # OpenAI 클라이언트 초기화 (항상 실행)
-    openai_api_key = st.secrets['openai']['API_KEY']
-    client = OpenAI(api_key=openai_api_key)
-
+        persist_session()
 
     # 테스트 시작 버튼
     if not st.session_state.test_started:
         if st.button("🚀 테스트 시작하기", use_container_width=True):
             st.session_state.test_started = True
             st.session_state.current_question = 0
-            # 모든 질문을 한번에 생성
-            with st.spinner(f"🤔 AI가 {st.session_state.question_count}개의 맞춤형 질문을 생성하고 있습니다..."):
-                st.session_state.all_questions = generate_all_questions(client, st.session_state.question_count)
-                st.session_state.questions_generated = True
+            st.session_state.answers = 0
+            st.session_state.asked_questions = 0
+            st.session_state.started_at = time.time()
+            # 미리 생성된 질문을 우선 사용하고, 없으면 생성 작업을 큐에 넣음 (기다리는 화면은 generation_panel)
+            try:
+                start_test()
+            except Exception as e:
+                if not is_authentication_error(e):
+                    raise
+                st.error("🚫 API 키가 잘못되었습니다. 올바른 키를 입력해주세요.")
+                st.stop()
+            ANALYTICS.record(STARTED, question_count=st.session_state.question_count)
+            persist_session()
             st.rerun()
 
     st.markdown("---")
     st.markdown("### 📊 테스트 진행상황")
-    if st.session_state.test_started:
-        progress = st.session_state.current_question / st.session_state.question_count
-        st.progress(progress)
+    if st.session_state.test_completed:
+        st.progress(1.0)
         st.markdown(f"**{st.session_state.current_question}/{st.session_state.question_count}** 완료")
+    elif st.session_state.test_started:
+        # 답변할 때는 질문 패널만 다시 실행되므로 진행 막대는 질문 위에 표시
+        st.markdown("테스트 진행 중... 진행 상황은 질문 위에 표시됩니다.")
     else:
         st.markdown("테스트 시작 대기 중...")
 
@@ -415,316 +606,298 @@ with st.sidebar:
     """)
 
     if st.button("🔄 다시 시작"):
-        st.session_state.current_question = 0
-        st.session_state.answers = []
-        st.session_state.test_completed = False
+        reset_test()
         st.session_state.current_question_data = None
-        st.session_state.test_started = False
-        st.session_state.all_questions = []
-        st.session_state.questions_generated = False
+        release_prefetch()
+        persist_session()
         st.rerun()
 
-def calculate_mbti():
-    """답변을 바탕으로 MBTI 유형을 계산"""
-    type_counts = {"E": 0, "I": 0, "S": 0, "N": 0, "T": 0, "F": 0, "J": 0, "P": 0}
-
-    for answer in st.session_state.answers:
-        type_counts[answer] += 1
-
-    mbti_type = ""
-    mbti_type += "E" if type_counts["E"] >= type_counts["I"] else "I"
-    mbti_type += "S" if type_counts["S"] >= type_counts["N"] else "N"
-    mbti_type += "T" if type_counts["T"] >= type_counts["F"] else "F"
-    mbti_type += "J" if type_counts["J"] >= type_counts["P"] else "P"
-
-    return mbti_type
+def calculate_mbti(question_set):
+    """답변 비트와 세트의 차원별 마스크로 MBTI 유형을 계산 (동점이면 E/S/T/J)"""
+    return mbti_from_answers(question_set.masks, st.session_state.asked_questions, st.session_state.answers)
 
-def create_share_message(mbti_result):
-    """카카오톡 공유용 메시지 생성"""
-    message = f"""🧠 MBTI 성격 테스트 결과 🔍
 
-🎉 나의 MBTI 유형: {mbti_result}
-{MBTI_DESCRIPTIONS[mbti_result]}
+def record_completion():
+    """완료된 테스트를 결과 분석 로그에 남김 - 세트 ID, 질문별 선택, 결과 유형, 소요 시간
 
-✨ AI가 생성한 맞춤형 질문으로 알아본 나의 성격!
-당신도 테스트해보세요! 
-
-#MBTI #성격테스트 #AI테스트"""
-    
-    return message
+    적응형으로 일찍 끝나 아직 생성 중인 세트는 ID가 없으므로 지금까지의 질문으로 내용 ID를 만든다.
+    """
+    question_set = session_question_set()
+    if question_set is None:
+        return
+    questions = tuple(question_set.questions)
+    started_at = st.session_state.started_at
+    ANALYTICS.record(
+        COMPLETED,
+        questions=questions,
+        question_count=st.session_state.question_count,
+        question_set=question_set.id or question_set_id(questions),
+        choices=choice_string(questions, st.session_state.asked_questions, st.session_state.answers),
+        mbti=calculate_mbti(question_set),
+        answered=st.session_state.current_question,
+        seconds=round(time.time() - started_at, 3) if started_at else None
+    )
 
 
-# 테스트 완료 후 결과 표시
-if st.session_state.test_completed:
-    mbti_result = calculate_mbti()
+def reset_lost_test():
+    """질문 세트가 캐시에서 밀려났고 저장소에도 없으면 테스트를 처음 상태로 되돌림"""
+    st.toast("⚠️ 질문 세트가 만료되어 테스트를 처음부터 다시 시작합니다.")
+    reset_test()
+    persist_session()
 
-    st.markdown(
-        f'<div class="result-container">'
-        f'<h2>🎉 테스트 완료!</h2>'
-        f'<div class="mbti-result">{mbti_result}</div>'
-        f'<h3>{MBTI_DESCRIPTIONS[mbti_result]}</h3>'
-        f'<p>당신의 성격 유형은 <strong>{mbti_result}</strong>입니다!</p>'
-        f'</div>',
-        unsafe_allow_html=True
-    )
 
-    # 결과 상세 설명
-    st.markdown("### 📝 상세 분석")
-    col1, col2, col3, col4 = st.columns(4)
+def restart_lost_test():
+    """질문 세트를 잃었으면 처음 상태로 되돌리고 전체 스크립트를 다시 실행"""
+    reset_lost_test()
+    st.rerun(scope="app")
 
-    type_counts = {"E": 0, "I": 0, "S": 0, "N": 0, "T": 0, "F": 0, "J": 0, "P": 0}
-    for answer in st.session_state.answers:
-        type_counts[answer] += 1
+@st.cache_resource
+def get_share_content():
+    """16개 유형의 공유 문구/링크/카카오톡 URL - 프로세스마다 한 번만 계산 (secrets.toml의 [share] 섹션)"""
+    return build_share_content(st.secrets.get("share", {}))
 
-    with col1:
-        ei_type = "외향성 (E)" if type_counts["E"] >= type_counts["I"] else "내향성 (I)"
-        st.metric("에너지 방향", ei_type, f"E:{type_counts['E']} I:{type_counts['I']}")
 
-    with col2:
-        sn_type = "감각 (S)" if type_counts["S"] >= type_counts["N"] else "직관 (N)"
-        st.metric("정보 수집", sn_type, f"S:{type_counts['S']} N:{type_counts['N']}")
+def current_question_index(question_set):
+    """지금 보여줄 질문 번호 - 적응형이면 가장 덜 결정된 차원의 질문, 아니면 순서대로 (아직 없으면 None)"""
+    if ADAPTIVE_ENABLED:
+        return next_question_index(
+            question_set.masks, st.session_state.asked_questions, st.session_state.answers,
+            st.session_state.question_count, ADAPTIVE_CONFIDENCE
+        )
+    if st.session_state.current_question < len(question_set.questions):
+        return st.session_state.current_question
+    return None
 
-    with col3:
-        tf_type = "사고 (T)" if type_counts["T"] >= type_counts["F"] else "감정 (F)"
-        st.metric("의사 결정", tf_type, f"T:{type_counts['T']} F:{type_counts['F']}")
 
-    with col4:
-        jp_type = "판단 (J)" if type_counts["J"] >= type_counts["P"] else "인식 (P)"
-        st.metric("생활 양식", jp_type, f"J:{type_counts['J']} P:{type_counts['P']}")
+def record_answer(answer_type, question_index, dimension):
+    """답변 저장 (버튼 on_click 콜백) - 마지막 답변이면 테스트 완료로 표시하고 진행 상황을 저장소에 기록"""
+    # 화면을 그린 뒤 세트가 밀려났고 저장소에도 없으면 답변을 버리고 처음으로 (콜백 뒤 다시 실행되므로 rerun 불필요)
+    question_set = session_question_set()
+    if question_set is None:
+        reset_lost_test()
+        return
 
-    # 결과 공유 기능
-    st.markdown("### 📱 결과 공유하기")
-    
-    # 공유 메시지 생성
-    share_message = create_share_message(mbti_result)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 카카오톡 공유 버튼
-        st.markdown("**💬 카카오톡 공유**")
-        
-        # JavaScript 키 설정 여부에 따른 다른 방식 제공
-        # 공유용 데이터 준비
-        share_title = f"🧠 MBTI 테스트 결과: {mbti_result}"
-        share_description = f"{MBTI_DESCRIPTIONS[mbti_result]}\n\n✨ AI가 생성한 맞춤형 질문으로 알아본 나의 성격!"
-        share_url = "https://simple-mbti.streamlit.app"
-        share_image = "https://developers.kakao.com/assets/img/about/logos/kakaolink/kakaolink_btn_medium.png"
-        
-        # 카카오톡 공유 메시지 준비
-        clean_description = share_description.replace('\n', ' ').replace('"', '"').replace("'", "'")
-        share_text = f"{share_title}\n\n{clean_description}\n\n테스트 해보기: {share_url}"
-        
-        # 크로스 플랫폼 카카오톡 공유 버튼들
-        st.markdown("""
-        <div style="display: flex; flex-direction: column; gap: 10px; align-items: center; margin: 20px 0;">
-        """, unsafe_allow_html=True)
-        
-        # 1. 모바일용 - 카카오톡 앱 직접 실행
-        kakao_scheme_url = f"kakaotalk://send?msg={urllib.parse.quote(share_text)}"
-        st.markdown(f"""
-            <a href="{kakao_scheme_url}" 
-               style="display: inline-block; background: #FEE500; color: #3C1E1E; 
-                      padding: 12px 20px; border-radius: 8px; text-decoration: none; 
-                      font-weight: bold; font-size: 14px; margin: 5px; width: 280px; text-align: center;"
-               onmouseover="this.style.backgroundColor='#FDD835'"
-               onmouseout="this.style.backgroundColor='#FEE500'">
-                📱 카카오톡 앱으로 공유 (모바일)
-            </a>
-        """, unsafe_allow_html=True)
-        
-        # 2. 범용 - 클립보드 복사 (모든 환경)
-        copy_button_id = f"copy-btn-{mbti_result}"
-        st.markdown(f"""
-            <button id="{copy_button_id}" 
-                    style="background: #FEE500; color: #3C1E1E; border: none;
-                           padding: 12px 20px; border-radius: 8px; font-weight: bold; 
-                           font-size: 14px; cursor: pointer; margin: 5px; width: 280px;"
-                    onmouseover="this.style.backgroundColor='#FDD835'"
-                    onmouseout="this.style.backgroundColor='#FEE500'"
-                    onclick="copyToClipboard()">
-                📋 결과 복사하고 카카오톡에 붙여넣기
-            </button>
-        """, unsafe_allow_html=True)
-        
-        # 3. 웹 공유 API (HTTPS 환경에서만)
-        web_share_button_id = f"web-share-btn-{mbti_result}"
-        st.markdown(f"""
-            <button id="{web_share_button_id}" 
-                    style="background: #FEE500; color: #3C1E1E; border: none;
-                           padding: 12px 20px; border-radius: 8px; font-weight: bold; 
-                           font-size: 14px; cursor: pointer; margin: 5px; width: 280px;"
-                    onmouseover="this.style.backgroundColor='#FDD835'"
-                    onmouseout="this.style.backgroundColor='#FEE500'"
-                    onclick="webShare()">
-                🔗 네이티브 공유 (모바일 추천)
-            </button>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        # JavaScript 함수들
-        share_text_js = share_text.replace('\n', '\\n').replace('"', '\\"').replace("'", "\\'")
-        st.markdown(f"""
-        <script>
-        // 공유할 텍스트
-        const shareData = {{
-            text: `{share_text_js}`,
-            url: '{share_url}',
-            fullText: `{share_text_js}\\n\\n{share_url}`
-        }};
-        
-        // 1. 클립보드 복사 함수 (모든 환경 지원)
-        function copyToClipboard() {{
-            const text = shareData.fullText;
-            
-            // 최신 브라우저 (Chrome, Firefox, Safari 13+)
-            if (navigator.clipboard && window.isSecureContext) {{
-                navigator.clipboard.writeText(text).then(() => {{
-                    showCopySuccess();
-                }}).catch(() => {{
-                    fallbackCopy(text);
-                }});
-            }} else {{
-                fallbackCopy(text);
-            }}
-        }}
-        
-        // 2. 구형 브라우저용 복사 (IE, 구형 Safari 등)
-        function fallbackCopy(text) {{
-            const textArea = document.createElement('textarea');
-            textArea.value = text;
-            textArea.style.position = 'fixed';
-            textArea.style.left = '-999999px';
-            textArea.style.top = '-999999px';
-            document.body.appendChild(textArea);
-            textArea.focus();
-            textArea.select();
-            
-            try {{
-                document.execCommand('copy');
-                showCopySuccess();
-            }} catch (err) {{
-                // 최후의 수단 - 수동 복사
-                prompt('아래 텍스트를 수동으로 복사하세요:', text);
-            }}
-            
-            document.body.removeChild(textArea);
-        }}
-        
-        // 3. 웹 공유 API (모바일 환경)
-        function webShare() {{
-            if (navigator.share) {{
-                navigator.share({{
-                    title: '🧠 MBTI 테스트 결과',
-                    text: shareData.text,
-                    url: shareData.url
-                }}).then(() => {{
-                    console.log('공유 성공');
-                }}).catch((error) => {{
-                    console.log('웹 공유 실패:', error);
-                    copyToClipboard();
-                }});
-            }} else {{
-                alert('이 기능은 모바일 환경에서만 지원됩니다.\\n클립보드 복사 기능을 사용해주세요.');
-                copyToClipboard();
-            }}
-        }}
-        
-        // 복사 성공 메시지
-        function showCopySuccess() {{
-            // 임시 알림 요소 생성
-            const notification = document.createElement('div');
-            notification.innerHTML = '✅ 복사 완료! 카카오톡에서 붙여넣기 하세요.';
-            notification.style.cssText = `
-                position: fixed; top: 20px; right: 20px; z-index: 10000;
-                background: #4CAF50; color: white; padding: 15px 20px;
-                border-radius: 8px; font-weight: bold; box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-            `;
-            document.body.appendChild(notification);
-            
-            // 3초 후 제거
-            setTimeout(() => {{
-                if (notification.parentNode) {{
-                    notification.parentNode.removeChild(notification);
-                }}
-            }}, 3000);
-        }}
-        
-        // 페이지 로드 시 환경별 버튼 표시/숨김
-        document.addEventListener('DOMContentLoaded', function() {{
-            const isMobile = /Android|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent);
-            const isHTTPS = location.protocol === 'https:';
-            
-            // 웹 공유 버튼은 모바일 + HTTPS에서만 표시
-            const webShareBtn = document.getElementById('{web_share_button_id}');
-            if (!isMobile || !navigator.share) {{
-                if (webShareBtn) webShareBtn.style.display = 'none';
-            }}
-        }});
-        </script>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        # 텍스트 복사 버튼
-        st.markdown("**📋 텍스트 복사**")
-        if st.button("📋 결과 복사하기", use_container_width=True):
-            st.code(share_message, language=None)
-            st.success("✅ 위 텍스트를 복사해서 원하는 곳에 붙여넣으세요!")
-        
-        # URL 공유 버튼 (현재 페이지 URL)  
-        if st.button("🔗 링크 공유하기", use_container_width=True):
-            st.code("https://simple-mbti.streamlit.app", language=None)
-            st.success("✅ 위 링크를 복사해서 친구들에게 공유하세요!")
+    st.session_state.answers, st.session_state.asked_questions = pack_answer(
+        st.session_state.answers, st.session_state.asked_questions, question_index, dimension, answer_type
+    )
+    st.session_state.current_question += 1
+    ANALYTICS.record(ANSWERED, question_count=st.session_state.question_count, answered=st.session_state.current_question)
+
+    # 테스트 완료 확인 - 적응형이면 남은 질문으로 결과가 바뀔 수 없을 때도 완료
+    if st.session_state.current_question >= st.session_state.question_count:
+        st.session_state.test_completed = True
+    elif ADAPTIVE_ENABLED and is_decided(
+        question_set.masks, st.session_state.asked_questions, st.session_state.answers,
+        st.session_state.question_count, ADAPTIVE_CONFIDENCE
+    ):
+        st.session_state.test_completed = True
+    if st.session_state.test_completed:
+        record_completion()
+    persist_session()
+
+
+@st.fragment
+def question_panel():
+    """진행 막대와 현재 질문/답변 버튼
+
+    fragment로 분리되어 있어 답변 버튼을 누르면 이 함수만 다시 실행되고, 페이지 설정/CSS/사이드바/
+    클라이언트 초기화는 건너뛴다. 결과 화면으로 넘어갈 때만 전체 스크립트를 다시 실행한다.
+    """
+    # 질문이 준비되었으면 생성 작업에서 이미 불러온 모듈이라 import 비용이 없음
+    import openai
+    from question_generator import QuestionStream
 
-# 테스트 진행 중
-elif st.session_state.test_started and st.session_state.questions_generated and st.session_state.current_question < st.session_state.question_count:
-    if st.session_state.all_questions and st.session_state.current_question < len(st.session_state.all_questions):
-        current_q = st.session_state.all_questions[st.session_state.current_question]
+    with METRICS.span("question_render"):
+        if st.session_state.test_completed:
+            st.rerun(scope="app")
+        question_set = session_question_set()
+        if question_set is None:
+            restart_lost_test()
 
-        # 환영 메시지 (첫 번째 질문일 때만)
-        if st.session_state.current_question == 0:
+        progress = st.session_state.current_question / st.session_state.question_count
+        progress_text = f"**{st.session_state.current_question}/{st.session_state.question_count}** 완료"
+        if ADAPTIVE_ENABLED:
+            progress_text += " (결과가 정해지면 일찍 끝납니다)"
+        st.progress(progress, text=progress_text)
+
+        question_index = current_question_index(question_set)
+        if question_index is not None:
+            current_q = question_set.questions[question_index]
+
+            # 환영 메시지 (첫 번째 질문일 때만)
+            if st.session_state.current_question == 0:
+                st.markdown(
+                    f'<div class="welcome-message">'
+                    f'<h3>🎯 AI가 생성한 {st.session_state.question_count}가지 질문으로 당신의 MBTI를 알아보세요!</h3>'
+                    f'<p>각 질문에 대해 더 가깝다고 느끼는 답변을 선택해주세요.</p>'
+                    f'</div>',
+                    unsafe_allow_html=True
+                )
+
+            # 현재 질문 표시
             st.markdown(
-                f'<div class="welcome-message">'
-                f'<h3>🎯 AI가 생성한 {st.session_state.question_count}가지 질문으로 당신의 MBTI를 알아보세요!</h3>'
-                f'<p>각 질문에 대해 더 가깝다고 느끼는 답변을 선택해주세요.</p>'
+                f'<div class="question-container">'
+                f'<h2>질문 {st.session_state.current_question + 1}</h2>'
+                f'<h3>{current_q["question"]}</h3>'
                 f'</div>',
                 unsafe_allow_html=True
             )
 
-        # 현재 질문 표시
+            # 답변 선택 버튼 - 콜백에서 답변을 저장하고 fragment만 다시 실행
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.button(
+                    f"A. {current_q['options'][0]['text']}", key="option_a",
+                    on_click=record_answer, args=(current_q['options'][0]['type'], question_index, current_q['type'])
+                )
+
+            with col2:
+                st.button(
+                    f"B. {current_q['options'][1]['text']}", key="option_b",
+                    on_click=record_answer, args=(current_q['options'][1]['type'], question_index, current_q['type'])
+                )
+
+        # 스트리밍 생성 중이면 다음 질문이 도착할 때까지 이 fragment만 다시 실행하며 대기
+        elif isinstance(question_set.questions, QuestionStream):
+            stream = question_set.questions
+            if not stream.done:
+                st.info("⏳ 다음 질문을 생성하고 있습니다...")
+                time.sleep(0.3)
+                st.rerun(scope="fragment")
+
+            if isinstance(stream.error, openai.AuthenticationError):
+                st.error("🚫 API 키가 잘못되었습니다. 올바른 키를 입력해주세요.")
+                st.stop()
+
+            # 생성이 끝났는데 질문이 부족하면 부족한 차원만 기본 질문으로 채움
+            stream.complete_with_defaults()
+            st.rerun(scope="fragment")
+
+        # 적응형에서 보여줄 질문이 더 없으면 (결정되지 않은 차원의 질문이 없음) 결과 화면으로
+        elif ADAPTIVE_ENABLED:
+            st.session_state.test_completed = True
+            record_completion()
+            persist_session()
+            st.rerun(scope="app")
+
+
+@st.fragment(run_every=0.5)
+def generation_panel():
+    """질문 생성 작업을 기다리는 화면
+
+    run_every로 이 fragment만 주기적으로 다시 실행하며 작업 상태를 확인한다. 스크립트 스레드는 생성을
+    기다리지 않고, 작업이 끝나면 질문을 세션에 넣고 전체 스크립트를 다시 실행한다.
+    """
+    if st.session_state.questions_generated or not st.session_state.test_started:
+        st.rerun(scope="app")
+
+    jobs = get_job_queue()
+    status = jobs.status(st.session_state.generation_job) if st.session_state.generation_job else None
+    # 작업 기록이 없으면 (서버 재시작, 다른 레플리카에서 복원 등) 다시 넣음
+    if status is None:
+        submit_generation_job()
+        status = jobs.status(st.session_state.generation_job)
+
+    if status == QUEUED:
+        ahead = jobs.position(st.session_state.generation_job)
+        st.info(f"⏳ 질문 생성 차례를 기다리고 있습니다... (앞에 {ahead}개)")
+        return
+    if status == RUNNING:
+        st.info(f"🤔 AI가 {st.session_state.question_count}개의 맞춤형 질문을 생성하고 있습니다...")
+        return
+
+    import openai
+    from question_generator import default_questions_for_missing
+
+    try:
+        questions = jobs.result(st.session_state.generation_job)
+    except openai.AuthenticationError:
+        st.error("🚫 API 키가 잘못되었습니다. 올바른 키를 입력해주세요.")
+        st.stop()
+    except Exception:
+        questions = None
+
+    set_questions(questions or default_questions_for_missing([], st.session_state.question_count))
+    st.session_state.questions_generated = True
+    st.session_state.generation_job = None
+    persist_session()
+    st.rerun(scope="app")
+
+
+# 테스트 완료 후 결과 표시
+if st.session_state.test_completed:
+    with METRICS.span("result_render"):
+        question_set = session_question_set()
+        if question_set is None:
+            restart_lost_test()
+        mbti_result = calculate_mbti(question_set)
+
         st.markdown(
-            f'<div class="question-container">'
-            f'<h2>질문 {st.session_state.current_question + 1}</h2>'
-            f'<h3>{current_q["question"]}</h3>'
+            f'<div class="result-container">'
+            f'<h2>🎉 테스트 완료!</h2>'
+            f'<div class="mbti-result">{mbti_result}</div>'
+            f'<h3>{MBTI_DESCRIPTIONS[mbti_result]}</h3>'
+            f'<p>당신의 성격 유형은 <strong>{mbti_result}</strong>입니다!</p>'
             f'</div>',
             unsafe_allow_html=True
         )
 
-        # 답변 선택 버튼
-        col1, col2 = st.columns(2)
+        # 결과 상세 설명
+        st.markdown("### 📝 상세 분석")
+        col1, col2, col3, col4 = st.columns(4)
+
+        type_counts = letter_counts(question_set.masks, st.session_state.asked_questions, st.session_state.answers)
 
         with col1:
-            if st.button(f"A. {current_q['options'][0]['text']}", key="option_a"):
-                # 답변 저장
-                st.session_state.answers.append(current_q['options'][0]['type'])
-                st.session_state.current_question += 1
+            ei_type = "외향성 (E)" if type_counts["E"] >= type_counts["I"] else "내향성 (I)"
+            st.metric("에너지 방향", ei_type, f"E:{type_counts['E']} I:{type_counts['I']}")
+
+        with col2:
+            sn_type = "감각 (S)" if type_counts["S"] >= type_counts["N"] else "직관 (N)"
+            st.metric("정보 수집", sn_type, f"S:{type_counts['S']} N:{type_counts['N']}")
+
+        with col3:
+            tf_type = "사고 (T)" if type_counts["T"] >= type_counts["F"] else "감정 (F)"
+            st.metric("의사 결정", tf_type, f"T:{type_counts['T']} F:{type_counts['F']}")
 
-                # 테스트 완료 확인
-                if st.session_state.current_question >= st.session_state.question_count:
-                    st.session_state.test_completed = True
-                st.rerun()
+        with col4:
+            jp_type = "판단 (J)" if type_counts["J"] >= type_counts["P"] else "인식 (P)"
+            st.metric("생활 양식", jp_type, f"J:{type_counts['J']} P:{type_counts['P']}")
 
+        # 결과 공유 기능 - 공유 문구/링크/카카오톡 URL은 시작할 때 16개 유형 모두 미리 계산해 둔 것
+        st.markdown("### 📱 결과 공유하기")
+        share = get_share_content()[mbti_result]
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # 카카오톡 공유 버튼
+            st.markdown("**💬 카카오톡 공유**")
+
+            # 크로스 플랫폼 카카오톡 공유 버튼들 - 버튼과 스크립트는 정적 컴포넌트로 세션당 한 번만
+            # 내려받고, 재실행마다는 결과 데이터(유형, 공유 문구, 주소)만 보냄
+            share_buttons(mbti_result, share["text"], share["url"], share["kakao_url"])
+    
         with col2:
-            if st.button(f"B. {current_q['options'][1]['text']}", key="option_b"):
-                # 답변 저장
-                st.session_state.answers.append(current_q['options'][1]['type'])
-                st.session_state.current_question += 1
+            # 텍스트 복사 버튼
+            st.markdown("**📋 텍스트 복사**")
+            if st.button("📋 결과 복사하기", use_container_width=True):
+                st.code(share["message"], language=None)
+                st.success("✅ 위 텍스트를 복사해서 원하는 곳에 붙여넣으세요!")
+        
+            # URL 공유 버튼 - [share] base_url이 있으면 세션 없이 열리는 정적 결과 페이지
+            if st.button("🔗 링크 공유하기", use_container_width=True):
+                st.code(share["url"], language=None)
+                st.success("✅ 위 링크를 복사해서 친구들에게 공유하세요!")
 
-                # 테스트 완료 확인
-                if st.session_state.current_question >= st.session_state.question_count:
-                    st.session_state.test_completed = True
-                st.rerun()
+# 테스트 진행 중 - 답변할 때는 question_panel(fragment)만 다시 실행됨
+elif st.session_state.test_started and st.session_state.questions_generated and st.session_state.current_question < st.session_state.question_count:
+    question_panel()
+
+# 질문 생성 대기 중 - generation_panel(fragment)만 주기적으로 다시 실행됨
+elif st.session_state.test_started and not st.session_state.questions_generated:
+    generation_panel()
 
 # 시작 화면
 else:
@@ -737,3 +910,8 @@ else:
         '</div>',
         unsafe_allow_html=True
     )
+
+# 첫 화면을 다 그린 뒤에 미리 생성과 부팅 워밍업을 시작 (openai import와 연결 생성은 백그라운드 작업에서)
+if not st.session_state.test_started:
+    ensure_prefetch()
+start_warmup()
@@ -0,0 +1,16 @@
+import pytest
+
+
+class FakeClock:
+    """직접 앞으로 돌리는 시계 - clock.now += 초"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,71 @@
+import itertools
+import random
+from collections import Counter
+
+from adaptive import (
+    bit_count, dimension_masks, is_decided, letter_counts, mbti_from_answers, next_question_index, pack_answer, pack_answers
+)
+from question_schema import DIMENSIONS
+
+
+def question_set(question_count):
+    return [{"question": f"질문 {i}", "type": DIMENSIONS[i % 4]} for i in range(question_count)]
+
+
+def run_adaptive(questions, planned):
+    """planned[i] 글자로 답하며 적응형으로 진행 - (결과 유형, 답한 질문 수)"""
+    masks = dimension_masks(questions)
+    answers = asked = 0
+    while not is_decided(masks, asked, answers, len(questions)):
+        index = next_question_index(masks, asked, answers, len(questions))
+        assert index is not None and not asked >> index & 1
+        answers, asked = pack_answer(answers, asked, index, questions[index]["type"], planned[index])
+    return mbti_from_answers(masks, asked, answers), bit_count(asked)
+
+
+def test_adaptive_result_matches_fixed_length_at_full_confidence():
+    questions = question_set(8)
+    masks = dimension_masks(questions)
+    choices = [dimension.split("/") for dimension in (q["type"] for q in questions)]
+
+    for planned in itertools.product(*choices):
+        answers, asked = pack_answers(questions, range(len(questions)), planned)
+        mbti, answered = run_adaptive(questions, planned)
+
+        assert mbti == mbti_from_answers(masks, asked, answers)
+        assert answered <= len(questions)
+
+
+def test_adaptive_stops_early_once_every_dimension_is_decided():
+    questions = question_set(12)
+    planned = [q["type"][0] for q in questions]
+
+    mbti, answered = run_adaptive(questions, planned)
+
+    assert mbti == "ESTJ"
+    assert answered == 8
+
+
+def test_pack_answer_round_trips_through_letter_counts():
+    rng = random.Random(7)
+    questions = question_set(20)
+    masks = dimension_masks(questions)
+    letters = [rng.choice(q["type"].split("/")) for q in questions]
+    order = rng.sample(range(len(questions)), 13)
+
+    answers, asked = pack_answers(questions, order, [letters[i] for i in order])
+
+    expected = Counter(letters[i] for i in order)
+    counts = letter_counts(masks, asked, answers)
+    assert counts == {letter: expected.get(letter, 0) for dimension in DIMENSIONS for letter in dimension.split("/")}
+
+
+def test_answering_again_replaces_the_earlier_answer():
+    questions = question_set(4)
+    masks = dimension_masks(questions)
+
+    answers, asked = pack_answer(0, 0, 0, "E/I", "E")
+    answers, asked = pack_answer(answers, asked, 0, "E/I", "I")
+
+    assert letter_counts(masks, asked, answers)["E"] == 0
+    assert letter_counts(masks, asked, answers)["I"] == 1
@@ -0,0 +1,76 @@
+from analytics import ANSWERED, COMPLETED, STARTED, AnalyticsLog, AnalyticsStore, choice_string
+from question_schema import DIMENSIONS
+
+
+def question(index, dimension):
+    first, second = dimension.split("/")
+    return {
+        "question": f"질문 {index}",
+        "type": dimension,
+        "options": [{"text": f"{index}-가", "type": first}, {"text": f"{index}-나", "type": second}]
+    }
+
+
+QUESTIONS = [question(i, DIMENSIONS[i % 4]) for i in range(4)]
+
+
+def completed(mbti, choices, seconds):
+    return (COMPLETED, 0.0, {"question_count": 4, "question_set": "set-1", "choices": choices, "mbti": mbti,
+                             "answered": 4, "seconds": seconds}, QUESTIONS)
+
+
+def events():
+    return [
+        (STARTED, 0.0, {"question_count": 4}, None),
+        (STARTED, 0.0, {"question_count": 4}, None),
+        (STARTED, 0.0, {"question_count": 4}, None),
+        (ANSWERED, 0.0, {"question_count": 4, "answered": 1}, None),
+        (ANSWERED, 0.0, {"question_count": 4, "answered": 1}, None),
+        completed("ESTJ", "AAAA", 30.0),
+        completed("ESFJ", "AABA", 50.0)
+    ]
+
+
+def test_choice_string_follows_each_questions_option_order():
+    # 질문 0: E(A), 질문 1: 답하지 않음, 질문 2: F(B), 질문 3: J(A)
+    answers, asked = 0b1001, 0b1101
+
+    assert choice_string(QUESTIONS, asked, answers) == "A-BA"
+
+
+def test_rollups_are_kept_up_to_date_on_append(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    store.append(events())
+
+    rollups = store.rollups()
+
+    assert rollups["funnel"] == [
+        {"question_count": 4, "started": 3, "completed": 2, "completion_rate": 2 / 3, "mean_seconds": 40.0}
+    ]
+    assert rollups["progress"] == [{"question_count": 4, "answered": 1, "sessions": 2}]
+    assert rollups["types"] == {"ESFJ": 1, "ESTJ": 1}
+    choices = {row["question"]: (row["a"], row["b"]) for row in rollups["questions"]}
+    assert choices == {"질문 0": (2, 0), "질문 1": (2, 0), "질문 2": (1, 1), "질문 3": (2, 0)}
+
+
+def test_rebuild_matches_the_incremental_rollups(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    store.append(events()[:4])
+    store.append(events()[4:])
+    incremental = store.rollups()
+
+    assert store.rebuild() == 7
+    assert store.rollups() == incremental
+
+
+def test_log_writes_pending_events_on_flush(tmp_path):
+    log = AnalyticsLog().configure({"flush_interval": 60.0, "path": str(tmp_path / "analytics.db")})
+    log.record(STARTED, question_count=4)
+    log.record(COMPLETED, questions=QUESTIONS, question_count=4, question_set="set-1", choices="BBBB", mbti="ISFP",
+               answered=4, seconds=10.0)
+
+    assert log.store.rollups()["types"] == {}
+    log.flush()
+
+    assert log.store.rollups()["types"] == {"ISFP": 1}
+    log.close()
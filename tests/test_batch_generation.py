@@ -0,0 +1,27 @@
+import openai
+import pytest
+
+from benchmarks.fake_openai import FakeOpenAI
+from prompts import MAX_QUESTIONS_PER_RESPONSE, MODEL_MAX_OUTPUT_TOKENS, max_tokens_for
+from question_generator import generate_question_sets
+
+
+def test_batch_set_count_is_capped_to_the_model_output_limit():
+    client = FakeOpenAI(time_scale=0)
+
+    sets, _ = generate_question_sets(client, question_count=20, set_count=4)
+
+    assert len(sets) == MAX_QUESTIONS_PER_RESPONSE // 20
+    assert all(len(questions) == 20 for questions in sets)
+    assert max_tokens_for(MAX_QUESTIONS_PER_RESPONSE) <= MODEL_MAX_OUTPUT_TOKENS
+
+
+def test_fake_client_rejects_max_tokens_above_the_model_limit():
+    client = FakeOpenAI(time_scale=0)
+
+    with pytest.raises(openai.BadRequestError):
+        client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "질문"}],
+            max_tokens=MODEL_MAX_OUTPUT_TOKENS + 1
+        )
@@ -0,0 +1,66 @@
+import gzip
+import json
+
+import httpx
+import pytest
+
+from cassette import Cassette, CassetteMiss, RecordingTransport, ReplayTransport, request_key
+
+
+def chat_request(content, stream=False):
+    body = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": content}], "stream": stream}
+    return httpx.Request("POST", "https://api.openai.com/v1/chat/completions", json=body)
+
+
+class ChunkedStream(httpx.SyncByteStream):
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def __iter__(self):
+        yield from self._chunks
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    entry = {"key": request_key(chat_request("녹화된 질문")), "path": "/v1/chat/completions", "stream": False,
+             "status": 200, "headers": [], "elapsed": 0.0, "body": "{}"}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return str(path)
+
+
+def test_lookup_replays_a_recorded_request(cassette_path):
+    cassette = Cassette(cassette_path)
+
+    assert cassette.lookup(chat_request("녹화된 질문"))["status"] == 200
+    assert cassette.stats["fuzzy_matches"] == 0
+
+
+def test_lookup_miss_raises_by_default(cassette_path):
+    cassette = Cassette(cassette_path)
+
+    with pytest.raises(CassetteMiss):
+        cassette.lookup(chat_request("녹화되지 않은 질문"))
+
+
+def test_fuzzy_lookup_is_opt_in(cassette_path):
+    cassette = Cassette(cassette_path, fuzzy=True)
+
+    assert cassette.lookup(chat_request("녹화되지 않은 질문"))["status"] == 200
+    assert cassette.stats["fuzzy_matches"] == 1
+
+
+def test_streamed_multibyte_character_split_across_chunks_replays_unchanged(tmp_path):
+    path = str(tmp_path / "stream.jsonl.gz")
+    body = 'data: {"content": "질문"}\n\n'.encode("utf-8")
+    split = body.index("질".encode("utf-8")) + 1
+    chunks = [body[:split], body[split:]]
+    network = httpx.MockTransport(lambda request: httpx.Response(200, stream=ChunkedStream(chunks)))
+
+    response = RecordingTransport(network, Cassette(path, "record")).handle_request(chat_request("질문", stream=True))
+    assert response.read() == body
+    response.close()
+
+    replayed = ReplayTransport(Cassette(path, latency_scale=0.0)).handle_request(chat_request("질문", stream=True))
+    assert replayed.read() == body
@@ -0,0 +1,51 @@
+import httpx
+import openai
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def status_error(error_class, status_code):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return error_class("error", response=httpx.Response(status_code, request=request), body=None)
+
+
+def open_breaker(clock):
+    breaker = CircuitBreaker({"failure_threshold": 1, "reset_timeout": 30.0}, name="test", clock=clock)
+    breaker.record_failure(status_error(openai.InternalServerError, 500))
+    assert breaker.state == OPEN
+    clock.now += 30.0
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+
+def test_half_open_probe_ending_in_bad_request_releases_the_slot(clock):
+    breaker = open_breaker(clock)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure(status_error(openai.BadRequestError, 400))
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_half_open_probe_ending_in_authentication_error_releases_the_slot(clock):
+    breaker = open_breaker(clock)
+
+    assert breaker.allow()
+    breaker.record_failure(status_error(openai.AuthenticationError, 401))
+
+    assert breaker.allow()
+
+
+def test_half_open_probe_outcomes_still_change_state(clock):
+    breaker = open_breaker(clock)
+
+    assert breaker.allow()
+    breaker.record_failure(status_error(openai.InternalServerError, 503))
+    assert breaker.state == OPEN
+
+    clock.now += 30.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
@@ -0,0 +1,44 @@
+import asyncio
+
+from dedup import NearDuplicateIndex
+
+
+QUESTION = "주말에 친구들과 약속이 생기면 어떻게 하나요?"
+
+
+def test_served_questions_expire_after_max_age(clock):
+    index = NearDuplicateIndex(max_age=60.0, clock=clock)
+    index.add(QUESTION)
+
+    clock.now += 59.0
+    assert index.is_duplicate(QUESTION)
+
+    clock.now += 2.0
+    assert not index.is_duplicate(QUESTION)
+
+
+def test_full_index_overwrites_the_oldest_question():
+    index = NearDuplicateIndex(capacity=2, max_age=0)
+    index.add_many([QUESTION, "새로운 사람을 만나는 자리가 즐거운가요?", "계획 없이 여행을 떠나본 적이 있나요?"])
+
+    assert len(index) == 2
+    assert not index.is_duplicate(QUESTION)
+
+
+def test_parallel_generation_indexes_only_generated_questions(monkeypatch):
+    import question_generator
+
+    generated = [{"question": QUESTION, "type": "E/I"}, {"question": "혼자 있는 시간이 꼭 필요한가요?", "type": "E/I"}]
+
+    async def generate_dimension(async_client, dimension, count, notify, response_format):
+        return generated if dimension == "E/I" else None
+
+    index = NearDuplicateIndex(max_age=0)
+    monkeypatch.setattr(question_generator, "SERVED_QUESTIONS", index)
+    monkeypatch.setattr(question_generator, "_generate_dimension", generate_dimension)
+
+    questions = asyncio.run(question_generator.generate_questions_by_dimension(None, question_count=8))
+
+    assert len(questions) == 8
+    assert len(index) == 2
+    assert all(not index.is_duplicate(q["question"]) for q in questions if q["type"] != "E/I")
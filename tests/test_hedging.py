@@ -0,0 +1,69 @@
+import threading
+
+from hedging import Hedger
+from rate_limiter import RateLimitScheduler
+
+
+def hedger_with_one_sample(limiter):
+    hedger = Hedger({"enabled": True, "min_samples": 1, "max_hedge_rate": 1.0}, limiter=limiter)
+    hedger.call(lambda: "fast", key="questions_8")
+    return hedger
+
+
+def slow_call(calls, release):
+    def call():
+        calls.append(threading.current_thread().name)
+        release.wait(1.0)
+        return "slow"
+    return call
+
+
+def test_hedge_takes_a_rate_limit_token(clock):
+    limiter = RateLimitScheduler({"requests_per_minute": 120, "burst_seconds": 1.0}, clock=clock)
+    hedger = hedger_with_one_sample(limiter)
+    limiter.acquire(1)
+    calls, release = [], threading.Event()
+
+    threading.Timer(0.3, release.set).start()
+    assert hedger.call(slow_call(calls, release), key="questions_8") == "slow"
+
+    assert len(calls) == 2
+    assert not limiter.try_acquire(1)
+
+
+def test_hedge_is_skipped_when_no_rate_limit_token_is_free(clock):
+    limiter = RateLimitScheduler({"requests_per_minute": 60, "burst_seconds": 1.0}, clock=clock)
+    hedger = hedger_with_one_sample(limiter)
+    limiter.acquire(1)
+    calls, release = [], threading.Event()
+
+    threading.Timer(0.3, release.set).start()
+    assert hedger.call(slow_call(calls, release), key="questions_8") == "slow"
+
+    assert len(calls) == 1
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.settled = []
+
+    def try_acquire(self, tokens):
+        return True
+
+    def settle(self, reserved, used):
+        self.settled.append((reserved, used))
+
+
+def test_hedged_call_is_recorded_once_and_the_dropped_request_is_settled():
+    limiter = RecordingLimiter()
+    hedger = hedger_with_one_sample(limiter)
+    calls, release = [], threading.Event()
+
+    threading.Timer(0.3, release.set).start()
+    assert hedger.call(slow_call(calls, release), key="questions_8", tokens=100, usage=lambda result: 250) == "slow"
+    hedger._executor.shutdown(wait=True)
+
+    assert len(calls) == 2
+    assert len(hedger._histograms["questions_8"]) == 2
+    assert hedger.hedge_rate() == 0.5
+    assert limiter.settled == [(100, 250)]
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from jobs import DONE, FAILED, JobQueue
+
+
+def test_same_key_while_inflight_returns_the_same_job():
+    queue = JobQueue({"max_workers": 1}, name="test")
+    release = threading.Event()
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        release.wait(5.0)
+        return value
+
+    first = queue.submit(work, 1, key="session-a")
+    assert queue.submit(work, 2, key="session-a") == first
+    other = queue.submit(work, 3, key="session-b")
+    assert other != first
+
+    release.set()
+    assert queue.result(first, timeout=5.0) == 1
+    assert queue.result(other, timeout=5.0) == 3
+    assert calls == [1, 3]
+
+
+def test_finished_key_can_be_submitted_again():
+    queue = JobQueue({"max_workers": 1}, name="test")
+    first = queue.submit(lambda: "a", key="session-a")
+    queue.result(first, timeout=5.0)
+
+    second = queue.submit(lambda: "b", key="session-a")
+
+    assert second != first
+    assert queue.result(second, timeout=5.0) == "b"
+    assert queue.status(first) == DONE
+
+
+def test_failed_job_raises_from_result_and_frees_its_key():
+    queue = JobQueue({"max_workers": 1}, name="test")
+
+    def fail():
+        raise ValueError("boom")
+
+    job_id = queue.submit(fail, key="session-a")
+    with pytest.raises(ValueError):
+        queue.result(job_id, timeout=5.0)
+
+    assert queue.status(job_id) == FAILED
+    assert queue.submit(lambda: None, key="session-a") != job_id
+
+
+def test_finished_jobs_are_dropped_after_retention(clock):
+    queue = JobQueue({"max_workers": 1, "retention": 60.0}, name="test", clock=clock)
+    job_id = queue.submit(lambda: None)
+    queue.result(job_id, timeout=5.0)
+
+    clock.now += 61.0
+    queue.submit(lambda: None)
+
+    assert queue.status(job_id) is None
@@ -0,0 +1,53 @@
+import pytest
+
+from question_bank import QuestionBank, QuestionBankSampler
+from question_schema import DIMENSIONS
+
+
+def bank_question(dimension, index):
+    first, second = dimension.split("/")
+    return {
+        "question": f"{dimension} 질문 {index}",
+        "type": dimension,
+        "options": [{"text": "가", "type": first}, {"text": "나", "type": second}]
+    }
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    bank.add([bank_question(dimension, i) for dimension in DIMENSIONS for i in range(6)])
+    yield bank
+    bank.close()
+
+
+def test_questions_are_stored_once_per_dimension(bank):
+    assert bank.add([bank_question("E/I", 0), {"question": "형식이 틀린 질문"}]) == 0
+    assert bank.counts() == {dimension: 6 for dimension in DIMENSIONS}
+
+
+def test_no_question_repeats_before_its_deck_is_used_up(bank):
+    sampler = QuestionBankSampler(bank, seed=3)
+
+    drawn = [q["question"] for _ in range(3) for q in sampler.sample_set(8)]
+
+    assert len(drawn) == 24
+    assert len(set(drawn)) == 24
+
+
+def test_sets_keep_drawing_after_a_deck_is_reshuffled(bank):
+    sampler = QuestionBankSampler(bank, seed=3)
+    for _ in range(3):
+        sampler.sample_set(8)
+
+    questions = sampler.sample_set(8)
+
+    assert [q["type"] for q in questions] == DIMENSIONS * 2
+    assert len({q["question"] for q in questions}) == 8
+
+
+def test_excluded_questions_are_skipped(bank):
+    sampler = QuestionBankSampler(bank, seed=3)
+    exclude = {f"E/I 질문 {i}" for i in range(5)}
+
+    assert [q["question"] for q in sampler.sample({"E/I": 2}, exclude)["E/I"]] == ["E/I 질문 5"]
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import httpx
+import openai
+
+from rate_limiter import RateLimitScheduler, retry_after
+
+
+def wait_for_queue(limiter, depth):
+    deadline = time.monotonic() + 5.0
+    while limiter.snapshot()["queued"] < depth:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_waiting_owners_take_turns():
+    # 초당 20개, 한 번에 하나씩 - 첫 요청으로 버킷을 비워 두고 줄을 세움
+    limiter = RateLimitScheduler({"requests_per_minute": 1200, "burst_seconds": 0.05}, name="test")
+    limiter.acquire(1, owner="warmup")
+    order = []
+
+    def request(owner):
+        limiter.acquire(1, owner=owner)
+        order.append(owner)
+
+    threads = []
+    for depth, owner in enumerate(["a", "a", "a", "a", "b", "b"], start=1):
+        thread = threading.Thread(target=request, args=(owner,))
+        thread.start()
+        threads.append(thread)
+        wait_for_queue(limiter, depth)
+    for thread in threads:
+        thread.join(5.0)
+
+    assert order == ["a", "b", "a", "b", "a", "a"]
+
+
+def test_settle_takes_only_the_extra_usage(clock):
+    limiter = RateLimitScheduler({"tokens_per_minute": 600, "burst_seconds": 1.0}, name="test", clock=clock)
+    limiter.acquire(5)
+
+    limiter.settle(5, 3)
+    assert limiter.try_acquire(5)
+
+    limiter.settle(5, 12)
+    assert not limiter.try_acquire(1)
+    clock.now += 0.8
+    assert limiter.try_acquire(1)
+
+
+def test_429_pauses_every_request_for_retry_after(clock):
+    limiter = RateLimitScheduler({"max_pause": 60.0}, name="test", clock=clock)
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": "2"}, request=request)
+
+    limiter.observe_error(openai.RateLimitError("rate limited", response=response, body=None))
+
+    assert limiter.snapshot()["paused_for"] == 2.0
+    assert not limiter.try_acquire(1)
+    clock.now += 2.0
+    assert limiter.try_acquire(1)
+
+
+def test_pause_is_capped_and_headers_adjust_limits(clock):
+    limiter = RateLimitScheduler({"max_pause": 5.0}, name="test", clock=clock)
+
+    limiter.observe_headers({"retry-after-ms": "90000", "x-ratelimit-limit-requests": "60"}, 429)
+
+    assert limiter.snapshot()["paused_for"] == 5.0
+    assert limiter.snapshot()["requests_per_minute"] == 60
+    assert retry_after({"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "6m0s"}) == 360.0
@@ -0,0 +1,18 @@
+from metrics import METRICS
+from question_generator import RepairStats
+
+
+def test_repair_stats_are_exported_as_metrics():
+    before = METRICS.snapshot()["counters"]
+    stats = RepairStats()
+
+    stats.record(repair_needed=1, salvaged_questions=6)
+    stats.record(requested_questions=2)
+    stats.record(repaired=1)
+
+    counters = METRICS.snapshot()["counters"]
+    gauges = METRICS.snapshot()["gauges"]
+    salvaged = 'repair_questions_total{source="salvaged"}'
+    assert counters[salvaged] - before.get(salvaged, 0) == 6
+    assert gauges["salvage_rate"] == stats.snapshot()["salvage_rate"] == 0.75
+    assert gauges["repair_success_rate"] == 1.0
@@ -0,0 +1,17 @@
+from metrics import METRICS
+from question_schema import RetryStats
+
+
+def test_retry_stats_are_exported_as_metrics():
+    before = METRICS.snapshot()
+    stats = RetryStats()
+
+    stats.record("parse_error", 0.5)
+    stats.record("parse_error", 1.5)
+
+    after = METRICS.snapshot()
+    name = 'question_retries_total{failure="parse_error"}'
+    assert after["counters"][name] - before["counters"].get(name, 0) == 2
+    summary = after["summaries"]['question_retry_seconds{failure="parse_error"}']
+    assert summary["max"] >= 1.5
+    assert stats.snapshot()["parse_error"]["mean_seconds"] == 1.0
@@ -0,0 +1,103 @@
+from session_store import (
+    LocalRedis, RedisSessionStore, SessionStore, SQLiteSessionStore, WriteBehindStore, create_session_store, snapshot_state
+)
+
+
+QUESTIONS = [{"question": "주말에 친구들과 약속이 생기면 어떻게 하나요?", "type": "E/I", "options": {}}]
+
+
+def test_snapshot_keeps_only_the_question_set_id():
+    state = snapshot_state({"question_set": "abc123", "answers": 0b101, "asked_questions": 0b111, "current_question": 3})
+
+    assert state == {"question_set": "abc123", "answers": 0b101, "asked_questions": 0b111, "current_question": 3}
+
+
+def test_snapshot_inlines_questions_of_a_set_still_streaming():
+    assert snapshot_state({"question_set": iter(QUESTIONS)})["all_questions"] == QUESTIONS
+    assert snapshot_state({"question_set": None})["all_questions"] == []
+
+
+def test_question_sets_are_stored_apart_from_sessions(tmp_path):
+    for store in (SQLiteSessionStore(str(tmp_path / "sessions.db")), RedisSessionStore(LocalRedis())):
+        store.save_question_set("abc123", QUESTIONS)
+
+        assert store.load_question_set("abc123") == QUESTIONS
+        assert store.load_question_set("missing") is None
+        assert store.load("abc123") is None
+
+
+class MemoryStore(SessionStore):
+    def __init__(self):
+        self.data = {}
+        self.writes = []
+        self.fail = False
+
+    def load(self, token):
+        return self.data.get(token)
+
+    def save_many(self, items):
+        if self.fail:
+            raise OSError("store down")
+        self.writes.append(dict(items))
+        for token, state in items.items():
+            if state is None:
+                self.data.pop(token, None)
+            else:
+                self.data[token] = state
+
+
+def test_stores_round_trip_and_delete(tmp_path):
+    for store in (SQLiteSessionStore(str(tmp_path / "sessions.db")), RedisSessionStore(LocalRedis())):
+        store.save_many({"a": {"answers": 5, "test_started": True}, "b": {"answers": 1}})
+        store.save("a", {"answers": 7})
+        store.delete("b")
+
+        assert store.load("a") == {"answers": 7}
+        assert store.load("b") is None
+        store.close()
+
+
+def test_sqlite_store_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    SQLiteSessionStore(path).save("a", {"answers": 3})
+
+    assert SQLiteSessionStore(path).load("a") == {"answers": 3}
+
+
+def test_write_behind_batches_until_flush():
+    inner = MemoryStore()
+    store = WriteBehindStore(inner, flush_interval=60.0)
+    store.save("a", {"answers": 1})
+    store.save("a", {"answers": 2})
+    store.save("b", {"answers": 3})
+
+    assert inner.writes == []
+    assert store.load("a") == {"answers": 2}
+
+    store.flush()
+    assert inner.writes == [{"a": {"answers": 2}, "b": {"answers": 3}}]
+    store.close()
+
+
+def test_write_behind_retries_a_failed_flush_without_overwriting_newer_state():
+    inner = MemoryStore()
+    store = WriteBehindStore(inner, flush_interval=60.0)
+    store.save("a", {"answers": 1})
+    store.save("b", {"answers": 1})
+    inner.fail = True
+    store.flush()
+
+    store.save("a", {"answers": 2})
+    inner.fail = False
+    store.flush()
+
+    assert inner.data == {"a": {"answers": 2}, "b": {"answers": 1}}
+    store.close()
+
+
+def test_close_flushes_pending_state(tmp_path):
+    store = create_session_store({"path": str(tmp_path / "sessions.db"), "flush_interval": 60.0})
+    store.save("a", {"answers": 4})
+    store.close()
+
+    assert SQLiteSessionStore(str(tmp_path / "sessions.db")).load("a") == {"answers": 4}
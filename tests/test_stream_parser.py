@@ -0,0 +1,43 @@
+import json
+
+from question_generator import QuestionStreamParser
+
+
+QUESTIONS = [
+    {"question": "약속이 취소되면 {솔직히} 기쁜가요?", "type": "E/I", "options": {"a": "아니요 \"아쉬워요\"", "b": "네]"}},
+    {"question": "새 기계를 쓰면 설명서부터 읽나요?", "type": "S/N", "options": {"a": "네", "b": "아니요"}}
+]
+DOCUMENT = "```json\n" + json.dumps({"questions": QUESTIONS}, ensure_ascii=False, indent=2) + "\n```"
+
+
+def feed_in_chunks(text, size):
+    parser = QuestionStreamParser()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return parser, items
+
+
+def test_every_split_yields_the_same_questions():
+    for size in range(1, 40):
+        parser, items = feed_in_chunks(DOCUMENT, size)
+
+        assert items == QUESTIONS
+        assert parser.finished
+
+
+def test_each_question_is_yielded_as_soon_as_it_closes():
+    parser = QuestionStreamParser()
+    first_end = DOCUMENT.index("}\n    },") + len("}\n    }")
+
+    assert parser.feed(DOCUMENT[:first_end - 1]) == []
+    assert parser.feed(DOCUMENT[first_end - 1:first_end]) == [QUESTIONS[0]]
+
+
+def test_truncated_stream_keeps_only_complete_questions():
+    cut = DOCUMENT.index('"새 기계') + 5
+
+    parser, items = feed_in_chunks(DOCUMENT[:cut], 7)
+
+    assert items == QUESTIONS[:1]
+    assert not parser.finished